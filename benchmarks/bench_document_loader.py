@@ -0,0 +1,118 @@
+"""Benchmark DocumentLoader.iter_documents against sequential loading.
+
+Usage:
+    python benchmarks/bench_document_loader.py [--files 10000]
+"""
+
+import argparse
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add interfaces directory to Python path
+sys.path.append(str(Path(__file__).parent.parent / "interfaces"))
+
+from src.config import Config
+from src.utils.document_loader import DocumentLoader
+
+
+class LegacyDocumentLoader(DocumentLoader):
+    """The markdown cleaner as it was before the single-pass rewrite."""
+    
+    def _clean_markdown(self, content: str) -> str:
+        content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
+        content = content.strip()
+        content = re.sub(r'^#+\s*', '', content, flags=re.MULTILINE)
+        content = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', content)
+        content = re.sub(r'\*\*([^\*]+)\*\*', r'\1', content)
+        content = re.sub(r'\*([^\*]+)\*', r'\1', content)
+        content = re.sub(r'```[^`]*```', '', content)
+        content = re.sub(r'`([^`]+)`', r'\1', content)
+        return content
+
+
+class SlowStorageMixin:
+    """Adds a fixed per-file read latency, as on a network share."""
+    
+    read_latency = 0.0
+    
+    def _load_markdown_file(self, file_path):
+        if self.read_latency:
+            time.sleep(self.read_latency)
+        return super()._load_markdown_file(file_path)
+
+
+def build_tree(directory: Path, files: int, seed: int = 42) -> None:
+    """Write ``files`` synthetic knowledge-base markdown files."""
+    rng = random.Random(seed)
+    topics = ["classes", "trainers", "nutrition", "membership", "facilities", "faq"]
+    lines = [
+        "## {topic} update",
+        "**Timing:** 6:00 AM - 10:00 PM, *Monday* to *Saturday*.",
+        "- Contact [the front desk](https://fitflix.example/contact) for `{topic}` details.",
+        "Our certified trainers focus on safe form and steady progress.",
+        "",
+        "",
+        "",
+    ]
+    
+    for i in range(files):
+        topic = rng.choice(topics)
+        body = "\n".join(rng.choice(lines).format(topic=topic) for _ in range(rng.randint(20, 60)))
+        (directory / f"{topic}_{i:05d}.md").write_text(f"# {topic.title()} {i}\n\n{body}\n", encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--latency-ms", type=float, default=1.0,
+                        help="simulated per-file read latency for the second run")
+    args = parser.parse_args()
+    
+    config = Config()
+    # Compare whole-file loading, which is what the legacy loader does
+    config.markdown_split_sections = False
+    directory = Path(tempfile.mkdtemp(prefix="fitflix_bench_"))
+    
+    try:
+        build_tree(directory, args.files)
+        print(f"{args.files} markdown files")
+        
+        for latency_ms in (0.0, args.latency_ms):
+            legacy_loader = type("Legacy", (SlowStorageMixin, LegacyDocumentLoader), {})(config)
+            loader = type("Current", (SlowStorageMixin, DocumentLoader), {})(config)
+            legacy_loader.read_latency = loader.read_latency = latency_ms / 1000
+            
+            start = time.perf_counter()
+            legacy_docs = legacy_loader.load_all_documents(directory)
+            legacy_time = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            first_doc_time = None
+            current_docs = []
+            for doc in loader.iter_documents(directory, max_workers=args.workers):
+                if first_doc_time is None:
+                    first_doc_time = time.perf_counter() - start
+                current_docs.append(doc)
+            current_time = time.perf_counter() - start
+            
+            # Both loaders must produce the same documents, in any order
+            by_path = lambda docs: sorted((d["metadata"]["file_path"], d["content"]) for d in docs)
+            if by_path(legacy_docs) != by_path(current_docs):
+                raise SystemExit("Document mismatch between loaders")
+            
+            print(f"  read latency {latency_ms:.1f} ms/file:")
+            print(f"    legacy load_all_documents: {legacy_time:.2f}s")
+            print(f"    iter_documents:            {current_time:.2f}s "
+                  f"(first document after {first_doc_time * 1000:.1f} ms) | speedup {legacy_time / current_time:.1f}x")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark LLMManager throughput against the local stub backend.
+
+No network is involved, so the numbers measure our own pipeline
+(context packing, prompt building, caching and coalescing) plus the
+simulated model latency.
+
+Usage:
+    python benchmarks/bench_llm_pipeline.py [--requests 200] [--concurrency 16]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add interfaces directory to Python path
+sys.path.append(str(Path(__file__).parent.parent / "interfaces"))
+
+from src.config import Config
+from src.generation.llm_manager import LLMManager
+
+
+CONTEXT_DOCUMENTS = [
+    {
+        'id': f"classes.md_{i}",
+        'content': f"Class block {i}: Yoga, Zumba and HIIT run every weekday morning and evening. " * 8,
+        'metadata': {'source': 'classes.md', 'file_path': 'classes.md', 'chunk_id': i},
+        'similarity': 0.9 - i * 0.05
+    }
+    for i in range(5)
+]
+
+
+def run(llm_manager: LLMManager, requests: int, concurrency: int, repeat_every: int) -> None:
+    """Fire requests from a thread pool and report throughput and latency."""
+    def one(i: int) -> float:
+        # Every repeat_every-th request reuses a question, exercising the caches
+        question = f"Question {i % repeat_every if repeat_every else i}?"
+        start = time.perf_counter()
+        llm_manager.generate_response(question, CONTEXT_DOCUMENTS)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{requests} requests x{concurrency} | {requests / elapsed:.1f} req/s | "
+        f"p50 {statistics.median(latencies) * 1000:.1f} ms | p95 {p95 * 1000:.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=400)
+    parser.add_argument("--repeat-every", type=int, default=0, help="Distinct questions (0 = all distinct)")
+    args = parser.parse_args()
+
+    config = Config()
+    config.llm_backend = "stub"
+    config.stub_latency = args.latency
+    config.stub_tokens_per_second = args.tokens_per_second
+    config.response_cache_path = None
+    config.rate_limit_enabled = False  # Measure the pipeline, not the quota
+
+    print(f"stub latency={args.latency}s rate={args.tokens_per_second} tok/s")
+    for cache_enabled in (False, True):
+        config.response_cache_enabled = cache_enabled
+        print(f"response cache {'on' if cache_enabled else 'off'}: ", end="")
+        run(LLMManager(config), args.requests, args.concurrency, args.repeat_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Benchmark TextSplitter against the previous (quadratic) implementation.
+
+Usage:
+    python benchmarks/bench_text_splitter.py [--megabytes 4]
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Optional
+
+# Add interfaces directory to Python path
+sys.path.append(str(Path(__file__).parent.parent / "interfaces"))
+
+from src.config import Config
+from src.utils.text_splitter import TextSplitter
+
+
+class LegacyTextSplitter(TextSplitter):
+    """The splitting engine as it was before the linear-time rewrite."""
+    
+    def split_text(self, text: str,
+                   chunk_size: Optional[int] = None,
+                   chunk_overlap: Optional[int] = None) -> List[str]:
+        chunk_size = chunk_size or self.chunk_size
+        chunk_overlap = chunk_overlap or self.chunk_overlap
+        
+        if len(text) <= chunk_size:
+            return [text]
+        
+        sentences = self._split_by_sentences(text)
+        
+        chunks = []
+        current_chunk = ""
+        
+        for sentence in sentences:
+            if len(current_chunk) + len(sentence) > chunk_size:
+                if current_chunk:
+                    chunks.append(current_chunk.strip())
+                    overlap_text = self._get_overlap_text(current_chunk, chunk_overlap)
+                    current_chunk = overlap_text + sentence
+                else:
+                    sentence_chunks = self._split_long_sentence(sentence, chunk_size, chunk_overlap)
+                    chunks.extend(sentence_chunks[:-1])
+                    current_chunk = sentence_chunks[-1] if sentence_chunks else ""
+            else:
+                current_chunk += sentence
+        
+        if current_chunk.strip():
+            chunks.append(current_chunk.strip())
+        
+        return chunks
+    
+    def _split_long_sentence(self, sentence: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+        words = sentence.split()
+        chunks = []
+        current_chunk = []
+        
+        for word in words:
+            current_length = sum(len(w) + 1 for w in current_chunk)
+            
+            if current_length + len(word) > chunk_size:
+                if current_chunk:
+                    chunks.append(' '.join(current_chunk))
+                    overlap_words = self._get_overlap_words(current_chunk, chunk_overlap)
+                    current_chunk = overlap_words + [word]
+                else:
+                    chunks.append(word)
+                    current_chunk = []
+            else:
+                current_chunk.append(word)
+        
+        if current_chunk:
+            chunks.append(' '.join(current_chunk))
+        
+        return chunks
+    
+    def _get_overlap_words(self, words: List[str], overlap_size: int) -> List[str]:
+        if not words:
+            return []
+        
+        overlap_words = []
+        current_length = 0
+        
+        for word in reversed(words):
+            if current_length + len(word) + 1 > overlap_size:
+                break
+            overlap_words.insert(0, word)
+            current_length += len(word) + 1
+        
+        return overlap_words
+
+
+def build_corpus(megabytes: float, seed: int = 42) -> str:
+    """Build prose-like text of roughly the requested size."""
+    rng = random.Random(seed)
+    vocabulary = [
+        "squat", "deadlift", "protein", "membership", "trainer", "cardio",
+        "recovery", "hydration", "flexibility", "yoga", "zumba", "schedule",
+        "the", "and", "with", "for", "your", "every", "session", "weekly",
+    ]
+    target = int(megabytes * 1024 * 1024)
+    parts = []
+    size = 0
+    
+    while size < target:
+        sentence = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(5, 30)))
+        sentence = sentence.capitalize() + rng.choice([". ", "! ", "? ", ".\n\n"])
+        parts.append(sentence)
+        size += len(sentence)
+    
+    return "".join(parts)
+
+
+def build_unpunctuated(megabytes: float, seed: int = 7) -> str:
+    """Build a single long 'sentence' that forces word-level splitting."""
+    rng = random.Random(seed)
+    words = ["strength", "endurance", "mobility", "balance", "power"]
+    target = int(megabytes * 1024 * 1024)
+    parts = []
+    size = 0
+    
+    while size < target:
+        word = rng.choice(words)
+        parts.append(word)
+        size += len(word) + 1
+    
+    return " ".join(parts)
+
+
+def time_split(splitter: TextSplitter, text: str, repeat: int) -> float:
+    """Return the best wall-clock time over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        splitter.split_text(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_chunk_memory(splitter: TextSplitter, text: str) -> None:
+    """Compare peak memory of dictionary chunks against chunk spans."""
+    documents = [{"content": text, "metadata": {"source": "bench.md", "category": "general"}}]
+    
+    for name, split in [("dict chunks", splitter.split_documents),
+                        ("chunk spans", splitter.split_documents_to_spans)]:
+        tracemalloc.start()
+        chunks = split(documents)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>13}: {len(chunks)} chunks | held {current / 1e6:.1f} MB | peak {peak / 1e6:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=4.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    config = Config()
+    current = TextSplitter(config)
+    legacy = LegacyTextSplitter(config)
+    
+    inputs = {
+        "prose": build_corpus(args.megabytes),
+        "unpunctuated": build_unpunctuated(args.megabytes),
+    }
+    
+    print(f"chunk_size={config.chunk_size} chunk_overlap={config.chunk_overlap}")
+    for name, text in inputs.items():
+        # Both engines must agree chunk for chunk before timing means anything
+        if current.split_text(text) != legacy.split_text(text):
+            raise SystemExit(f"Chunk mismatch on '{name}' input")
+        
+        legacy_time = time_split(legacy, text, args.repeat)
+        current_time = time_split(current, text, args.repeat)
+        print(
+            f"{name:>13}: {len(text) / 1e6:.1f} MB | legacy {legacy_time:.3f}s | "
+            f"current {current_time:.3f}s | speedup {legacy_time / current_time:.1f}x"
+        )
+    
+    measure_chunk_memory(current, inputs["prose"])
+
+
+if __name__ == "__main__":
+    main()
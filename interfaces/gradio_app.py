@@ -4,18 +4,29 @@ import os
 import sys
 from pathlib import Path
 import gradio as gr
-from typing import List, Tuple, Optional
-import tim
+from typing import List, Tuple, Optional, Iterator
+import time
 
-e
 # Add src directory to Python path
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
 from src.config import Config
 from src.retrieval.retriever import DocumentRetriever
+from src.retrieval.working_set import WorkingSet
+from src.retrieval.faq_index import FAQIndex
+from src.retrieval.fact_store import FactStore
+from src.retrieval.fact_matcher import FactMatcher
 from src.generation.llm_manager import LLMManager
+from src.generation.semantic_cache import SemanticCache
+from src.generation.context_compressor import ContextCompressor
+from src.generation.extractive_answer import build_extractive_answer
+from src.generation.conversation_memory import ConversationMemory
+from src.generation.query_log import QueryLog
+from src.generation.answer_precomputer import AnswerPrecomputer
 from src.utils.document_loader import DocumentLoader
 from src.utils.text_splitter import TextSplitter
+from src.utils.deduplicator import ChunkDeduplicator
+from src.utils.deadline import Deadline, DeadlineExceeded
 
 
 class FitFlixGradioApp:
@@ -27,6 +38,12 @@ class FitFlixGradioApp:
         self.document_loader = None
         self.retriever = None
         self.llm_manager = None
+        self.semantic_cache = None
+        self.context_compressor = None
+        self.faq_index = None
+        self.fact_matcher = None
+        self.query_log = None
+        self.answer_precomputer = None
         self.is_initialized = False
         self.initialization_error = None
     
@@ -43,33 +60,68 @@ class FitFlixGradioApp:
             self.document_loader = DocumentLoader(self.config)
             self.retriever = DocumentRetriever(self.config)
             self.llm_manager = LLMManager(self.config)
+            if self.config.semantic_cache_enabled:
+                self.semantic_cache = SemanticCache(self.config)
             
             # Initialize retriever
             self.retriever.initialize()
+            if self.config.context_compression_enabled:
+                self.context_compressor = ContextCompressor(self.config, self.retriever.embedding_manager)
+            
+            # Index FAQ questions so exact FAQ matches skip the LLM
+            if self.config.faq_fast_path_enabled:
+                self.faq_index = FAQIndex(self.config, self.retriever.embedding_manager)
+                self.faq_index.build()
             
             # Check if documents exist in vector store
             stats = self.retriever.get_retrieval_stats()
             if stats.get('document_count', 0) == 0:
                 # Load and process documents
                 print("📚 Loading documents into vector store...")
-                documents = self.document_loader.load_all_documents()
-                
-                if not documents:
-                    return False, "❌ No documents found in knowledge base directory"
-                
-                # Split documents
                 text_splitter = TextSplitter(self.config)
-                chunked_docs = text_splitter.split_documents(documents)
+                deduplicator = ChunkDeduplicator(self.config) if self.config.dedup_enabled else None
+                summarize = None
+                if self.config.document_summary_use_llm:
+                    summary_words = self.config.document_summary_max_chars // 6
+                    summarize = lambda text: self.llm_manager.generate_summary(text, summary_words)
                 
-                # Add to vector store
-                doc_contents = [doc['content'] for doc in chunked_docs]
-                doc_metadata = [doc['metadata'] for doc in chunked_docs]
-                self.retriever.add_documents(doc_contents, doc_metadata)
+                # Stream the knowledge base in batches so it is never held in memory whole
+                chunk_count = 0
+                for documents in self.document_loader.iter_document_batches():
+                    # Split documents and merge near-duplicate chunks
+                    chunked_docs = text_splitter.split_documents_to_spans(documents)
+                    if deduplicator is not None:
+                        chunked_docs = deduplicator.deduplicate(chunked_docs)
+                    
+                    # Add to vector store
+                    self.retriever.add_chunks(chunked_docs)
+                    chunk_count += len(chunked_docs)
+                    
+                    # Index one summary per source document for coarse-to-fine retrieval
+                    self.retriever.add_document_summaries(documents, summarize)
+                
+                if chunk_count == 0:
+                    return False, "❌ No documents found in knowledge base directory"
                 
-                print(f"✅ Added {len(chunked_docs)} document chunks to vector store")
+                print(f"✅ Added {chunk_count} document chunks to vector store")
             else:
                 print(f"✅ Loaded existing vector store with {stats['document_count']} documents")
             
+            # Extract tabular facts so lookups skip retrieval and the LLM
+            if self.config.fact_store_enabled:
+                fact_store = FactStore(self.config)
+                if stats.get('document_count', 0) == 0 or fact_store.count() == 0:
+                    fact_store.build()
+                self.fact_matcher = FactMatcher(fact_store)
+            
+            # Answer the sample and most frequent questions ahead of time
+            if self.config.precompute_enabled:
+                self.query_log = QueryLog(self.config)
+                if self.config.response_cache_enabled:
+                    self.answer_precomputer = AnswerPrecomputer(self.config, self.retriever, self.llm_manager,
+                                                                self.context_compressor, self.query_log)
+                    self.answer_precomputer.ensure_warm(self.get_sample_questions())
+            
             self.is_initialized = True
             return True, f"✅ System initialized successfully! Ready to answer questions about fitness, nutrition, and wellness."
             
@@ -79,59 +131,189 @@ class FitFlixGradioApp:
             self.initialization_error = error_msg
             return False, error_msg
     
-    def chat_with_rag(self, message: str, history: List[List[str]]) -> Tuple[str, List[List[str]]]:
-        """Process chat message with RAG system.
+    def create_memory(self) -> Optional[ConversationMemory]:
+        """Create the conversation memory for a new chat session.
+        
+        Returns:
+            ConversationMemory, or None if disabled
+        """
+        if not self.config.memory_enabled:
+            return None
+        # Resolved per call, since the first message may arrive before initialization
+        return ConversationMemory(self.config, lambda text, words: self.llm_manager.generate_summary(text, words))
+    
+    def create_working_set(self) -> Optional[WorkingSet]:
+        """Create the retrieval working set for a new chat session.
+        
+        Returns:
+            WorkingSet, or None if disabled
+        """
+        return WorkingSet(self.config) if self.config.working_set_enabled else None
+    
+    def chat_with_rag(self, message: str, history: List[List[str]],
+                      memory: Optional[ConversationMemory] = None,
+                      working_set: Optional[WorkingSet] = None) -> Iterator[Tuple[str, List[List[str]]]]:
+        """Process chat message with RAG system, streaming the response.
         
         Args:
             message: User message
             history: Chat history
+            memory: Conversation memory of this chat session
+            working_set: Retrieval working set of this chat session
             
-        Returns:
-            Tuple of (response, updated_history)
+        Yields:
+            Tuples of (textbox value, updated_history) as the response grows
         """
         if not message.strip():
-            return "", history
+            yield "", history
+            return
         
         # Check if system is initialized
         if not self.is_initialized:
             success, init_message = self.initialize_system()
             if not success:
                 history.append([message, init_message])
-                return "", history
+                yield "", history
+                return
         
         try:
             # Retrieve relevant documents
             print(f"🔍 Processing query: {message[:50]}...")
             start_time = time.time()
+            deadline = Deadline(self.config.request_deadline)
+            index_generation = self.retriever.get_index_generation()
+            
+            # Follow-ups depend on earlier turns, so a cached standalone answer may not fit them
+            follow_up = memory is not None and memory.is_follow_up(message)
+            
+            # Re-warm precomputed answers after a re-index; log standalone questions for the next warm-up
+            if self.answer_precomputer is not None:
+                self.answer_precomputer.ensure_warm(self.get_sample_questions())
+            if self.query_log is not None and not follow_up:
+                self.query_log.record(message)
+            
+            # Answer price, plan, class and trainer lookups from the fact store
+            if self.fact_matcher is not None and not follow_up:
+                fact = self.fact_matcher.answer(message)
+                if fact:
+                    lookup_time = time.time() - start_time
+                    history.append([message, fact['answer'] +
+                                    f"\n\n*Sources: {', '.join(fact['sources'])} | Looked up in {lookup_time * 1000:.1f}ms*"])
+                    print(f"📋 Fact lookup ({fact['rule']}) in {lookup_time * 1000:.2f}ms")
+                    if memory is not None:
+                        memory.add_turn(message, fact['answer'])
+                    yield "", history
+                    return
+            
+            query_embedding = self.retriever.embedding_manager.embed_text(message)
+            
+            # Answer FAQ questions with their curated answer, without retrieval or generation
+            if self.faq_index is not None and not follow_up:
+                faq = self.faq_index.lookup(query_embedding)
+                if faq:
+                    lookup_time = time.time() - start_time
+                    history.append([message, faq['answer'] +
+                                    f"\n\n*Sources: {faq['source']} | Answered from FAQ in {lookup_time:.2f}s*"])
+                    print(f"📖 FAQ fast path hit (similarity {faq['similarity']:.2f}) in {lookup_time:.3f}s | "
+                          f"{self.faq_index.get_stats()['hits']} FAQ hits")
+                    if memory is not None:
+                        memory.add_turn(message, faq['answer'])
+                    yield "", history
+                    return
             
-            retrieved_docs = self.retriever.retrieve(message)
+            # Answer paraphrases of recent questions without retrieval or generation
+            if self.semantic_cache is not None and not follow_up:
+                cached = self.semantic_cache.lookup(query_embedding, index_generation)
+                if cached:
+                    lookup_time = time.time() - start_time
+                    history.append([message, cached['answer'] + 
+                                    f"\n\n*Sources: {', '.join(cached['sources'])} | Answered from cache in {lookup_time:.2f}s*"])
+                    print(f"⚡ Cache hit (similarity {cached['similarity']:.2f}) in {lookup_time:.3f}s | "
+                          f"hit rate {self.semantic_cache.get_stats()['hit_rate']:.0%}")
+                    if memory is not None:
+                        memory.add_turn(message, cached['answer'])
+                    yield "", history
+                    return
+            
+            # Follow-ups are usually answered by the previous turn's chunks
+            retrieved_docs = self.retriever.retrieve(message, query_embedding=query_embedding,
+                                                     working_set=working_set, follow_up=follow_up,
+                                                     deadline=deadline)
             retrieval_time = time.time() - start_time
             
             if not retrieved_docs:
                 response = "I couldn't find relevant information in our knowledge base. Could you please rephrase your question or ask about our fitness classes, nutrition, trainers, facilities, or membership options?"
                 history.append([message, response])
-                return "", history
+                yield "", history
+                return
+            
+            # Keep only the query-relevant sentences for the prompt
+            context_docs = retrieved_docs
+            if self.context_compressor is not None and not deadline.expired:
+                context_docs = self.context_compressor.compress(message, retrieved_docs, query_embedding)
             
-            # Generate response
+            # Stream response
+            history.append([message, ""])
             generation_start = time.time()
-            response = self.llm_manager.generate_response(message, retrieved_docs)
+            first_token_time = None
+            response = ""
+            degraded = False
+            
+            try:
+                # Leave time to assemble the fallback if the LLM is too slow
+                # Only follow-ups carry the conversation, so standalone questions share cache keys
+                for delta in self.llm_manager.stream_response(
+                        message, context_docs, index_generation=index_generation,
+                        deadline=deadline.reserve(self.config.deadline_fallback_reserve),
+                        conversation=memory.render() if follow_up else None):
+                    if first_token_time is None:
+                        first_token_time = time.time() - generation_start
+                    response += delta
+                    history[-1][1] = response
+                    yield "", history
+            except DeadlineExceeded:
+                response = build_extractive_answer(message, retrieved_docs, self.config.fallback_max_sentences)
+                degraded = True
+            
             generation_time = time.time() - generation_start
+            if first_token_time is None:
+                first_token_time = generation_time
             
             # Add source information
-            sources = list(set([doc['metadata'].get('source', 'Unknown') 
+            sources = list(set([doc['metadata'].get('sources') or doc['metadata'].get('source', 'Unknown') 
                               for doc in retrieved_docs[:3]]))
-            source_info = f"\n\n*Sources: {', '.join(sources)} | Retrieved in {retrieval_time:.2f}s, Generated in {generation_time:.2f}s*"
+            source_info = (f"\n\n*Sources: {', '.join(sources)} | Retrieved in {retrieval_time:.2f}s, "
+                           f"First token in {first_token_time:.2f}s, Generated in {generation_time:.2f}s*")
+            if degraded:
+                source_info += "\n\n*⚠️ Degraded: the model missed the response deadline, so this answer was extracted directly from the knowledge base.*"
             
-            final_response = response + source_info
-            history.append([message, final_response])
+            history[-1][1] = response + source_info
             
-            print(f"✅ Response generated in {retrieval_time + generation_time:.2f}s")
-            return "", history
+            if self.semantic_cache is not None and response and not degraded and not follow_up:
+                self.semantic_cache.store(message, query_embedding, response, sources, index_generation)
             
+            # Older turns are summarized in the background, after this response is sent
+            if memory is not None:
+                memory.add_turn(message, response)
+            
+            if degraded:
+                print(f"⚠️ Deadline exceeded; served extractive answer after {retrieval_time + generation_time:.2f}s")
+            rate_stats = self.llm_manager.get_model_info()['rate_limit']
+            queue_info = f", queued {rate_stats['last_queue_wait']:.2f}s for quota" if rate_stats else ""
+            print(f"✅ Response generated in {retrieval_time + generation_time:.2f}s "
+                  f"(first token after {retrieval_time + first_token_time:.2f}s{queue_info})")
+            yield "", history
+            
+        except DeadlineExceeded:
+            # Retrieval used up the request budget, so there is nothing to answer from
+            history.append([message, "⏱️ Sorry, searching the knowledge base took too long. Please try again in a moment."])
+            yield "", history
         except Exception as e:
             error_response = f"❌ Sorry, I encountered an error: {str(e)}\n\nPlease try again or contact support if the problem persists."
+            if history and history[-1][0] == message and not history[-1][1]:
+                history.pop()
             history.append([message, error_response])
-            return "", history
+            yield "", history
     
     def get_sample_questions(self) -> List[str]:
         """Get sample questions for the interface.
@@ -223,17 +405,27 @@ class FitFlixGradioApp:
                     </div>
                     """)
             
+            # Per-session conversation memory and retrieval working set, created on the first message
+            memory_state = gr.State(None)
+            working_set_state = gr.State(None)
+            
             # Event handlers
-            def respond(message, history):
-                return self.chat_with_rag(message, history)
+            def respond(message, history, memory, working_set):
+                if memory is None:
+                    memory = self.create_memory()
+                if working_set is None:
+                    working_set = self.create_working_set()
+                for textbox, updated_history in self.chat_with_rag(message, history, memory, working_set):
+                    yield textbox, updated_history, memory, working_set
             
-            msg.submit(respond, [msg, chatbot], [msg, chatbot])
-            send_btn.click(respond, [msg, chatbot], [msg, chatbot])
+            session = [msg, chatbot, memory_state, working_set_state]
+            msg.submit(respond, session, session)
+            send_btn.click(respond, session, session)
             
             # Clear button
             with gr.Row():
                 clear_btn = gr.Button("🗑️ Clear Chat", variant="secondary")
-                clear_btn.click(lambda: ([], ""), outputs=[chatbot, msg])
+                clear_btn.click(lambda: ([], "", None, None), outputs=[chatbot, msg, memory_state, working_set_state])
         
         return interface
     
@@ -245,6 +437,9 @@ class FitFlixGradioApp:
         """
         interface = self.create_interface()
         
+        # Generator handlers stream through the queue
+        interface.queue()
+        
         # Default launch settings
         launch_kwargs = {
             "server_name": "0.0.0.0",
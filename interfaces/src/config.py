@@ -40,16 +40,112 @@ class Config:
         
         # Model settings
         self.llm_model = "gemini-1.5-flash"
+        self.llm_backend = os.getenv("LLM_BACKEND")  # None infers the backend from llm_model
         self.embedding_model = "all-MiniLM-L6-v2"
         
+        # OpenAI-compatible backend settings
+        self.openai_api_key = os.getenv("OPENAI_API_KEY")
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        self.openai_timeout = 60
+        
+        # Stub backend settings (local, deterministic, for load tests)
+        self.stub_response_template = "Stub answer to: {question}"
+        self.stub_latency = 0.0
+        self.stub_tokens_per_second = 0
+        
         # Text processing settings
         self.chunk_size = 1000
         self.chunk_overlap = 200
         
+        # Deduplication settings
+        self.dedup_enabled = True
+        self.dedup_num_perm = 128
+        self.dedup_bands = 16
+        self.dedup_threshold = 0.8
+        self.dedup_shingle_size = 3
+        
+        # Document loading settings
+        self.loader_max_workers = 8
+        self.parser_max_workers = 4
+        self.pdf_pages_per_task = 16
+        self.markdown_split_sections = True
+        self.ingest_batch_documents = 256
+        self.scan_include = ["*.md", "*.txt", "*.pdf", "*.docx"]
+        self.scan_exclude = [".*/", "__pycache__/", "*-checkpoint.*"]
+        self.scan_cache_path = self.processed_dir / "scan_cache.json"
+        
         # Retrieval settings
         self.retrieval_top_k = 5
         self.similarity_threshold = 0.7
+        self.working_set_enabled = True
+        self.working_set_threshold = 0.6
+        self.working_set_follow_up_threshold = 0.25
+        self.document_index_enabled = True
+        self.document_index_top_m = 3  # Source documents searched per query
+        self.document_summary_max_chars = 1500
+        self.document_summary_use_llm = False  # One LLM call per source document at ingest
+        self.faq_fast_path_enabled = True
+        self.faq_path = self.knowledge_base_dir / "faq.md"
+        self.faq_match_threshold = 0.9  # Curated answers are returned verbatim, so only near-identical questions match
+        self.fact_store_enabled = True
+        self.fact_store_path = self.processed_dir / "facts.sqlite3"
+        self.fact_sources = ["classes.md", "membership.md", "trainers.md"]
+        self.entity_index_enabled = True
+        self.entity_sources = ["classes.md", "trainers.md", "facilities.md"]
+        self.entity_max_chunks = 3  # Chunks added to results per query for named entities
         
         # Generation settings
         self.max_tokens = 1000
-        self.temperature = 0.7
\ No newline at end of file
+        self.temperature = 0.7
+        self.context_token_budget = 1500
+        self.context_merge_adjacent = True
+        self.context_compression_enabled = False
+        self.context_compression_ratio = 0.5
+        self.context_compression_neighbours = 1
+        
+        # LLM client settings
+        self.llm_max_concurrency = 8
+        self.llm_timeout = 30.0
+        self.llm_max_retries = 3
+        self.llm_retry_base_delay = 0.5
+        self.llm_retry_max_delay = 8.0
+        self.llm_breaker_failure_threshold = 5
+        self.llm_breaker_reset_timeout = 30.0
+        self.rate_limit_enabled = True
+        self.llm_requests_per_minute = 15  # Match the API key's quota
+        self.llm_tokens_per_minute = 1_000_000
+        
+        # Summarization settings
+        self.summary_map_reduce_enabled = True
+        self.summary_chunk_size = 4000  # Characters per map chunk
+        self.summary_chunk_overlap = 200
+        self.summary_fan_in = 4
+        self.summary_max_concurrency = 4
+        self.summary_cache_size = 512
+        
+        # Conversation memory settings
+        self.memory_enabled = True
+        self.memory_token_budget = 600
+        self.memory_recent_turns = 3
+        self.memory_summary_words = 120
+        self.chat_history_limit = 50
+        
+        # Deadline settings
+        self.request_deadline = 3.0  # Seconds per chat request; None disables
+        self.deadline_fallback_reserve = 0.25
+        self.fallback_max_sentences = 3
+        
+        # Precompute settings
+        self.precompute_enabled = True
+        self.precompute_top_queries = 20  # Most frequent logged questions warmed per index generation
+        self.query_log_path = self.processed_dir / "query_log.sqlite3"
+        
+        # Caching settings
+        self.response_cache_enabled = True
+        self.response_cache_path = self.processed_dir / "response_cache.sqlite3"
+        self.response_cache_size = 256
+        self.response_cache_ttl = 24 * 60 * 60
+        self.semantic_cache_enabled = True
+        self.semantic_cache_threshold = 0.92
+        self.semantic_cache_size = 500
+        self.semantic_cache_ttl = 6 * 60 * 60
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""Answer precomputation for FIT-FLIX RAG System."""
+
+import logging
+import threading
+from typing import List, Optional
+from ..config import Config
+from .rate_scheduler import PRIORITY_BATCH
+from .response_cache import normalize_query
+
+
+class AnswerPrecomputer:
+    """Answers the most common questions ahead of time.
+
+    Each question runs through the same retrieval, compression and
+    generation as a standalone chat request, which the UIs send without
+    the conversation and answer from a full index search. Its answer
+    therefore lands in the response cache under the key a later click
+    will look up, at any turn of a session, tagged with the index
+    generation. Warming runs in the background at batch priority
+    and again whenever the index generation changes.
+    """
+
+    def __init__(self, config: Optional[Config], retriever, llm_manager,
+                 context_compressor=None, query_log=None):
+        """Initialize the precomputer.
+
+        Args:
+            config: Configuration object
+            retriever: Initialized DocumentRetriever
+            llm_manager: LLMManager whose response cache is warmed
+            context_compressor: ContextCompressor used by chat requests, if any
+            query_log: QueryLog supplying the most frequent questions, if any
+        """
+        self.config = config or Config()
+        self.retriever = retriever
+        self.llm_manager = llm_manager
+        self.context_compressor = context_compressor
+        self.query_log = query_log
+        self.top_queries = self.config.precompute_top_queries
+        self.logger = logging.getLogger(__name__)
+
+        self.generation: Optional[int] = None  # Index generation last warmed
+        self.answered = 0
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def get_questions(self, sample_questions: List[str]) -> List[str]:
+        """Combine the sample questions with the most frequent logged ones.
+
+        Args:
+            sample_questions: Questions advertised by the interface
+
+        Returns:
+            Questions to precompute, without normalized duplicates
+        """
+        questions = list(sample_questions)
+        if self.query_log is not None:
+            questions.extend(self.query_log.top(self.top_queries))
+
+        seen = set()
+        unique = []
+        for question in questions:
+            normalized = normalize_query(question)
+            if normalized and normalized not in seen:
+                seen.add(normalized)
+                unique.append(question)
+        return unique
+
+    def run(self, questions: List[str]) -> int:
+        """Answer questions into the response cache for the current index.
+
+        Args:
+            questions: Questions to answer
+
+        Returns:
+            Number of questions answered
+        """
+        generation = self.retriever.get_index_generation()
+        answered = 0
+
+        for question in questions:
+            try:
+                query_embedding = self.retriever.embedding_manager.embed_text(question)
+                documents = self.retriever.retrieve(question, query_embedding=query_embedding)
+                if not documents:
+                    continue
+                if self.context_compressor is not None:
+                    documents = self.context_compressor.compress(question, documents, query_embedding)
+
+                self.llm_manager.generate_response(question, documents, index_generation=generation,
+                                                   priority=PRIORITY_BATCH)
+                answered += 1
+            except Exception as e:
+                self.logger.warning(f"Failed to precompute answer for '{question[:50]}': {str(e)}")
+
+        self.generation = generation
+        self.answered += answered
+        self.logger.info(f"Precomputed {answered} of {len(questions)} answers for index generation {generation}")
+        return answered
+
+    def ensure_warm(self, sample_questions: List[str]) -> bool:
+        """Start warming in the background unless the current index is already warm.
+
+        Cheap enough to call on every request: it only compares index
+        generations.
+
+        Args:
+            sample_questions: Questions advertised by the interface
+
+        Returns:
+            True if a warming job was started
+        """
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return False
+            if self.generation == self.retriever.get_index_generation():
+                return False
+
+            questions = self.get_questions(sample_questions)
+            self._worker = threading.Thread(target=self.run, args=(questions,), daemon=True)
+            self._worker.start()
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for a running warming job to finish.
+
+        Args:
+            timeout: Seconds to wait (forever if None)
+        """
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
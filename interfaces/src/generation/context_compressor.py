@@ -0,0 +1,157 @@
+"""Extractive context compression for FIT-FLIX RAG System."""
+
+import logging
+import re
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from ..config import Config
+
+
+# Whitespace after sentence-ending punctuation, or line breaks
+SENTENCE_SEPARATOR_PATTERN = re.compile(r'(?<=[.!?])\s+|\s*\n\s*')
+GAP_MARKER = " ... "
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """Split text into sentence spans.
+
+    Lines count as sentences too, so list items stay separate.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of (start, end) offsets of non-empty sentences
+    """
+    spans = []
+    start = 0
+    for match in SENTENCE_SEPARATOR_PATTERN.finditer(text):
+        if match.start() > start:
+            spans.append((start, match.start()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+class ContextCompressor:
+    """Keeps only the sentences of retrieved chunks that matter for a query."""
+
+    def __init__(self, config: Optional[Config] = None, embedding_manager=None,
+                 ratio: Optional[float] = None, neighbours: Optional[int] = None):
+        """Initialize the context compressor.
+
+        Args:
+            config: Configuration object
+            embedding_manager: EmbeddingManager used to embed sentences
+            ratio: Fraction of context characters to keep (uses config default if None)
+            neighbours: Sentences kept on each side of a selected one (uses config default if None)
+        """
+        self.config = config or Config()
+        self.embedding_manager = embedding_manager
+        self.ratio = ratio if ratio is not None else self.config.context_compression_ratio
+        self.neighbours = neighbours if neighbours is not None else self.config.context_compression_neighbours
+        self.logger = logging.getLogger(__name__)
+
+    def compress(self, query: str, documents: List[Dict[str, Any]],
+                 query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """Cut retrieved documents down to their most query-relevant sentences.
+
+        Every sentence is embedded in one batch and scored against the
+        query with a single matrix product. Sentences are taken best first,
+        each with its neighbours, until the kept text reaches the ratio.
+        A section's header path line is kept whenever any of its sentences
+        is. Documents left without sentences are dropped.
+
+        Args:
+            query: User query
+            documents: Retrieved documents
+            query_embedding: Precomputed query embedding (computed if None)
+
+        Returns:
+            Documents with compressed content, in the original order
+        """
+        sentences = []  # (document index, sentence index, start, end)
+        spans_by_document = []
+        for doc_index, document in enumerate(documents):
+            spans = split_sentences(document['content'])
+            spans_by_document.append(spans)
+            sentences.extend((doc_index, i, start, end) for i, (start, end) in enumerate(spans))
+
+        if len(sentences) <= 1:
+            return documents
+
+        try:
+            if query_embedding is None:
+                query_embedding = self.embedding_manager.embed_text(query)
+            texts = [documents[d]['content'][start:end] for d, _, start, end in sentences]
+            scores = self._score(query_embedding, self.embedding_manager.embed_texts(texts))
+        except Exception as e:
+            self.logger.warning(f"Context compression skipped: {str(e)}")
+            return documents
+
+        total_chars = sum(end - start for _, _, start, end in sentences)
+        budget = total_chars * self.ratio
+        kept = [set() for _ in documents]
+        kept_chars = 0
+
+        for index in np.argsort(-scores, kind='stable'):
+            if kept_chars >= budget:
+                break
+            doc_index, sentence_index, _, _ = sentences[index]
+            spans = spans_by_document[doc_index]
+            low = max(sentence_index - self.neighbours, 0)
+            high = min(sentence_index + self.neighbours, len(spans) - 1)
+            for i in range(low, high + 1):
+                if i not in kept[doc_index]:
+                    kept[doc_index].add(i)
+                    kept_chars += spans[i][1] - spans[i][0]
+
+        compressed = []
+        for document, spans, keep in zip(documents, spans_by_document, kept):
+            if not keep:
+                continue
+            header_path = document.get('metadata', {}).get('header_path')
+            if header_path and document['content'].startswith(header_path):
+                keep.add(0)
+            compressed.append({**document, 'content': self._assemble(document['content'], spans, sorted(keep))})
+
+        self.logger.info(f"Compressed context from {total_chars} to "
+                         f"{sum(len(doc['content']) for doc in compressed)} characters")
+        return compressed
+
+    def _score(self, query_embedding: List[float], sentence_embeddings: List[List[float]]) -> np.ndarray:
+        """Cosine similarity of every sentence to the query.
+
+        Args:
+            query_embedding: Query embedding
+            sentence_embeddings: One embedding per sentence
+
+        Returns:
+            Array of similarities
+        """
+        matrix = np.asarray(sentence_embeddings, dtype=np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        return (matrix @ query) / np.where(norms == 0, 1, norms)
+
+    def _assemble(self, content: str, spans: List[Tuple[int, int]], keep: List[int]) -> str:
+        """Rebuild text from kept sentences, marking skipped stretches.
+
+        Args:
+            content: Original content
+            spans: Sentence spans of the content
+            keep: Indices of kept sentences, ascending
+
+        Returns:
+            Compressed text
+        """
+        parts = [] if keep[0] == 0 else [GAP_MARKER.lstrip()]
+        for previous, current in zip([None] + keep, keep):
+            if previous is not None:
+                # Adjacent sentences keep their original separator
+                parts.append(content[spans[previous][1]:spans[current][0]] if current == previous + 1 else GAP_MARKER)
+            parts.append(content[spans[current][0]:spans[current][1]])
+        if keep[-1] != len(spans) - 1:
+            parts.append(GAP_MARKER.rstrip())
+        return "".join(parts)
@@ -0,0 +1,200 @@
+"""Token-budgeted context packing for FIT-FLIX RAG System."""
+
+import logging
+import re
+from typing import List, Dict, Any, Optional, Tuple
+from ..config import Config
+
+
+# Word runs and individual punctuation marks
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+MIN_OVERLAP_CHARS = 10
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in a text without a tokenizer.
+
+    Punctuation marks count as one token each and words as one token per
+    four characters, which tracks SentencePiece-style tokenizers closely
+    on English prose.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return sum((len(token) + 3) // 4 for token in TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text: str, token_budget: int) -> str:
+    """Cut text to roughly a token budget at a word boundary.
+
+    Args:
+        text: Text to cut
+        token_budget: Maximum tokens
+
+    Returns:
+        Truncated text
+    """
+    used = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        used += (len(match.group()) + 3) // 4
+        if used > token_budget:
+            return text[:match.start()].rstrip()
+    return text
+
+
+def document_score(document: Dict[str, Any]) -> float:
+    """Get the relevance score of a retrieved document.
+
+    Args:
+        document: Retrieved document
+
+    Returns:
+        Its similarity, or the negated distance when only that is known
+    """
+    if document.get('similarity') is not None:
+        return document['similarity']
+    if document.get('distance') is not None:
+        return -document['distance']
+    return 0.0
+
+
+class ContextPacker:
+    """Packs retrieved chunks into a prompt context under a token budget."""
+
+    def __init__(self, config: Optional[Config] = None, token_budget: Optional[int] = None):
+        """Initialize the context packer.
+
+        Args:
+            config: Configuration object
+            token_budget: Maximum context tokens (uses config default if None)
+        """
+        self.config = config or Config()
+        self.token_budget = token_budget or self.config.context_token_budget
+        self.merge_adjacent = self.config.context_merge_adjacent
+        self.logger = logging.getLogger(__name__)
+
+    def pack(self, documents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Select, merge and order documents to fit the token budget.
+
+        Documents are ranked by score. Neighbouring chunks of the same
+        source are merged into one passage without their shared overlap,
+        and passages are then taken greedily while they fit. The best
+        passage is always kept, truncated if it alone exceeds the budget.
+
+        Args:
+            documents: Retrieved documents
+
+        Returns:
+            Tuple of (packed documents in score order, stats with
+            tokens_used, tokens_dropped, documents_used and documents_dropped)
+        """
+        ranked = sorted(documents, key=document_score, reverse=True)
+        passages = self._merge_adjacent(ranked) if self.merge_adjacent else ranked
+
+        packed = []
+        used = dropped = documents_dropped = 0
+
+        for passage in passages:
+            tokens = estimate_tokens(passage['content'])
+            if used + tokens <= self.token_budget:
+                packed.append(passage)
+                used += tokens
+            elif not packed:
+                content = truncate_to_tokens(passage['content'], self.token_budget)
+                packed.append({**passage, 'content': content})
+                used = estimate_tokens(content)
+                dropped += tokens - used
+            else:
+                dropped += tokens
+                documents_dropped += len(passage.get('merged_ids', [None]))
+
+        stats = {
+            'tokens_used': used,
+            'tokens_dropped': dropped,
+            'documents_used': len(documents) - documents_dropped,
+            'documents_dropped': documents_dropped
+        }
+        self.logger.info(f"Packed context: {used} tokens used, {dropped} dropped ({documents_dropped} documents)")
+        return packed, stats
+
+    def _merge_adjacent(self, ranked: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge consecutive chunks of the same source document.
+
+        A merged passage takes the rank of its best chunk.
+
+        Args:
+            ranked: Documents in score order
+
+        Returns:
+            Passages in score order
+        """
+        groups: Dict[Tuple, List[Dict[str, Any]]] = {}
+        order = []
+
+        for document in ranked:
+            metadata = document.get('metadata', {})
+            if 'chunk_id' not in metadata:
+                order.append([document])
+                continue
+
+            key = (metadata.get('file_path', metadata.get('source')), metadata.get('section'), metadata.get('page'))
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = []
+                order.append(group)
+            group.append(document)
+
+        passages = []
+        for group in order:
+            if 'chunk_id' not in group[0].get('metadata', {}):
+                passages.append(group[0])
+                continue
+
+            group.sort(key=lambda document: document['metadata']['chunk_id'])
+            run = [group[0]]
+            for document in group[1:]:
+                if document['metadata']['chunk_id'] == run[-1]['metadata']['chunk_id'] + 1:
+                    run.append(document)
+                else:
+                    passages.append(self._join(run))
+                    run = [document]
+            passages.append(self._join(run))
+
+        passages.sort(key=document_score, reverse=True)
+        return passages
+
+    def _join(self, run: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Join consecutive chunks, dropping the text each repeats from the last."""
+        if len(run) == 1:
+            return run[0]
+
+        content = run[0]['content']
+        for document in run[1:]:
+            content = self._append_without_overlap(content, document['content'])
+
+        best = max(run, key=document_score)
+        return {
+            **best,
+            'content': content,
+            'merged_ids': [document.get('id') for document in run]
+        }
+
+    def _append_without_overlap(self, text: str, following: str) -> str:
+        """Append text, skipping the longest prefix that repeats the current ending.
+
+        Args:
+            text: Text so far
+            following: Next chunk, which may start with the end of text
+
+        Returns:
+            Combined text
+        """
+        limit = min(len(text), len(following), self.config.chunk_overlap * 2)
+        # Short or mid-word matches are coincidence, not chunk overlap
+        for size in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+            if text.endswith(following[:size]) and (size == len(text) or text[-size - 1].isspace()):
+                return text + following[size:]
+        return f"{text} {following}"
@@ -0,0 +1,185 @@
+"""Multi-turn conversation memory for FIT-FLIX RAG System."""
+
+import logging
+import re
+import threading
+from typing import Callable, List, Optional, Tuple
+from ..config import Config
+from .context_packer import estimate_tokens, truncate_to_tokens
+
+
+# Pronouns that usually point back at something said earlier in the conversation
+ANAPHORA_PATTERN = re.compile(r"\b(it|its|that|those|these|they|them|he|she|him|her|his)\b", re.IGNORECASE)
+# Queries opening with a pronoun or determiner ("That one sounds good", "Those are open late?")
+LEADING_ANAPHORA_PATTERN = re.compile(r"^\W*(it|its|that|those|these|they|them|he|she|his|her)\b", re.IGNORECASE)
+# Openers that continue the previous question ("And on weekends?", "What about Zumba?")
+FOLLOW_UP_OPENER_PATTERN = re.compile(
+    r"^\W*(and|also|what about|how about|what else|tell me more|why)\b", re.IGNORECASE
+)
+# Longer queries usually name what their pronouns refer to themselves
+SHORT_QUERY_WORDS = 6
+
+
+class ConversationMemory:
+    """Keeps a conversation within a fixed prompt budget.
+
+    The most recent turns are kept verbatim. Older turns are folded into
+    a rolling summary by a background thread, so adding a turn never
+    waits on the LLM and the rendered history never outgrows the budget.
+    """
+
+    def __init__(self, config: Optional[Config] = None,
+                 summarizer: Optional[Callable[[str, int], str]] = None,
+                 token_budget: Optional[int] = None,
+                 recent_turns: Optional[int] = None):
+        """Initialize an empty conversation.
+
+        Args:
+            config: Configuration object
+            summarizer: Function(text, max_words) returning a summary, such as
+                LLMManager.generate_summary (older turns are dropped if None)
+            token_budget: Maximum tokens of rendered history (uses config default if None)
+            recent_turns: Turns kept verbatim (uses config default if None)
+        """
+        self.config = config or Config()
+        self.summarizer = summarizer
+        self.token_budget = token_budget or self.config.memory_token_budget
+        self.recent_turns = recent_turns or self.config.memory_recent_turns
+        self.summary_words = self.config.memory_summary_words
+        self.logger = logging.getLogger(__name__)
+
+        self.summary = ""
+        self._turns: List[Tuple[str, str]] = []
+        self._pending: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._cleared = 0  # Lets a running summarization notice it is stale
+
+    def has_history(self) -> bool:
+        """Whether anything has been said yet."""
+        return bool(self._turns or self._pending or self.summary)
+
+    def is_follow_up(self, query: str) -> bool:
+        """Guess whether a query depends on earlier turns to make sense.
+
+        Only anaphora without an antecedent in the query itself counts: a
+        continuing opener, a leading pronoun, or a pronoun in a short
+        query. "Is there a pool?" or "What are their timings for yoga
+        classes this week?" stand on their own.
+
+        Args:
+            query: User query
+
+        Returns:
+            True if there is history and the query refers back to it
+        """
+        if not self.has_history():
+            return False
+        if FOLLOW_UP_OPENER_PATTERN.search(query) or LEADING_ANAPHORA_PATTERN.search(query):
+            return True
+        return len(query.split()) <= SHORT_QUERY_WORDS and ANAPHORA_PATTERN.search(query) is not None
+
+    def add_turn(self, question: str, answer: str) -> None:
+        """Record a completed turn.
+
+        Turns pushed out of the verbatim window are summarized in the
+        background.
+
+        Args:
+            question: User question
+            answer: Assistant answer
+        """
+        with self._lock:
+            self._turns.append((question, answer))
+            while len(self._turns) > self.recent_turns:
+                self._pending.append(self._turns.pop(0))
+
+            if self._pending and self._worker is None:
+                self._worker = threading.Thread(target=self._summarize_pending, daemon=True)
+                self._worker.start()
+
+    def render(self) -> str:
+        """Render the conversation for a prompt, within the token budget.
+
+        The summary gets at most a third of the budget; the remaining
+        budget goes to recent turns, newest first.
+
+        Returns:
+            Conversation text, or an empty string without history
+        """
+        with self._lock:
+            summary = self.summary
+            turns = list(self._turns)
+
+        parts = []
+        remaining = self.token_budget
+        if summary:
+            summary = truncate_to_tokens(summary, self.token_budget // 3)
+            parts.append(f"Summary of earlier conversation: {summary}")
+            remaining -= estimate_tokens(parts[0])
+
+        recent = []
+        for question, answer in reversed(turns):
+            turn = f"User: {question}\nAssistant: {answer}"
+            tokens = estimate_tokens(turn)
+            if tokens > remaining:
+                # Keep the start of the newest turn that does not fit, then stop
+                turn = truncate_to_tokens(turn, remaining)
+                if turn:
+                    recent.append(turn)
+                break
+            recent.append(turn)
+            remaining -= tokens
+
+        parts.extend(reversed(recent))
+        return "\n\n".join(parts)
+
+    def clear(self) -> None:
+        """Forget the conversation."""
+        with self._lock:
+            self.summary = ""
+            self._turns.clear()
+            self._pending.clear()
+            self._cleared += 1
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for background summarization to finish.
+
+        Args:
+            timeout: Seconds to wait (forever if None)
+        """
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def _summarize_pending(self) -> None:
+        """Fold pending turns into the summary until none are left."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    # Cleared under the lock, so add_turn starts a new worker when needed
+                    self._worker = None
+                    return
+                pending = self._pending
+                self._pending = []
+                previous = self.summary
+                cleared = self._cleared
+
+            transcript = "\n".join(f"User: {question}\nAssistant: {answer}" for question, answer in pending)
+            text = f"{previous}\n\n{transcript}" if previous else transcript
+
+            summary = None
+            if self.summarizer is not None:
+                try:
+                    summary = self.summarizer(text, self.summary_words).strip()
+                except Exception as e:
+                    self.logger.warning(f"Conversation summarization failed: {str(e)}")
+
+            if not summary:
+                # Without a summary, remember at least what was asked
+                asked = "; ".join(question for question, _ in pending)
+                summary = f"{previous} Earlier the user asked: {asked}".strip()
+
+            with self._lock:
+                if cleared == self._cleared:
+                    self.summary = truncate_to_tokens(summary, self.token_budget // 3)
@@ -0,0 +1,64 @@
+"""Extractive fallback answers for FIT-FLIX RAG System."""
+
+import re
+from typing import List, Dict, Any
+from .context_compressor import split_sentences
+
+
+WORD_PATTERN = re.compile(r'\w+')
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'can', 'do', 'does', 'for', 'how', 'i', 'in', 'is', 'it',
+    'me', 'my', 'of', 'on', 'or', 'the', 'to', 'what', 'when', 'where', 'which', 'who',
+    'why', 'with', 'you', 'your'
+}
+FALLBACK_INTRO = "I couldn't put together a full answer in time, but here is what our knowledge base says:"
+
+
+def query_terms(text: str) -> set:
+    """Get the lowercased content words of a text."""
+    return {word for word in WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS}
+
+
+def build_extractive_answer(query: str, documents: List[Dict[str, Any]], max_sentences: int = 3) -> str:
+    """Answer from retrieved chunks alone, without calling the LLM.
+
+    Sentences are scored by how many query terms they contain, with ties
+    going to higher-ranked documents and earlier sentences. Section
+    header lines are skipped since they carry no facts of their own.
+
+    Args:
+        query: User query
+        documents: Retrieved documents, best first
+        max_sentences: Sentences to include
+
+    Returns:
+        Answer listing the best-matching sentences with their sources
+    """
+    terms = query_terms(query)
+    candidates = []
+
+    for rank, document in enumerate(documents):
+        content = document['content']
+        metadata = document.get('metadata', {})
+        source = metadata.get('sources') or metadata.get('source', 'Unknown')
+        for position, (start, end) in enumerate(split_sentences(content)):
+            sentence = content[start:end].strip(' -*#')
+            if not sentence or sentence == metadata.get('header_path'):
+                continue
+            score = len(terms & query_terms(sentence))
+            candidates.append((-score, rank, position, sentence, source))
+
+    if not candidates:
+        return "I couldn't find relevant information in our knowledge base in time. Please try again."
+
+    candidates.sort()
+    lines = [FALLBACK_INTRO, ""]
+    seen = set()
+    for _, _, _, sentence, source in candidates:
+        if sentence in seen:
+            continue
+        seen.add(sentence)
+        lines.append(f"- {sentence} ({source})")
+        if len(seen) == max_sentences:
+            break
+    return "\n".join(lines)
@@ -0,0 +1,383 @@
+"""LLM backends for FIT-FLIX RAG System."""
+
+import asyncio
+import itertools
+import json
+import logging
+import re
+import time
+import weakref
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterator, Optional, Type
+import requests
+import google.generativeai as genai
+from ..config import Config
+from ..utils.resilience import CircuitBreaker, RetryPolicy
+
+
+# Words with their trailing whitespace, so streamed tokens rejoin exactly
+STREAM_TOKEN_PATTERN = re.compile(r'\S+\s*|\s+')
+QUESTION_PATTERN = re.compile(r'^User Question: (.*)$', re.MULTILINE)
+
+BACKENDS: Dict[str, Type["LLMBackend"]] = {}
+
+
+def register_backend(name: str) -> Callable[[Type["LLMBackend"]], Type["LLMBackend"]]:
+    """Register an LLM backend class under a name.
+
+    Args:
+        name: Backend name used in ``Config.llm_backend``
+
+    Returns:
+        Class decorator
+    """
+    def decorator(backend_class: Type["LLMBackend"]) -> Type["LLMBackend"]:
+        backend_class.name = name
+        BACKENDS[name] = backend_class
+        return backend_class
+    return decorator
+
+
+def create_backend(config: Config, model_name: Optional[str] = None) -> "LLMBackend":
+    """Create the backend for a model.
+
+    ``config.llm_backend`` picks the backend explicitly; otherwise it is
+    inferred from the model name.
+
+    Args:
+        config: Configuration object
+        model_name: Model name (uses config default if None)
+
+    Returns:
+        Uninitialized backend
+
+    Raises:
+        ValueError: If no backend serves the model
+    """
+    model_name = model_name or config.llm_model
+    name = config.llm_backend
+    if not name:
+        lowered = model_name.lower()
+        if "gemini" in lowered:
+            name = "gemini"
+        elif "gpt" in lowered:
+            name = "openai"
+        elif lowered.startswith("stub"):
+            name = "stub"
+        else:
+            raise ValueError(f"Unsupported model: {model_name}")
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name}")
+    return BACKENDS[name](config, model_name)
+
+
+class LLMBackend(ABC):
+    """Interface every LLM backend implements.
+
+    ``generate`` and ``stream`` are blocking and must be implemented;
+    ``agenerate`` is the asyncio entry point and by default runs
+    ``generate`` in a worker thread.
+    """
+
+    name = "base"
+
+    def __init__(self, config: Config, model_name: str):
+        """Initialize the backend.
+
+        Args:
+            config: Configuration object
+            model_name: Model name
+        """
+        self.config = config
+        self.model_name = model_name
+        self.logger = logging.getLogger(__name__)
+
+    def initialize(self) -> None:
+        """Set up clients; raises if the backend is not usable."""
+
+    @abstractmethod
+    def generate(self, prompt: str, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None) -> str:
+        """Generate a complete response.
+
+        Args:
+            prompt: Full prompt
+            temperature: Sampling temperature (model default if None)
+            max_tokens: Maximum output tokens (model default if None)
+
+        Returns:
+            Response text
+        """
+
+    @abstractmethod
+    def stream(self, prompt: str, temperature: Optional[float] = None,
+               max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Generate a response, yielding text as it arrives.
+
+        Args:
+            prompt: Full prompt
+            temperature: Sampling temperature (model default if None)
+            max_tokens: Maximum output tokens (model default if None)
+
+        Yields:
+            Text deltas
+        """
+
+    async def agenerate(self, prompt: str, temperature: Optional[float] = None,
+                        max_tokens: Optional[int] = None) -> str:
+        """Generate a complete response without blocking the event loop.
+
+        Args:
+            prompt: Full prompt
+            temperature: Sampling temperature (model default if None)
+            max_tokens: Maximum output tokens (model default if None)
+
+        Returns:
+            Response text
+        """
+        return await asyncio.to_thread(self.generate, prompt, temperature, max_tokens)
+
+
+@register_backend("gemini")
+class GeminiBackend(LLMBackend):
+    """Google Gemini through the google-generativeai SDK.
+
+    Rate limits, timeouts and server errors are retried with jittered
+    exponential backoff, and a circuit breaker fails calls fast while
+    the API keeps failing. The async path also caps concurrent calls
+    and bounds each call with a timeout.
+    """
+
+    def __init__(self, config: Config, model_name: str):
+        super().__init__(config, model_name)
+        self.model = None
+        self.breaker = CircuitBreaker(self.config.llm_breaker_failure_threshold,
+                                      self.config.llm_breaker_reset_timeout)
+        self.retry_policy = RetryPolicy(self.config.llm_max_retries, self.config.llm_retry_base_delay,
+                                        self.config.llm_retry_max_delay, self.breaker)
+        # asyncio primitives belong to one event loop, so keep one semaphore per live loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    def initialize(self) -> None:
+        """Configure the SDK and create the model."""
+        if not self.config.google_api_key:
+            raise ValueError("Google API key not provided")
+
+        genai.configure(api_key=self.config.google_api_key)
+        self.model = genai.GenerativeModel(self.model_name)
+
+    def generate(self, prompt: str, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None) -> str:
+        """Generate a complete response with Gemini."""
+        try:
+            return self.retry_policy.call(self._generate_once, prompt, temperature, max_tokens)
+
+        except Exception as e:
+            self.logger.error(f"Gemini generation failed: {str(e)}")
+            raise
+
+    def _generate_once(self, prompt: str, temperature: Optional[float], max_tokens: Optional[int]) -> str:
+        """Make a single blocking generation call."""
+        response = self.model.generate_content(
+            prompt,
+            generation_config=self._generation_config(temperature, max_tokens)
+        )
+        return response.text
+
+    def stream(self, prompt: str, temperature: Optional[float] = None,
+               max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Stream response text from Gemini.
+
+        Failures before the first chunk are retried; once text has been
+        yielded the stream cannot be replayed, so later failures propagate.
+        """
+        try:
+            response = self.retry_policy.call(self._start_stream, prompt, temperature, max_tokens)
+            for chunk in response:
+                # The final chunk may only carry the finish reason
+                if chunk.parts:
+                    yield chunk.text
+
+        except Exception as e:
+            self.logger.error(f"Gemini streaming failed: {str(e)}")
+            raise
+
+    def _start_stream(self, prompt: str, temperature: Optional[float], max_tokens: Optional[int]) -> Iterator:
+        """Open a stream and wait for its first chunk, so connection errors surface here."""
+        response = iter(self.model.generate_content(
+            prompt,
+            generation_config=self._generation_config(temperature, max_tokens),
+            stream=True
+        ))
+        first = next(response, None)
+        return itertools.chain([first] if first is not None else [], response)
+
+    async def agenerate(self, prompt: str, temperature: Optional[float] = None,
+                        max_tokens: Optional[int] = None) -> str:
+        """Generate a complete response with the SDK's async client."""
+        try:
+            return await self.retry_policy.acall(self._agenerate_once, prompt, temperature, max_tokens)
+
+        except Exception as e:
+            self.logger.error(f"Gemini async generation failed: {str(e)}")
+            raise
+
+    async def _agenerate_once(self, prompt: str, temperature: Optional[float], max_tokens: Optional[int]) -> str:
+        """Make a single async call within the concurrency cap and timeout.
+
+        The timeout starts once a concurrency slot is free, so queueing
+        behind other calls does not count against it.
+        """
+        async with self._semaphore():
+            response = await asyncio.wait_for(
+                self.model.generate_content_async(
+                    prompt,
+                    generation_config=self._generation_config(temperature, max_tokens)
+                ),
+                self.config.llm_timeout
+            )
+        return response.text
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Get the concurrency limiter of the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            # A semaphore that has had waiters references its loop, so closed loops are dropped here too
+            for closed in [other for other in list(self._semaphores) if other.is_closed()]:
+                del self._semaphores[closed]
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.config.llm_max_concurrency)
+        return semaphore
+
+    def _generation_config(self, temperature: Optional[float], max_tokens: Optional[int]):
+        """Build the SDK generation config."""
+        return genai.types.GenerationConfig(temperature=temperature, max_output_tokens=max_tokens)
+
+
+@register_backend("openai")
+class OpenAICompatibleBackend(LLMBackend):
+    """Any server speaking the OpenAI chat completions HTTP API.
+
+    Works with OpenAI itself and with local servers such as vLLM, llama.cpp
+    or Ollama by pointing ``Config.openai_base_url`` at them.
+    """
+
+    def __init__(self, config: Config, model_name: str):
+        super().__init__(config, model_name)
+        self.base_url = self.config.openai_base_url.rstrip("/")
+        self.session = None
+
+    def initialize(self) -> None:
+        """Create the HTTP session."""
+        if not self.config.openai_api_key and "api.openai.com" in self.base_url:
+            raise ValueError("OpenAI API key not provided")
+
+        self.session = requests.Session()
+        if self.config.openai_api_key:
+            self.session.headers["Authorization"] = f"Bearer {self.config.openai_api_key}"
+
+    def generate(self, prompt: str, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None) -> str:
+        """Generate a complete response with a chat completions request."""
+        try:
+            response = self.session.post(
+                f"{self.base_url}/chat/completions",
+                json=self._payload(prompt, temperature, max_tokens, stream=False),
+                timeout=self.config.openai_timeout
+            )
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
+
+        except Exception as e:
+            self.logger.error(f"OpenAI-compatible generation failed: {str(e)}")
+            raise
+
+    def stream(self, prompt: str, temperature: Optional[float] = None,
+               max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Stream response text from server-sent events."""
+        try:
+            with self.session.post(
+                f"{self.base_url}/chat/completions",
+                json=self._payload(prompt, temperature, max_tokens, stream=True),
+                timeout=self.config.openai_timeout,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+
+        except Exception as e:
+            self.logger.error(f"OpenAI-compatible streaming failed: {str(e)}")
+            raise
+
+    def _payload(self, prompt: str, temperature: Optional[float],
+                 max_tokens: Optional[int], stream: bool) -> Dict:
+        """Build the chat completions request body."""
+        payload = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": stream
+        }
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        return payload
+
+
+@register_backend("stub")
+class StubBackend(LLMBackend):
+    """Deterministic local backend for load tests and CI.
+
+    Answers with ``Config.stub_response_template``, formatted with the
+    question found in the prompt. It waits ``stub_latency`` seconds
+    before the first token and then emits ``stub_tokens_per_second``
+    tokens per second (instantly if 0). Nothing leaves the process.
+    """
+
+    def generate(self, prompt: str, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None) -> str:
+        """Return the templated response after the simulated delays."""
+        tokens = self._tokens(prompt, max_tokens)
+        time.sleep(self._duration(len(tokens)))
+        return "".join(tokens)
+
+    def stream(self, prompt: str, temperature: Optional[float] = None,
+               max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Yield the templated response token by token at the configured rate."""
+        time.sleep(self.config.stub_latency)
+        rate = self.config.stub_tokens_per_second
+        for token in self._tokens(prompt, max_tokens):
+            if rate:
+                time.sleep(1 / rate)
+            yield token
+
+    async def agenerate(self, prompt: str, temperature: Optional[float] = None,
+                        max_tokens: Optional[int] = None) -> str:
+        """Return the templated response, sleeping on the event loop."""
+        tokens = self._tokens(prompt, max_tokens)
+        await asyncio.sleep(self._duration(len(tokens)))
+        return "".join(tokens)
+
+    def _tokens(self, prompt: str, max_tokens: Optional[int]) -> list:
+        """Render the response and split it into stream tokens."""
+        match = QUESTION_PATTERN.search(prompt)
+        question = match.group(1).strip() if match else prompt.strip()
+        response = self.config.stub_response_template.format(question=question, prompt_chars=len(prompt))
+        tokens = STREAM_TOKEN_PATTERN.findall(response)
+        return tokens[:max_tokens] if max_tokens else tokens
+
+    def _duration(self, token_count: int) -> float:
+        """Seconds a full response takes at the configured latency and rate."""
+        rate = self.config.stub_tokens_per_second
+        return self.config.stub_latency + (token_count / rate if rate else 0.0)
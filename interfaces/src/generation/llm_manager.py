@@ -1,9 +1,21 @@
 """LLM management for FIT-FLIX RAG System."""
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-import google.generativeai as genai
+import queue
+import threading
+from typing import List, Dict, Any, Optional, Iterator
 from ..config import Config
+from .context_packer import ContextPacker, estimate_tokens
+from .llm_backends import LLMBackend, create_backend
+from .rate_scheduler import RateScheduler, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+from .response_cache import ResponseCache
+from .summarizer import MapReduceSummarizer
+from ..utils.deadline import Deadline, DeadlineExceeded
+from ..utils.single_flight import SingleFlight
+
+# Output token budget per requested summary word, leaving room for long words and punctuation
+SUMMARY_TOKENS_PER_WORD = 2
 
 
 class LLMManager:
@@ -19,53 +31,71 @@ class LLMManager:
         self.model_name = self.config.llm_model
         self.temperature = self.config.temperature
         self.max_tokens = self.config.max_tokens
-        self.model = None
+        self.backend: Optional[LLMBackend] = None
+        self.response_cache = ResponseCache(self.config) if self.config.response_cache_enabled else None
+        self.single_flight = SingleFlight()
+        self.rate_scheduler = RateScheduler(self.config) if self.config.rate_limit_enabled else None
+        self.context_packer = ContextPacker(self.config)
+        self.summarizer = MapReduceSummarizer(
+            self._summarize_once, self.config
+        ) if self.config.summary_map_reduce_enabled else None
+        self.last_context_stats: Dict[str, int] = {}
         self.logger = logging.getLogger(__name__)
         
     def initialize(self) -> None:
-        """Initialize the LLM model."""
+        """Initialize the LLM backend for the configured model."""
         try:
-            if "gemini" in self.model_name.lower():
-                self._initialize_gemini()
-            elif "gpt" in self.model_name.lower():
-                self._initialize_openai()
-            else:
-                raise ValueError(f"Unsupported model: {self.model_name}")
-                
-            self.logger.info(f"LLM model initialized: {self.model_name}")
+            backend = create_backend(self.config, self.model_name)
+            backend.initialize()
+            self.backend = backend
+            
+            self.logger.info(f"LLM model initialized: {self.model_name} ({backend.name} backend)")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize LLM: {str(e)}")
             raise
     
-    def _initialize_gemini(self) -> None:
-        """Initialize Google Gemini model."""
-        if not self.config.google_api_key:
-            raise ValueError("Google API key not provided")
-        
-        genai.configure(api_key=self.config.google_api_key)
-        self.model = genai.GenerativeModel(self.model_name)
-    
-    def _initialize_openai(self) -> None:
-        """Initialize OpenAI model."""
-        # This would initialize OpenAI client
-        # For now, it's a placeholder
-        raise NotImplementedError("OpenAI integration not implemented yet")
-    
     def generate_response(self, query: str, 
                          context_documents: List[Dict[str, Any]],
-                         system_prompt: Optional[str] = None) -> str:
+                         system_prompt: Optional[str] = None,
+                         index_generation: Optional[int] = None,
+                         priority: int = PRIORITY_INTERACTIVE,
+                         conversation: Optional[str] = None) -> str:
         """Generate a response using RAG.
         
+        Concurrent identical requests share a single generation.
+        
         Args:
             query: User query
             context_documents: Retrieved documents for context
             system_prompt: Optional system prompt
+            index_generation: Vector index generation, for cache invalidation
+            priority: Rate limit queue priority
+            conversation: Rendered conversation history, for follow-up questions
             
         Returns:
             Generated response
         """
-        if self.model is None:
+        request_key = self._get_request_key(query, context_documents, system_prompt, conversation)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(request_key, index_generation)
+            if cached is not None:
+                self.logger.info(f"Served cached response for query: {query[:50]}...")
+                return cached
+        
+        return self.single_flight.do(
+            request_key, self._generate_uncached_response,
+            request_key, query, context_documents, system_prompt, index_generation, priority, conversation
+        )
+    
+    def _generate_uncached_response(self, request_key: str, query: str,
+                                    context_documents: List[Dict[str, Any]],
+                                    system_prompt: Optional[str],
+                                    index_generation: Optional[int],
+                                    priority: int,
+                                    conversation: Optional[str]) -> str:
+        """Generate a response with the model and cache it."""
+        if self.backend is None:
             self.initialize()
         
         try:
@@ -73,13 +103,19 @@ class LLMManager:
             context = self._build_context(context_documents)
             
             # Create prompt
-            prompt = self._create_rag_prompt(query, context, system_prompt)
+            prompt = self._create_rag_prompt(query, context, system_prompt, conversation)
             
             # Generate response
-            if "gemini" in self.model_name.lower():
-                response = self._generate_gemini_response(prompt)
-            else:
-                raise ValueError(f"Unsupported model for generation: {self.model_name}")
+            self._reserve_quota(prompt, priority)
+            response = ""
+            try:
+                response = self.backend.generate(prompt, self.temperature, self.max_tokens)
+            finally:
+                # A failed call gives back its whole output budget
+                self._settle_quota(response)
+            
+            if self.response_cache is not None:
+                self.response_cache.set(request_key, response, index_generation)
             
             self.logger.info(f"Generated response for query: {query[:50]}...")
             return response
@@ -88,25 +124,264 @@ class LLMManager:
             self.logger.error(f"Failed to generate response: {str(e)}")
             raise
     
-    def _generate_gemini_response(self, prompt: str) -> str:
-        """Generate response using Gemini model."""
+    async def agenerate_response(self, query: str,
+                                 context_documents: List[Dict[str, Any]],
+                                 system_prompt: Optional[str] = None,
+                                 index_generation: Optional[int] = None,
+                                 deadline: Optional[Deadline] = None,
+                                 priority: int = PRIORITY_INTERACTIVE,
+                                 conversation: Optional[str] = None) -> str:
+        """Generate a response using RAG without blocking the event loop.
+        
+        Concurrent identical requests on the same loop share a single generation.
+        
+        Args:
+            query: User query
+            context_documents: Retrieved documents for context
+            system_prompt: Optional system prompt
+            index_generation: Vector index generation, for cache invalidation
+            deadline: Time by which the response must be complete
+            priority: Rate limit queue priority
+            conversation: Rendered conversation history, for follow-up questions
+            
+        Returns:
+            Generated response
+            
+        Raises:
+            DeadlineExceeded: If the response is not complete by the deadline
+        """
+        request_key = self._get_request_key(query, context_documents, system_prompt, conversation)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(request_key, index_generation)
+            if cached is not None:
+                self.logger.info(f"Served cached response for query: {query[:50]}...")
+                return cached
+        
+        generation = self.single_flight.do_async(
+            request_key, self._agenerate_uncached_response,
+            request_key, query, context_documents, system_prompt, index_generation, priority, conversation,
+            deadline
+        )
+        if deadline is None:
+            return await generation
+        
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=self.max_tokens
-                )
-            )
-            return response.text
+            # The shared generation keeps running, and is cached, while other callers still wait
+            return await asyncio.wait_for(generation, deadline.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("LLM response not complete before the deadline")
+    
+    async def _agenerate_uncached_response(self, request_key: str, query: str,
+                                           context_documents: List[Dict[str, Any]],
+                                           system_prompt: Optional[str],
+                                           index_generation: Optional[int],
+                                           priority: int,
+                                           conversation: Optional[str],
+                                           deadline: Optional[Deadline] = None) -> str:
+        """Generate a response with the model's async path and cache it."""
+        if self.backend is None:
+            self.initialize()
+        
+        try:
+            context = self._build_context(context_documents)
+            prompt = self._create_rag_prompt(query, context, system_prompt, conversation)
+            
+            if self.rate_scheduler is not None:
+                await self.rate_scheduler.acquire_async(estimate_tokens(prompt) + self.max_tokens,
+                                                        priority, deadline)
+            response = ""
+            try:
+                response = await self.backend.agenerate(prompt, self.temperature, self.max_tokens)
+            finally:
+                self._settle_quota(response)
+            
+            if self.response_cache is not None:
+                self.response_cache.set(request_key, response, index_generation)
+            
+            self.logger.info(f"Generated response for query: {query[:50]}...")
+            return response
             
         except Exception as e:
-            self.logger.error(f"Gemini generation failed: {str(e)}")
+            self.logger.error(f"Failed to generate response: {str(e)}")
             raise
     
+    def stream_response(self, query: str,
+                        context_documents: List[Dict[str, Any]],
+                        system_prompt: Optional[str] = None,
+                        index_generation: Optional[int] = None,
+                        deadline: Optional[Deadline] = None,
+                        priority: int = PRIORITY_INTERACTIVE,
+                        conversation: Optional[str] = None) -> Iterator[str]:
+        """Generate a response using RAG, yielding text as it arrives.
+        
+        A cached response is yielded whole. While an identical request is
+        already generating, this waits for it and yields its full response
+        instead of starting another generation.
+        
+        Args:
+            query: User query
+            context_documents: Retrieved documents for context
+            system_prompt: Optional system prompt
+            index_generation: Vector index generation, for cache invalidation
+            deadline: Time by which the first text must arrive
+            priority: Rate limit queue priority
+            conversation: Rendered conversation history, for follow-up questions
+            
+        Yields:
+            Text deltas of the generated response
+            
+        Raises:
+            DeadlineExceeded: If no text arrived by the deadline; the generation is cancelled
+        """
+        request_key = self._get_request_key(query, context_documents, system_prompt, conversation)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(request_key, index_generation)
+            if cached is not None:
+                self.logger.info(f"Served cached response for query: {query[:50]}...")
+                yield cached
+                return
+        
+        call, leader = self.single_flight.begin(request_key)
+        if not leader:
+            self.logger.info(f"Joined in-flight response for query: {query[:50]}...")
+            try:
+                yield call.wait(deadline.remaining() if deadline is not None else None)
+            except DeadlineExceeded:
+                raise
+            except TimeoutError:
+                raise DeadlineExceeded("In-flight response not complete before the deadline")
+            return
+        
+        deltas = []
+        try:
+            if self.backend is None:
+                self.initialize()
+            
+            context = self._build_context(context_documents)
+            prompt = self._create_rag_prompt(query, context, system_prompt, conversation)
+            
+            self._reserve_quota(prompt, priority, deadline)
+            try:
+                for delta in self._stream_before_deadline(prompt, deadline):
+                    deltas.append(delta)
+                    yield delta
+            finally:
+                # Also settles streams cut short by an error, the deadline or the consumer
+                self._settle_quota("".join(deltas))
+            
+        except GeneratorExit:
+            # The consumer stopped reading, so waiting requests get no answer from this call
+            self.single_flight.finish(request_key, call, exception=RuntimeError("In-flight response was abandoned"))
+            raise
+        except Exception as e:
+            self.logger.error(f"Failed to stream response: {str(e)}")
+            self.single_flight.finish(request_key, call, exception=e)
+            raise
+        
+        response = "".join(deltas)
+        
+        # Only complete responses are cached, before waiters are released so no request misses both
+        if self.response_cache is not None:
+            self.response_cache.set(request_key, response, index_generation)
+        self.single_flight.finish(request_key, call, result=response)
+        
+        self.logger.info(f"Streamed response for query: {query[:50]}...")
+    
+    def _stream_before_deadline(self, prompt: str, deadline: Optional[Deadline]) -> Iterator[str]:
+        """Stream from the backend, giving up if the first text misses the deadline.
+        
+        The backend stream is read on a worker thread so waiting for it can
+        time out. On timeout the worker stops at its next chunk and closes
+        the upstream stream.
+        
+        Args:
+            prompt: Full prompt
+            deadline: Time by which the first text must arrive
+            
+        Yields:
+            Text deltas
+            
+        Raises:
+            DeadlineExceeded: If no text arrived by the deadline
+        """
+        if deadline is None or deadline.remaining() is None:
+            yield from self.backend.stream(prompt, self.temperature, self.max_tokens)
+            return
+        
+        deltas: queue.Queue = queue.Queue()
+        cancelled = threading.Event()
+        
+        def produce():
+            stream = self.backend.stream(prompt, self.temperature, self.max_tokens)
+            try:
+                for delta in stream:
+                    if cancelled.is_set():
+                        break
+                    deltas.put((delta, None))
+                deltas.put((None, None))
+            except Exception as e:
+                deltas.put((None, e))
+            finally:
+                stream.close()
+        
+        threading.Thread(target=produce, daemon=True).start()
+        
+        first = True
+        try:
+            while True:
+                try:
+                    delta, error = deltas.get(timeout=deadline.remaining() if first else None)
+                except queue.Empty:
+                    raise DeadlineExceeded("LLM produced no text before the deadline")
+                if error is not None:
+                    raise error
+                if delta is None:
+                    return
+                first = False
+                yield delta
+        finally:
+            cancelled.set()
+    
+    def _reserve_quota(self, prompt: str, priority: int, deadline: Optional[Deadline] = None,
+                       max_tokens: Optional[int] = None) -> None:
+        """Wait for rate limit quota covering the prompt and the full output budget.
+        
+        Args:
+            prompt: Full prompt, including the packed context
+            priority: Rate limit queue priority
+            deadline: Time by which the call must be admitted
+            max_tokens: Output budget of the call (uses the model's max_tokens if None)
+        """
+        if self.rate_scheduler is not None:
+            self.rate_scheduler.acquire(estimate_tokens(prompt) + (max_tokens or self.max_tokens), priority, deadline)
+    
+    def _settle_quota(self, response: str, max_tokens: Optional[int] = None) -> None:
+        """Give back the part of the output budget a response did not use."""
+        if self.rate_scheduler is not None:
+            self.rate_scheduler.refund((max_tokens or self.max_tokens) - estimate_tokens(response))
+    
+    def _get_request_key(self, query: str, context_documents: List[Dict[str, Any]],
+                         system_prompt: Optional[str], conversation: Optional[str] = None) -> str:
+        """Build the key identifying a request for caching and coalescing.
+        
+        Args:
+            query: User query
+            context_documents: Retrieved documents for context
+            system_prompt: Optional system prompt
+            conversation: Rendered conversation history
+            
+        Returns:
+            Request key
+        """
+        return ResponseCache.make_key(query, context_documents, system_prompt, self.model_name,
+                                      self.temperature, conversation)
+    
     def _build_context(self, documents: List[Dict[str, Any]]) -> str:
         """Build context string from retrieved documents.
         
+        Documents are packed into the context token budget first; the
+        packing stats are kept in ``last_context_stats``.
+        
         Args:
             documents: List of retrieved documents
             
@@ -116,26 +391,38 @@ class LLMManager:
         if not documents:
             return "No relevant information found in the knowledge base."
         
+        packed, stats = self.context_packer.pack(documents)
+        self.last_context_stats = stats
+        
         context_parts = []
-        for i, doc in enumerate(documents, 1):
+        for i, doc in enumerate(packed, 1):
             content = doc['content']
-            source = doc.get('metadata', {}).get('source', 'Unknown')
+            metadata = doc.get('metadata', {})
+            # Deduplicated chunks list every source they were merged from
+            source = metadata.get('sources') or metadata.get('source', 'Unknown')
             similarity = doc.get('similarity', 0)
             
             context_parts.append(
                 f"Document {i} (Relevance: {similarity:.2f}, Source: {source}):\n{content}\n"
             )
         
+        context_parts.append(
+            f"(Context: {stats['tokens_used']} tokens used of {self.context_packer.token_budget}; "
+            f"{stats['tokens_dropped']} tokens dropped from {stats['documents_dropped']} documents)"
+        )
+        
         return "\n".join(context_parts)
     
     def _create_rag_prompt(self, query: str, context: str, 
-                          system_prompt: Optional[str] = None) -> str:
+                          system_prompt: Optional[str] = None,
+                          conversation: Optional[str] = None) -> str:
         """Create RAG prompt combining query and context.
         
         Args:
             query: User query
             context: Retrieved context
             system_prompt: Optional system prompt
+            conversation: Rendered conversation history
             
         Returns:
             Complete RAG prompt
@@ -153,48 +440,77 @@ Guidelines:
 
         system = system_prompt or default_system_prompt
         
+        # Earlier turns let follow-up questions refer back to them
+        history = f"""Conversation So Far:
+{conversation}
+
+""" if conversation else ""
+        
         prompt = f"""{system}
 
 Context Information:
 {context}
 
-User Question: {query}
+{history}User Question: {query}
 
 Response:"""
         
         return prompt
     
-    def generate_summary(self, text: str, max_length: Optional[int] = None) -> str:
+    def generate_summary(self, text: str, max_length: Optional[int] = None,
+                         priority: int = PRIORITY_BATCH) -> str:
         """Generate a summary of the given text.
         
+        Text longer than one summary chunk is summarized map-reduce style,
+        as concurrent chunk summaries combined hierarchically.
+        
         Args:
             text: Text to summarize
             max_length: Maximum length of summary
+            priority: Rate limit queue priority
             
         Returns:
             Summary text
         """
-        if self.model is None:
+        if self.backend is None:
             self.initialize()
         
         max_len = max_length or self.max_tokens // 2
         
+        try:
+            if self.summarizer is not None and self.summarizer.needs_map_reduce(text):
+                return self.summarizer.summarize(text, max_len, priority)
+            return self._summarize_once(text, max_len, priority)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to generate summary: {str(e)}")
+            raise
+    
+    def _summarize_once(self, text: str, max_len: int, priority: int) -> str:
+        """Summarize text in a single LLM call.
+        
+        Args:
+            text: Text to summarize
+            max_len: Maximum length of summary in words
+            priority: Rate limit queue priority
+            
+        Returns:
+            Summary text
+        """
         prompt = f"""Please provide a concise summary of the following text in no more than {max_len} words:
 
 {text}
 
 Summary:"""
         
+        max_tokens = min(self.max_tokens, max_len * SUMMARY_TOKENS_PER_WORD)
+        self._reserve_quota(prompt, priority, max_tokens=max_tokens)
+        summary = ""
         try:
-            if "gemini" in self.model_name.lower():
-                response = self.model.generate_content(prompt)
-                return response.text
-            else:
-                raise ValueError(f"Unsupported model for summarization: {self.model_name}")
-                
-        except Exception as e:
-            self.logger.error(f"Failed to generate summary: {str(e)}")
-            raise
+            summary = self.backend.generate(prompt, self.temperature, max_tokens)
+        finally:
+            self._settle_quota(summary, max_tokens)
+        return summary
     
     def evaluate_response_quality(self, query: str, response: str, 
                                  context_documents: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -226,5 +542,8 @@ Summary:"""
             "model_name": self.model_name,
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
-            "initialized": self.model is not None
+            "backend": self.backend.name if self.backend is not None else None,
+            "initialized": self.backend is not None,
+            "rate_limit": self.rate_scheduler.get_stats() if self.rate_scheduler is not None else None,
+            "summarizer": self.summarizer.get_stats() if self.summarizer is not None else None
         }
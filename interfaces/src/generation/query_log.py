@@ -0,0 +1,79 @@
+"""Query frequency log for FIT-FLIX RAG System."""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Union
+from ..config import Config
+from .response_cache import normalize_query
+
+
+class QueryLog:
+    """Counts how often each question is asked, persisted in SQLite."""
+
+    def __init__(self, config: Optional[Config] = None,
+                 path: Optional[Union[str, Path]] = None):
+        """Initialize the query log.
+
+        Args:
+            config: Configuration object
+            path: SQLite file (uses config default if None; memory only if that is None)
+        """
+        self.config = config or Config()
+        self.path = path or self.config.query_log_path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        try:
+            if self.path:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path or ":memory:"), check_same_thread=False)
+        except Exception as e:
+            self.logger.warning(f"Query log falling back to memory only: {str(e)}")
+            self._connection = sqlite3.connect(":memory:", check_same_thread=False)
+
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS queries ("
+            "normalized TEXT PRIMARY KEY, question TEXT NOT NULL, "
+            "count INTEGER NOT NULL, last_seen REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def record(self, question: str) -> None:
+        """Count one occurrence of a question.
+
+        Args:
+            question: User question as asked
+        """
+        normalized = normalize_query(question)
+        if not normalized:
+            return
+
+        with self._lock:
+            try:
+                self._connection.execute(
+                    "INSERT INTO queries (normalized, question, count, last_seen) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT(normalized) DO UPDATE SET count = count + 1, "
+                    "question = excluded.question, last_seen = excluded.last_seen",
+                    (normalized, question.strip(), time.time())
+                )
+                self._connection.commit()
+            except Exception as e:
+                self.logger.warning(f"Failed to log query: {str(e)}")
+
+    def top(self, n: int) -> List[str]:
+        """Get the most frequently asked questions.
+
+        Args:
+            n: Number of questions
+
+        Returns:
+            Questions as most recently phrased, most frequent first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT question FROM queries ORDER BY count DESC, last_seen DESC LIMIT ?", (n,)
+            ).fetchall()
+        return [row[0] for row in rows]
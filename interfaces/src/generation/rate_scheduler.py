@@ -0,0 +1,196 @@
+"""Client-side LLM rate limiting for FIT-FLIX RAG System."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import Config
+from ..utils.deadline import Deadline, DeadlineExceeded
+
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+
+class RateScheduler:
+    """Queues LLM calls so they stay within requests- and tokens-per-minute quotas.
+
+    Two token buckets refill continuously at the per-minute rates and
+    start full, so short bursts pass immediately. A call waits until both
+    buckets can cover it; waiting calls are served by priority, then in
+    arrival order, so chat requests overtake queued batch jobs.
+    """
+
+    def __init__(self, config: Optional[Config] = None,
+                 requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None):
+        """Initialize the scheduler with full buckets.
+
+        Args:
+            config: Configuration object
+            requests_per_minute: Request quota (uses config default if None)
+            tokens_per_minute: Token quota (uses config default if None)
+        """
+        self.config = config or Config()
+        self.requests_per_minute = requests_per_minute or self.config.llm_requests_per_minute
+        self.tokens_per_minute = tokens_per_minute or self.config.llm_tokens_per_minute
+        self.logger = logging.getLogger(__name__)
+
+        self._requests_available = float(self.requests_per_minute)
+        self._tokens_available = float(self.tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._waiting: List[Tuple[int, int]] = []  # Heap of (priority, arrival)
+        self._arrivals = itertools.count()
+        self._condition = threading.Condition()
+
+        self.granted = 0
+        self.timeouts = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.last_queue_wait = 0.0
+
+    def acquire(self, tokens: int, priority: int = PRIORITY_INTERACTIVE,
+                deadline: Optional[Deadline] = None,
+                cancelled: Optional[threading.Event] = None) -> float:
+        """Wait for quota to make one call.
+
+        Args:
+            tokens: Estimated prompt plus output tokens of the call
+            priority: Queue priority (PRIORITY_INTERACTIVE or PRIORITY_BATCH)
+            deadline: Time by which the call must be admitted
+            cancelled: Event that withdraws the call from the queue when set;
+                waiters are woken by notifying the scheduler's condition
+
+        Returns:
+            Seconds spent waiting in the queue
+
+        Raises:
+            DeadlineExceeded: If the deadline passed while queued
+            asyncio.CancelledError: If the call was withdrawn while queued
+        """
+        # A call larger than the whole bucket would never be admitted
+        tokens = min(tokens, self.tokens_per_minute)
+        start = time.monotonic()
+
+        with self._condition:
+            ticket = (priority, next(self._arrivals))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if cancelled is not None and cancelled.is_set():
+                        raise asyncio.CancelledError("Withdrawn while waiting for LLM quota")
+                    self._refill()
+                    timeout = None  # Calls behind the head wait to be notified
+                    if self._waiting[0] == ticket:
+                        timeout = self._time_until_available(tokens)
+                        if timeout == 0:
+                            break
+
+                    remaining = deadline.remaining() if deadline is not None else None
+                    if remaining is not None:
+                        if remaining == 0:
+                            self.timeouts += 1
+                            raise DeadlineExceeded("Deadline exceeded while waiting for LLM quota")
+                        timeout = remaining if timeout is None else min(timeout, remaining)
+
+                    self._condition.wait(timeout)
+
+                self._requests_available -= 1
+                self._tokens_available -= tokens
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+            waited = time.monotonic() - start
+            self.granted += 1
+            self.total_queue_wait += waited
+            self.max_queue_wait = max(self.max_queue_wait, waited)
+            self.last_queue_wait = waited
+
+        if waited > 1:
+            self.logger.info(f"LLM call waited {waited:.2f}s for rate limit quota")
+        return waited
+
+    async def acquire_async(self, tokens: int, priority: int = PRIORITY_INTERACTIVE,
+                            deadline: Optional[Deadline] = None) -> float:
+        """Wait for quota without blocking the event loop.
+
+        Args:
+            tokens: Estimated prompt plus output tokens of the call
+            priority: Queue priority
+            deadline: Time by which the call must be admitted
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        cancelled = threading.Event()
+        waiter = asyncio.ensure_future(asyncio.to_thread(self.acquire, tokens, priority, deadline, cancelled))
+        try:
+            # Shielded, so a cancelled caller can still see whether the thread was admitted
+            return await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            cancelled.set()
+            with self._condition:
+                self._condition.notify_all()
+            waiter.add_done_callback(lambda done: self._release_unused(done, tokens))
+            raise
+
+    def refund(self, tokens: int) -> None:
+        """Return tokens a call reserved but did not use.
+
+        Args:
+            tokens: Unused tokens, typically the unspent output budget
+        """
+        if tokens <= 0:
+            return
+        with self._condition:
+            self._tokens_available = min(self._tokens_available + tokens, float(self.tokens_per_minute))
+            self._condition.notify_all()
+
+    def _release_unused(self, waiter: "asyncio.Future", tokens: int) -> None:
+        """Give back quota a cancelled async caller was admitted with anyway."""
+        if waiter.cancelled() or waiter.exception() is not None:
+            return
+        with self._condition:
+            self._requests_available = min(self._requests_available + 1, float(self.requests_per_minute))
+            self._tokens_available = min(self._tokens_available + min(tokens, self.tokens_per_minute),
+                                         float(self.tokens_per_minute))
+            self._condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics.
+
+        Returns:
+            Dictionary with quotas, queue length and queue wait times
+        """
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "granted": self.granted,
+            "queued": len(self._waiting),
+            "timeouts": self.timeouts,
+            "avg_queue_wait": self.total_queue_wait / self.granted if self.granted else 0.0,
+            "max_queue_wait": self.max_queue_wait,
+            "last_queue_wait": self.last_queue_wait
+        }
+
+    def _refill(self) -> None:
+        """Top up both buckets for the time since the last refill."""
+        now = time.monotonic()
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._requests_available = min(self._requests_available + elapsed * self.requests_per_minute / 60,
+                                       float(self.requests_per_minute))
+        self._tokens_available = min(self._tokens_available + elapsed * self.tokens_per_minute / 60,
+                                     float(self.tokens_per_minute))
+
+    def _time_until_available(self, tokens: int) -> float:
+        """Seconds until both buckets can cover a call."""
+        request_wait = max(1 - self._requests_available, 0) * 60 / self.requests_per_minute
+        token_wait = max(tokens - self._tokens_available, 0) * 60 / self.tokens_per_minute
+        return max(request_wait, token_wait)
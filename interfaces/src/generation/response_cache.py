@@ -0,0 +1,211 @@
+"""Response caching for FIT-FLIX RAG System."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union, Tuple
+from ..config import Config
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivial variations share a cache entry.
+
+    Args:
+        query: User query
+
+    Returns:
+        Lowercased query with collapsed whitespace and no trailing punctuation
+    """
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def content_hash(text: str) -> str:
+    """Hash a chunk's content.
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        Hex digest of the text
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier exact response cache: an in-memory LRU backed by SQLite."""
+
+    def __init__(self, config: Optional[Config] = None,
+                 path: Optional[Union[str, Path]] = None,
+                 max_entries: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        """Initialize the response cache.
+
+        Args:
+            config: Configuration object
+            path: SQLite file (uses config default if None; memory only if that is None)
+            max_entries: Capacity of the in-memory tier (uses config default if None)
+            ttl: Seconds an entry stays valid (uses config default if None)
+        """
+        self.config = config or Config()
+        self.path = path or self.config.response_cache_path
+        self.max_entries = max_entries or self.config.response_cache_size
+        self.ttl = ttl if ttl is not None else self.config.response_cache_ttl
+        self.logger = logging.getLogger(__name__)
+
+        self._memory: OrderedDict[str, Tuple[str, float, Optional[int]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self.hits = 0
+        self.misses = 0
+
+        if self.path:
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL, generation INTEGER)"
+                )
+                self._connection.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+                self._connection.commit()
+            except Exception as e:
+                self.logger.warning(f"Response cache falling back to memory only: {str(e)}")
+                self._connection = None
+
+    @staticmethod
+    def make_key(query: str, context_documents: List[Dict[str, Any]],
+                 system_prompt: Optional[str], model_name: str, temperature: float,
+                 conversation: Optional[str] = None) -> str:
+        """Build the cache key for a generation request.
+
+        Args:
+            query: User query
+            context_documents: Retrieved documents, in prompt order
+            system_prompt: System prompt (None for the default prompt)
+            model_name: LLM model name
+            temperature: Sampling temperature
+            conversation: Rendered conversation history (None for a standalone question)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        chunks = [[doc.get('id'), content_hash(doc['content'])] for doc in context_documents]
+        key_parts = [normalize_query(query), chunks, system_prompt, model_name, temperature]
+        if conversation:
+            key_parts.append(conversation)
+        payload = json.dumps(key_parts, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, generation: Optional[int] = None) -> Optional[str]:
+        """Look up a cached response.
+
+        Entries that expired or were stored for another index generation
+        are dropped.
+
+        Args:
+            key: Cache key from make_key
+            generation: Current index generation
+
+        Returns:
+            Cached response or None
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT response, expires_at, generation FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = tuple(row)
+                    self._remember(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            response, expires_at, entry_generation = entry
+            if expires_at <= now or entry_generation != generation:
+                self._delete(key)
+                self.misses += 1
+                return None
+
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def set(self, key: str, response: str, generation: Optional[int] = None) -> None:
+        """Store a response.
+
+        Args:
+            key: Cache key from make_key
+            response: Generated response
+            generation: Index generation the response was produced against
+        """
+        entry = (response, time.time() + self.ttl, generation)
+
+        with self._lock:
+            self._remember(key, entry)
+            if self._connection is not None:
+                try:
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO responses (key, response, expires_at, generation) VALUES (?, ?, ?, ?)",
+                        (key, *entry)
+                    )
+                    self._connection.commit()
+                except Exception as e:
+                    self.logger.warning(f"Failed to persist cached response: {str(e)}")
+
+    def invalidate(self, generation: Optional[int] = None) -> None:
+        """Drop every entry not produced against the given index generation.
+
+        Args:
+            generation: Generation to keep (drops everything if None)
+        """
+        with self._lock:
+            for key in [k for k, entry in self._memory.items() if generation is None or entry[2] != generation]:
+                del self._memory[key]
+            if self._connection is not None:
+                if generation is None:
+                    self._connection.execute("DELETE FROM responses")
+                else:
+                    self._connection.execute(
+                        "DELETE FROM responses WHERE generation IS NULL OR generation != ?", (generation,)
+                    )
+                self._connection.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with entry counts and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "persistent": self._connection is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def _remember(self, key: str, entry: Tuple[str, float, Optional[int]]) -> None:
+        """Put an entry in the memory tier, evicting the least recently used."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _delete(self, key: str) -> None:
+        """Remove an entry from both tiers."""
+        self._memory.pop(key, None)
+        if self._connection is not None:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._connection.commit()
@@ -0,0 +1,151 @@
+"""Semantic answer caching for FIT-FLIX RAG System."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+import numpy as np
+from ..config import Config
+
+
+class SemanticCache:
+    """Caches answers by question meaning, so paraphrases skip the RAG pipeline."""
+
+    def __init__(self, config: Optional[Config] = None,
+                 threshold: Optional[float] = None,
+                 max_entries: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        """Initialize the semantic cache.
+
+        Args:
+            config: Configuration object
+            threshold: Minimum cosine similarity for a hit (uses config default if None)
+            max_entries: Capacity before least recently used entries are evicted (uses config default if None)
+            ttl: Seconds an entry stays valid (uses config default if None)
+        """
+        self.config = config or Config()
+        self.threshold = threshold if threshold is not None else self.config.semantic_cache_threshold
+        self.max_entries = max_entries or self.config.semantic_cache_size
+        self.ttl = ttl if ttl is not None else self.config.semantic_cache_ttl
+        self.logger = logging.getLogger(__name__)
+
+        # Slot-indexed vector index; _entries orders the live slots by recency
+        self._vectors: Optional[np.ndarray] = None
+        self._expires_at = np.zeros(self.max_entries)
+        self._entries: OrderedDict[int, Dict[str, Any]] = OrderedDict()
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, query_embedding: List[float], generation: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Find the cached answer to the nearest previous question.
+
+        Args:
+            query_embedding: Embedding of the incoming question
+            generation: Current index generation; entries from other generations never hit
+
+        Returns:
+            Dictionary with question, answer, sources and similarity, or None
+        """
+        query = self._normalize(query_embedding)
+
+        with self._lock:
+            self._expire(time.time())
+
+            if self._entries:
+                slots = np.fromiter(self._entries.keys(), dtype=np.int64, count=len(self._entries))
+                similarities = self._vectors[slots] @ query
+                for index in np.argsort(similarities)[::-1]:
+                    if similarities[index] < self.threshold:
+                        break
+                    slot = int(slots[index])
+                    entry = self._entries[slot]
+                    if entry['generation'] != generation:
+                        continue
+
+                    self._entries.move_to_end(slot)
+                    self.hits += 1
+                    return {
+                        'question': entry['question'],
+                        'answer': entry['answer'],
+                        'sources': entry['sources'],
+                        'similarity': float(similarities[index])
+                    }
+
+            self.misses += 1
+            return None
+
+    def store(self, question: str, query_embedding: List[float], answer: str,
+              sources: Optional[List[str]] = None, generation: Optional[int] = None) -> None:
+        """Cache the answer to a question.
+
+        Args:
+            question: Question as asked
+            query_embedding: Embedding of the question
+            answer: Generated answer
+            sources: Sources the answer was based on
+            generation: Index generation the answer was produced against
+        """
+        vector = self._normalize(query_embedding)
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+
+            if not self._free_slots:
+                slot, _ = self._entries.popitem(last=False)
+                self._free_slots.append(slot)
+                self.evictions += 1
+
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._expires_at[slot] = time.time() + self.ttl
+            self._entries[slot] = {
+                'question': question,
+                'answer': answer,
+                'sources': list(sources or []),
+                'generation': generation
+            }
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        with self._lock:
+            self._entries.clear()
+            self._free_slots = list(range(self.max_entries - 1, -1, -1))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with entry count, hit/miss/eviction counts and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def _expire(self, now: float) -> None:
+        """Free the slots of expired entries."""
+        if not self._entries:
+            return
+        slots = np.fromiter(self._entries.keys(), dtype=np.int64, count=len(self._entries))
+        for slot in slots[self._expires_at[slots] <= now]:
+            del self._entries[int(slot)]
+            self._free_slots.append(int(slot))
+            self.expirations += 1
+
+    def _normalize(self, embedding: List[float]) -> np.ndarray:
+        """Scale an embedding to unit length so dot products are cosine similarities."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
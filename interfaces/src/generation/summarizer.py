@@ -0,0 +1,137 @@
+"""Map-reduce summarization for FIT-FLIX RAG System."""
+
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from ..config import Config
+from ..utils.text_splitter import TextSplitter
+from .rate_scheduler import PRIORITY_BATCH
+from .response_cache import content_hash
+
+
+# Partial summaries are never cut below this many words
+MIN_PARTIAL_WORDS = 40
+
+
+class MapReduceSummarizer:
+    """Summarizes long text as a tree of bounded-size LLM calls.
+
+    The text is split into chunks that are summarized concurrently (map),
+    then the partial summaries are summarized in groups of ``fan_in``
+    until one remains (reduce). Each level runs in parallel, so latency
+    grows with the depth of the tree rather than the length of the text.
+    Partial summaries get ``1 / fan_in`` of the word budget, so a reduce
+    call's input stays about the size of the final summary.
+    Partial summaries are cached by content hash, so re-summarizing a
+    document that changed in one place only redoes that branch.
+    """
+
+    def __init__(self, summarize: Callable[[str, int, int], str], config: Optional[Config] = None,
+                 chunk_size: Optional[int] = None, fan_in: Optional[int] = None,
+                 max_concurrency: Optional[int] = None):
+        """Initialize the summarizer.
+
+        Args:
+            summarize: Function(text, max_words, priority) making one summarization call
+            config: Configuration object
+            chunk_size: Characters per map chunk (uses config default if None)
+            fan_in: Partial summaries combined per reduce call (uses config default if None)
+            max_concurrency: Summarization calls in flight at once (uses config default if None)
+        """
+        self.config = config or Config()
+        self.summarize_fn = summarize
+        self.chunk_size = chunk_size or self.config.summary_chunk_size
+        self.chunk_overlap = self.config.summary_chunk_overlap
+        self.fan_in = max(fan_in or self.config.summary_fan_in, 2)
+        self.max_concurrency = max_concurrency or self.config.summary_max_concurrency
+        self.cache_size = self.config.summary_cache_size
+        self.text_splitter = TextSplitter(self.config)
+        self.logger = logging.getLogger(__name__)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                            thread_name_prefix="summarizer")
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.cache_hits = 0
+
+    def needs_map_reduce(self, text: str) -> bool:
+        """Whether text is too long to summarize in one call.
+
+        Args:
+            text: Text to summarize
+
+        Returns:
+            True if the text spans more than one chunk
+        """
+        return len(text) > self.chunk_size
+
+    def summarize(self, text: str, max_words: int, priority: int = PRIORITY_BATCH) -> str:
+        """Summarize text of any length.
+
+        Args:
+            text: Text to summarize
+            max_words: Maximum words of the final summary
+            priority: Rate limit queue priority of the calls
+
+        Returns:
+            Summary text
+        """
+        partial_words = max(max_words // self.fan_in, MIN_PARTIAL_WORDS)
+        chunks = self.text_splitter.split_text(text, self.chunk_size, self.chunk_overlap)
+        partials = self._summarize_level(chunks, max_words, partial_words, priority)
+        depth = 1
+
+        while len(partials) > 1:
+            groups = [
+                "\n\n".join(partials[i:i + self.fan_in])
+                for i in range(0, len(partials), self.fan_in)
+            ]
+            partials = self._summarize_level(groups, max_words, partial_words, priority)
+            depth += 1
+
+        self.logger.info(f"Summarized {len(chunks)} chunks in {depth} levels")
+        return partials[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get summarizer statistics.
+
+        Returns:
+            Dictionary with call and cache counters
+        """
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "cached_summaries": len(self._cache)
+        }
+
+    def _summarize_level(self, texts: List[str], max_words: int,
+                         partial_words: int, priority: int) -> List[str]:
+        """Summarize one level of the tree concurrently, keeping order."""
+        if len(texts) == 1:
+            # The root gets the full word budget
+            return [self._summarize_cached(texts[0], max_words, priority)]
+        return list(self._executor.map(
+            lambda text: self._summarize_cached(text, partial_words, priority), texts
+        ))
+
+    def _summarize_cached(self, text: str, max_words: int, priority: int) -> str:
+        """Summarize one chunk, reusing an earlier summary of the same content."""
+        key = content_hash(f"{max_words}\n{text}")
+        with self._lock:
+            summary = self._cache.get(key)
+            if summary is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return summary
+
+        summary = self.summarize_fn(text, max_words, priority).strip()
+
+        with self._lock:
+            self.calls += 1
+            self._cache[key] = summary
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return summary
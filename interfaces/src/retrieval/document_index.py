@@ -0,0 +1,164 @@
+"""Document-level summary index for FIT-FLIX RAG system."""
+
+import logging
+from typing import Callable, Dict, List, Any, Optional
+
+from ..utils.text_splitter import SENTENCE_BOUNDARY_PATTERN
+
+
+def extractive_document_summary(sections: List[str], max_chars: int) -> str:
+    """Summarize a document by the lead sentence of each of its sections.
+
+    Section documents start with their header path, so the result reads
+    like a table of contents with one line of substance per heading.
+
+    Args:
+        sections: Contents of the document's sections, in order
+        max_chars: Maximum characters of the summary
+
+    Returns:
+        Summary text
+    """
+    lines = []
+    for section in sections:
+        heading, _, body = section.partition("\n\n")
+        if not body:
+            heading, body = "", heading
+        lead = SENTENCE_BOUNDARY_PATTERN.split(body.strip(), maxsplit=1)[0]
+        lines.append(f"{heading}: {lead}" if heading else lead)
+
+    summary = "\n".join(lines)
+    return summary[:max_chars]
+
+
+class DocumentIndex:
+    """One summary embedding per source document, for coarse retrieval.
+
+    Searching this small collection first narrows a query to a handful
+    of source documents, so the chunk search only has to consider their
+    chunks.
+    """
+
+    def __init__(self, config, client, embedding_manager):
+        """Initialize the document index.
+
+        Args:
+            config: Configuration object containing document index settings
+            client: ChromaDB client shared with the chunk collection
+            embedding_manager: Embedding manager used for the chunks
+        """
+        self.config = config
+        self.client = client
+        self.embedding_manager = embedding_manager
+        self.collection_name = f"{config.collection_name}_documents"
+        self.collection = None
+        self.logger = logging.getLogger(__name__)
+
+    def initialize(self):
+        """Open or create the document-level collection."""
+        try:
+            self.collection = self.client.get_or_create_collection(name=self.collection_name)
+        except Exception as e:
+            self.logger.error(f"Failed to initialize document index: {str(e)}")
+            raise
+
+    def count(self) -> int:
+        """Number of indexed source documents."""
+        return self.collection.count() if self.collection else 0
+
+    def add_documents(self, documents: List[Dict[str, Any]],
+                      summarize: Optional[Callable[[str], str]] = None) -> int:
+        """Summarize and index loaded documents, one entry per source.
+
+        Args:
+            documents: Loaded documents, possibly several sections per source
+            summarize: Function(text) returning a summary, such as a wrapper
+                around LLMManager.generate_summary (extractive if None)
+
+        Returns:
+            Number of source documents indexed
+        """
+        if not self.collection:
+            raise RuntimeError("Document index not initialized. Call initialize() first.")
+
+        # Keyed by file path, so files sharing a name in different folders stay apart
+        sections: Dict[str, List[str]] = {}
+        names: Dict[str, str] = {}
+        for doc in documents:
+            metadata = doc.get('metadata', {})
+            source = metadata.get('source', 'unknown')
+            file_path = metadata.get('file_path') or source
+            sections.setdefault(file_path, []).append(doc['content'])
+            names[file_path] = source
+
+        if not sections:
+            return 0
+
+        try:
+            sources = list(sections)
+            summaries = []
+            for source in sources:
+                summary = None
+                if summarize is not None:
+                    try:
+                        summary = summarize("\n\n".join(sections[source]))
+                    except Exception as e:
+                        self.logger.warning(f"Falling back to extractive summary for {source}: {str(e)}")
+                if not summary:
+                    summary = extractive_document_summary(sections[source], self.config.document_summary_max_chars)
+                summaries.append(summary)
+
+            self.collection.upsert(
+                ids=sources,
+                documents=summaries,
+                metadatas=[
+                    {'source': names[source], 'file_path': source, 'sections': len(sections[source])}
+                    for source in sources
+                ],
+                embeddings=self.embedding_manager.embed_texts(summaries)
+            )
+
+            self.logger.info(f"Indexed summaries of {len(sources)} source documents")
+            return len(sources)
+
+        except Exception as e:
+            self.logger.error(f"Failed to index document summaries: {str(e)}")
+            raise
+
+    def select_sources(self, query_embedding: List[float], top_m: int) -> Optional[List[str]]:
+        """Pick the source documents most likely to answer a query.
+
+        Args:
+            query_embedding: Embedding of the query
+            top_m: Number of source documents to pick
+
+        Returns:
+            File paths of the source documents, or None when the index cannot narrow the search
+        """
+        count = self.count()
+        if count <= top_m:
+            return None
+
+        try:
+            results = self.collection.query(query_embeddings=[query_embedding], n_results=top_m)
+            return [metadata['file_path'] for metadata in results['metadatas'][0]]
+        except Exception as e:
+            self.logger.warning(f"Document index search failed, searching all chunks: {str(e)}")
+            return None
+
+    def remove_sources(self, sources: List[str]) -> None:
+        """Drop the summaries of source documents that were deleted or changed.
+
+        Args:
+            sources: File paths of the source documents
+        """
+        if self.collection and sources:
+            self.collection.delete(ids=list(sources))
+
+    def delete(self):
+        """Delete the document-level collection."""
+        try:
+            self.client.delete_collection(self.collection_name)
+        except Exception as e:
+            self.logger.warning(f"Could not delete document index: {str(e)}")
+        self.collection = None
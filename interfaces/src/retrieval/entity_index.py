@@ -0,0 +1,186 @@
+"""Entity posting lists for FIT-FLIX RAG system."""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from ..utils.aho_corasick import AhoCorasick
+from .fact_matcher import normalize_text
+from .fact_store import extract_facts
+
+
+class EntityIndex:
+    """Maps trainer, class and facility names to the chunks that mention them.
+
+    The names are the entities the knowledge base lists as "**Name:**"
+    items. Their aliases are compiled into one Aho-Corasick automaton,
+    padded with spaces so that only whole words match, and a query is
+    scanned once to find every entity it names.
+    """
+
+    def __init__(self, config, path: Optional[Union[str, Path]] = None):
+        """Initialize an empty entity index.
+
+        Args:
+            config: Configuration object containing entity index settings
+            path: JSON file the index is saved to (uses the vector store directory if None)
+        """
+        self.config = config
+        self.path = Path(path or Path(config.chroma_db_path) / "entity_index.json")
+        self.logger = logging.getLogger(__name__)
+
+        self.aliases: Dict[str, str] = {}  # Normalized alias -> entity name
+        self.postings: Dict[str, List[str]] = {}  # Entity name -> chunk ids
+        self._alias_list: List[str] = []
+        self._automaton: Optional[AhoCorasick] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        """Load a saved index.
+
+        Returns:
+            True if an index was loaded
+        """
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return False
+
+        with self._lock:
+            self.aliases = data['aliases']
+            self.postings = data['postings']
+            self._compile()
+        return True
+
+    def build_dictionary(self, directory: Optional[Union[str, Path]] = None) -> int:
+        """Collect entity names from the knowledge base.
+
+        Every name gets its full name as an alias; trainers also get
+        their first name.
+
+        Args:
+            directory: Knowledge base directory (uses config default if None)
+
+        Returns:
+            Number of entities found
+        """
+        directory = Path(directory or self.config.knowledge_base_dir)
+        aliases = {}
+        for name in self.config.entity_sources:
+            try:
+                text = (directory / name).read_text(encoding='utf-8')
+            except OSError as e:
+                self.logger.warning(f"Skipping entities from {name}: {str(e)}")
+                continue
+
+            for _, section, subject, attribute, _ in extract_facts(text, name):
+                if attribute != 'description':
+                    continue
+                aliases[normalize_text(subject)] = subject
+                words = subject.split()
+                if 'trainer' in section.lower() and len(words) > 1:
+                    aliases[normalize_text(words[0])] = subject
+
+        with self._lock:
+            self.aliases = aliases
+            self.postings = {}
+            self._compile()
+
+        self.logger.info(f"Entity dictionary has {len(set(aliases.values()))} entities")
+        return len(set(aliases.values()))
+
+    def add_chunks(self, ids: List[str], texts: List[str]) -> None:
+        """Add chunks to the posting lists of the entities they mention.
+
+        Args:
+            ids: Chunk ids
+            texts: Chunk texts, in the same order
+        """
+        if self._automaton is None:
+            self.build_dictionary()
+
+        with self._lock:
+            for chunk_id, text in zip(ids, texts):
+                for entity in self._find(text):
+                    postings = self.postings.setdefault(entity, [])
+                    if chunk_id not in postings:
+                        postings.append(chunk_id)
+
+    def remove_chunks(self, ids: List[str]) -> None:
+        """Drop deleted chunks from the posting lists.
+
+        Args:
+            ids: Chunk ids
+        """
+        removed = set(ids)
+        with self._lock:
+            for entity, postings in self.postings.items():
+                self.postings[entity] = [chunk_id for chunk_id in postings if chunk_id not in removed]
+
+    def match(self, query: str) -> List[str]:
+        """Find the entities a query names.
+
+        Args:
+            query: User query
+
+        Returns:
+            Entity names in order of first mention
+        """
+        with self._lock:
+            return self._find(query)
+
+    def lookup(self, query: str) -> List[str]:
+        """Get the chunks mentioning the entities a query names.
+
+        Args:
+            query: User query
+
+        Returns:
+            Chunk ids, those of the first-mentioned entity first
+        """
+        chunk_ids = []
+        for entity in self.match(query):
+            for chunk_id in self.postings.get(entity, []):
+                if chunk_id not in chunk_ids:
+                    chunk_ids.append(chunk_id)
+        return chunk_ids
+
+    def save(self) -> None:
+        """Save the index next to the vector store."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                payload = json.dumps({'aliases': self.aliases, 'postings': self.postings})
+            self.path.write_text(payload, encoding='utf-8')
+        except OSError as e:
+            self.logger.warning(f"Could not save entity index: {str(e)}")
+
+    def clear(self) -> None:
+        """Forget all entities and postings, including the saved index."""
+        with self._lock:
+            self.aliases = {}
+            self.postings = {}
+            self._automaton = None
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    def _compile(self) -> None:
+        """Rebuild the automaton from the aliases."""
+        self._alias_list = list(self.aliases)
+        self._automaton = AhoCorasick(self._alias_list) if self._alias_list else None
+
+    def _find(self, text: str) -> List[str]:
+        """Entities named in text, in order of first mention."""
+        if self._automaton is None:
+            return []
+
+        found = []
+        for _, index in self._automaton.iter_matches(normalize_text(text)):
+            entity = self.aliases[self._alias_list[index]]
+            if entity not in found:
+                found.append(entity)
+        return found
@@ -0,0 +1,190 @@
+"""Pattern-based fact lookup for FIT-FLIX RAG system."""
+
+import logging
+import re
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+from .fact_store import FactStore
+
+
+PRICE_PATTERN = re.compile(r'\b(how much|price|prices|pricing|cost|costs|fee|fees|charge|charges)\b')
+# Price questions naming no plan or period must still be about membership
+PRICE_TOPIC_PATTERN = re.compile(r'\b(membership|memberships|plan|plans|subscription|subscriptions)\b')
+# Words asking about something other than the listed plan prices (refunds, add-ons, special rates)
+PRICE_OTHER_INTENT_PATTERN = re.compile(
+    r'\b(refund\w*|cancel\w*|join\w*|registration|admission|extra|additional|add on|discount\w*|'
+    r'included|include|includes|free|student\w*|kid\w*|child\w*|famil\w*|couple\w*|corporate|'
+    r'penalt\w*|late|freez\w*|pause|transfer\w*|upgrad\w*|downgrad\w*|deposit|tax\w*|gst)\b'
+)
+TRAINER_PATTERN = re.compile(r'\b(who|which)\b.*\b(trainer|trainers|instructor|instructors|coach|coaches|teach\w*|train\w*)\b')
+DESCRIBE_PATTERN = re.compile(r"^(what is|what s|what are|tell me about|describe|who is|who s)\b")
+NON_WORD_PATTERN = re.compile(r'[^a-z0-9]+')
+
+# Query words that name a billing period, mapped to how price columns start
+PERIOD_WORDS = {
+    'month': 'monthly', 'monthly': 'monthly',
+    'quarter': 'quarterly', 'quarterly': 'quarterly',
+    'year': 'annual', 'yearly': 'annual', 'annual': 'annual', 'annually': 'annual'
+}
+# First words too common to identify a subject on their own
+GENERIC_WORDS = {'high', 'body', 'group', 'personal', 'martial', 'key'}
+# Attribute words that do not say which attribute is meant
+ATTRIBUTE_STOPWORDS = {'additional', 'included', 'for', 'membership', 'inr', 'the', 'of', 'and'}
+# Question words ignored when matching a trainer's specialization
+QUESTION_STOPWORDS = {
+    'who', 'which', 'what', 'does', 'do', 'is', 'are', 'the', 'a', 'an', 'for', 'in', 'at', 'of', 'can',
+    'me', 'my', 'i', 'you', 'your', 'with', 'best', 'good', 'gym', 'fitflix', 'trainer', 'trainers',
+    'instructor', 'instructors', 'coach', 'coaches', 'teach', 'teaches', 'train', 'trains', 'help', 'helps'
+}
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and reduce it to single-space separated words.
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        Normalized text padded with a space on each side, for phrase matching
+    """
+    return f" {NON_WORD_PATTERN.sub(' ', text.lower()).strip()} "
+
+
+class FactMatcher:
+    """Answers price, plan, class and trainer lookups straight from the fact store.
+
+    A few patterns recognise lookup questions and the subjects they name;
+    anything they do not recognise returns None and goes through RAG.
+    """
+
+    def __init__(self, fact_store: FactStore):
+        """Initialize the matcher.
+
+        Args:
+            fact_store: Built fact store
+        """
+        self.fact_store = fact_store
+        self.logger = logging.getLogger(__name__)
+        self._aliases: List[Tuple[str, str]] = []  # (normalized alias, subject)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Reload the subjects to look for, after the fact store is rebuilt."""
+        aliases = []
+        for subject in self.fact_store.get_subjects():
+            name = normalize_text(subject)
+            aliases.append((name, subject))
+            first_word = name.split()[0] if name.split() else ""
+            if len(name.split()) > 1 and len(first_word) > 3 and first_word not in GENERIC_WORDS:
+                aliases.append((f" {first_word} ", subject))
+        self._aliases = aliases
+
+    def answer(self, query: str) -> Optional[Dict[str, Any]]:
+        """Answer a query if it is a recognised fact lookup.
+
+        Args:
+            query: User query
+
+        Returns:
+            Dictionary with answer, sources and the rule that matched, or None
+        """
+        text = normalize_text(query)
+        subjects = self._find_subjects(text)
+
+        for rule in (self._match_price, self._match_trainer, self._match_subject):
+            result = rule(text, subjects)
+            if result is not None:
+                with self._lock:
+                    self.hits += 1
+                return result
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get matcher statistics.
+
+        Returns:
+            Dictionary with hits and misses
+        """
+        return {"hits": self.hits, "misses": self.misses, "subjects": len(self._aliases)}
+
+    def _find_subjects(self, text: str) -> List[str]:
+        """Subjects named in normalized query text, in extraction order."""
+        found = []
+        for alias, subject in self._aliases:
+            if alias in text and subject not in found:
+                found.append(subject)
+        return found
+
+    def _match_price(self, text: str, subjects: List[str]) -> Optional[Dict[str, Any]]:
+        """Price questions, optionally about one plan and billing period."""
+        if not PRICE_PATTERN.search(text) or PRICE_OTHER_INTENT_PATTERN.search(text):
+            return None
+
+        periods = {PERIOD_WORDS[word] for word in text.split() if word in PERIOD_WORDS}
+        facts = self.fact_store.get_facts(attribute_like='%price%')
+        priced = [subject for subject in subjects if any(fact['subject'] == subject for fact in facts)]
+        if not (priced or periods or PRICE_TOPIC_PATTERN.search(text)):
+            return None
+
+        if priced:
+            facts = [fact for fact in facts if fact['subject'] in priced]
+        if periods:
+            facts = [fact for fact in facts if fact['attribute'].lower().split()[0] in periods]
+        return self._format(facts, 'price')
+
+    def _match_trainer(self, text: str, subjects: List[str]) -> Optional[Dict[str, Any]]:
+        """Questions about which trainer covers a specialization."""
+        if not TRAINER_PATTERN.search(text):
+            return None
+
+        words = [word for word in text.split() if word not in QUESTION_STOPWORDS]
+        if not words:
+            return None
+
+        facts = [
+            fact for fact in self.fact_store.get_facts(attribute_like='description')
+            if 'trainer' in fact['section'].lower()
+            and all(f" {word} " in normalize_text(fact['value']) for word in words)
+        ]
+        return self._format(facts, 'trainer')
+
+    def _match_subject(self, text: str, subjects: List[str]) -> Optional[Dict[str, Any]]:
+        """Questions about one attribute of a named subject, or the subject as a whole."""
+        if not subjects:
+            return None
+
+        facts = self.fact_store.get_facts(subject=subjects[0])
+        matching = []
+        for fact in facts:
+            words = [word for word in normalize_text(fact['attribute']).split() if word not in ATTRIBUTE_STOPWORDS]
+            if words and fact['attribute'] != 'description' and all(f" {word} " in text for word in words):
+                matching.append(fact)
+        if matching:
+            return self._format(matching, 'attribute')
+
+        if DESCRIBE_PATTERN.search(text.strip()):
+            # Describe the subject by everything except its prices
+            return self._format([fact for fact in facts if 'price' not in fact['attribute'].lower()], 'describe')
+        return None
+
+    def _format(self, facts: List[Dict[str, Any]], rule: str) -> Optional[Dict[str, Any]]:
+        """Render facts as a bulleted answer citing where they came from."""
+        if not facts:
+            return None
+
+        lines = [f"From *{facts[0]['section']}* in {facts[0]['source']}:"]
+        for fact in facts:
+            if fact['attribute'] == 'description':
+                lines.append(f"- **{fact['subject']}:** {fact['value']}")
+            else:
+                lines.append(f"- **{fact['subject']}**, {fact['attribute']}: {fact['value']}")
+
+        sources = list(dict.fromkeys(fact['source'] for fact in facts))
+        return {'answer': "\n".join(lines), 'sources': sources, 'rule': rule}
@@ -0,0 +1,167 @@
+"""Structured fact store for FIT-FLIX RAG system."""
+
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+from ..utils.markdown_sections import parse_markdown_sections
+
+
+# "- **Key:** value" list items
+BULLET_FACT_PATTERN = re.compile(r'^[ \t]*[-*][ \t]+\*\*(.+?):\*\*[ \t]*(.+?)[ \t]*$', re.MULTILINE)
+TABLE_ROW_PATTERN = re.compile(r'^[ \t]*\|(.+)\|[ \t]*$', re.MULTILINE)
+TABLE_SEPARATOR_PATTERN = re.compile(r'^:?-+:?$')
+# Sections such as "2. Standard Membership" describe a single entity
+NUMBERED_TITLE_PATTERN = re.compile(r'^\d+\.\s+(.+)$')
+
+Fact = Tuple[str, str, str, str, str]  # (source, section, subject, attribute, value)
+
+
+def extract_facts(text: str, source: str) -> List[Fact]:
+    """Extract facts from the tables and key/value lists of a markdown file.
+
+    Table rows become one fact per cell, keyed by the row's first cell
+    and the column header. List items under a numbered section describe
+    that section's entity; list items elsewhere each describe the entity
+    they name.
+
+    Args:
+        text: Raw markdown text
+        source: File name recorded with each fact
+
+    Returns:
+        List of (source, section, subject, attribute, value) facts
+    """
+    facts = []
+    for section in parse_markdown_sections(text):
+        title = section.header_path[-1] if section.header_path else ""
+        body = text[section.start:section.end]
+
+        rows = [
+            [cell.strip() for cell in match.group(1).split('|')]
+            for match in TABLE_ROW_PATTERN.finditer(body)
+        ]
+        rows = [row for row in rows if not all(TABLE_SEPARATOR_PATTERN.match(cell) for cell in row)]
+        if len(rows) > 1:
+            header = rows[0]
+            for row in rows[1:]:
+                for attribute, value in zip(header[1:], row[1:]):
+                    if value:
+                        facts.append((source, title, row[0], attribute, value))
+
+        numbered = NUMBERED_TITLE_PATTERN.match(title)
+        for match in BULLET_FACT_PATTERN.finditer(body):
+            key, value = match.group(1).strip(), match.group(2).strip()
+            if numbered:
+                facts.append((source, title, numbered.group(1), key, value))
+            else:
+                facts.append((source, title, key, 'description', value))
+
+    return facts
+
+
+class FactStore:
+    """Facts from the knowledge base's tables and lists, kept in SQLite."""
+
+    def __init__(self, config, path: Optional[Union[str, Path]] = None):
+        """Initialize the fact store.
+
+        Args:
+            config: Configuration object containing fact store settings
+            path: SQLite file (uses config default if None; memory only if that is None)
+        """
+        self.config = config
+        self.path = path or config.fact_store_path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        try:
+            if self.path:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path or ":memory:"), check_same_thread=False)
+        except Exception as e:
+            self.logger.warning(f"Fact store falling back to memory only: {str(e)}")
+            self._connection = sqlite3.connect(":memory:", check_same_thread=False)
+
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS facts ("
+            "source TEXT NOT NULL, section TEXT NOT NULL, subject TEXT NOT NULL, "
+            "attribute TEXT NOT NULL, value TEXT NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS facts_subject ON facts (subject)")
+        self._connection.commit()
+
+    def build(self, directory: Optional[Union[str, Path]] = None) -> int:
+        """Re-extract all facts from the configured knowledge base files.
+
+        Args:
+            directory: Knowledge base directory (uses config default if None)
+
+        Returns:
+            Number of facts stored
+        """
+        directory = Path(directory or self.config.knowledge_base_dir)
+        facts = []
+        for name in self.config.fact_sources:
+            try:
+                text = (directory / name).read_text(encoding='utf-8')
+            except OSError as e:
+                self.logger.warning(f"Skipping facts from {name}: {str(e)}")
+                continue
+            facts.extend(extract_facts(text, name))
+
+        with self._lock:
+            try:
+                with self._connection:
+                    self._connection.execute("DELETE FROM facts")
+                    self._connection.executemany("INSERT INTO facts VALUES (?, ?, ?, ?, ?)", facts)
+            except Exception as e:
+                self.logger.error(f"Failed to store facts: {str(e)}")
+                raise
+
+        self.logger.info(f"Stored {len(facts)} facts from {len(self.config.fact_sources)} files")
+        return len(facts)
+
+    def count(self) -> int:
+        """Number of stored facts."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+
+    def get_subjects(self) -> List[str]:
+        """Get every subject that has facts.
+
+        Returns:
+            Subjects in the order they were extracted
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT subject FROM facts GROUP BY subject ORDER BY MIN(rowid)"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_facts(self, subject: Optional[str] = None,
+                  attribute_like: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Look up facts.
+
+        Args:
+            subject: Only facts about this subject (all if None)
+            attribute_like: SQL LIKE pattern the attribute must match (any if None)
+
+        Returns:
+            Facts as dictionaries, in extraction order
+        """
+        query = "SELECT source, section, subject, attribute, value FROM facts WHERE 1 = 1"
+        params = []
+        if subject is not None:
+            query += " AND subject = ?"
+            params.append(subject)
+        if attribute_like is not None:
+            query += " AND attribute LIKE ?"
+            params.append(attribute_like)
+
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY rowid", params).fetchall()
+        return [dict(zip(('source', 'section', 'subject', 'attribute', 'value'), row)) for row in rows]
@@ -0,0 +1,140 @@
+"""FAQ fast path for FIT-FLIX RAG system."""
+
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union
+import numpy as np
+
+
+# A "**Q: ...**" line followed by its "A: ..." answer, up to the next blank line
+FAQ_ENTRY_PATTERN = re.compile(r'^\*\*Q:\s*(.+?)\*\*[ \t]*\n\s*A:\s*(.+?)(?=\n\s*\n|\n\*\*Q:|\Z)', re.MULTILINE | re.DOTALL)
+HEADER_PATTERN = re.compile(r'^#{1,6}\s+(.+?)\s*$', re.MULTILINE)
+
+
+def parse_faq(text: str) -> List[Dict[str, str]]:
+    """Parse question/answer pairs from an FAQ markdown file.
+
+    Args:
+        text: FAQ markdown
+
+    Returns:
+        List of entries with question, answer and section
+    """
+    headers = [(match.start(), match.group(1)) for match in HEADER_PATTERN.finditer(text)]
+
+    entries = []
+    for match in FAQ_ENTRY_PATTERN.finditer(text):
+        section = ""
+        for start, title in headers:
+            if start > match.start():
+                break
+            section = title
+        entries.append({
+            'question': match.group(1).strip(),
+            'answer': " ".join(match.group(2).split()),
+            'section': section
+        })
+    return entries
+
+
+class FAQIndex:
+    """Answers questions that match a curated FAQ entry, without the LLM.
+
+    Only the FAQ questions are embedded, so an incoming query is compared
+    with what was asked rather than with answer text. A match must clear
+    a high threshold, because the curated answer is returned verbatim.
+    """
+
+    def __init__(self, config, embedding_manager):
+        """Initialize an empty FAQ index.
+
+        Args:
+            config: Configuration object containing FAQ settings
+            embedding_manager: Embedding manager used for queries
+        """
+        self.config = config
+        self.embedding_manager = embedding_manager
+        self.threshold = config.faq_match_threshold
+        self.logger = logging.getLogger(__name__)
+
+        self._entries: List[Dict[str, str]] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def build(self, path: Optional[Union[str, Path]] = None) -> int:
+        """Parse the FAQ file and embed its questions.
+
+        Args:
+            path: FAQ markdown file (uses config default if None)
+
+        Returns:
+            Number of FAQ entries indexed
+        """
+        path = Path(path or self.config.faq_path)
+        try:
+            entries = parse_faq(path.read_text(encoding='utf-8'))
+        except OSError as e:
+            self.logger.warning(f"FAQ fast path disabled, could not read {path}: {str(e)}")
+            return 0
+
+        vectors = None
+        if entries:
+            vectors = np.asarray(self.embedding_manager.embed_texts([entry['question'] for entry in entries]),
+                                 dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        for entry in entries:
+            entry['source'] = path.name
+
+        with self._lock:
+            self._entries = entries
+            self._vectors = vectors
+
+        self.logger.info(f"Indexed {len(entries)} FAQ entries from {path.name}")
+        return len(entries)
+
+    def lookup(self, query_embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """Find the FAQ entry asking the same question.
+
+        Args:
+            query_embedding: Embedding of the incoming question
+
+        Returns:
+            Dictionary with question, answer, section, source and similarity, or None
+        """
+        with self._lock:
+            entries = self._entries
+            vectors = self._vectors
+
+        if vectors is None:
+            return None
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        similarities = vectors @ (query / max(np.linalg.norm(query), 1e-12))
+        best = int(np.argmax(similarities))
+
+        with self._lock:
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return {**entries[best], 'similarity': float(similarities[best])}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get fast path statistics.
+
+        Returns:
+            Dictionary with entry count, hits and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
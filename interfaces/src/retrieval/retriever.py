@@ -2,10 +2,39 @@
 
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import logging
+import numpy as np
 
 from ..embeddings.embedding_manager import EmbeddingManager
+from ..utils.deadline import Deadline
+from ..utils.single_flight import SingleFlight
+from ..utils.text_splitter import ChunkSpans
+from .document_index import DocumentIndex
+from .entity_index import EntityIndex
+from .working_set import WorkingSet
+
+
+def chunk_ids(metadata: List[Dict[str, Any]]) -> List[str]:
+    """Derive stable chunk IDs from chunk metadata.
+    
+    An ID combines the chunk's file, its page or section and its index
+    within that part, so chunks added in separate batches or loads never
+    collide and a changed file's chunks can be replaced in place.
+    
+    Args:
+        metadata: Chunk metadata dictionaries
+        
+    Returns:
+        One ID per chunk
+    """
+    ids = []
+    for i, meta in enumerate(metadata):
+        file_path = meta.get('file_path') or meta.get('source', 'unknown')
+        part = meta.get('page', meta.get('section', 0))
+        ids.append(f"{file_path}#{part}.{meta.get('chunk_id', i)}")
+    return ids
 
 
 class DocumentRetriever:
@@ -21,6 +50,11 @@ class DocumentRetriever:
         self.embedding_manager = EmbeddingManager(config)
         self.client = None
         self.collection = None
+        self.document_index: Optional[DocumentIndex] = None
+        self.entity_index = EntityIndex(config) if config.entity_index_enabled else None
+        # Bumped whenever the indexed content changes, so caches can invalidate
+        self.generation_file = Path(config.chroma_db_path) / "index_generation"
+        self.single_flight = SingleFlight()
         self.logger = logging.getLogger(__name__)
     
     def initialize(self):
@@ -45,6 +79,13 @@ class DocumentRetriever:
                 )
                 self.logger.info(f"Created new collection '{self.config.collection_name}'")
             
+            if self.config.document_index_enabled:
+                self.document_index = DocumentIndex(self.config, self.client, self.embedding_manager)
+                self.document_index.initialize()
+            
+            if self.entity_index is not None:
+                self.entity_index.load()
+            
         except Exception as e:
             self.logger.error(f"Failed to initialize retriever: {str(e)}")
             raise
@@ -62,7 +103,7 @@ class DocumentRetriever:
         
         try:
             if not ids:
-                ids = [f"doc_{i}" for i in range(len(documents))]
+                ids = chunk_ids(metadata)
             
             # Generate embeddings manually
             embeddings = self.embedding_manager.embed_texts(documents)
@@ -82,38 +123,195 @@ class DocumentRetriever:
                     embeddings=batch_embeddings
                 )
             
+            if self.entity_index is not None:
+                self.entity_index.add_chunks(ids, documents)
+                self.entity_index.save()
+            
+            self._bump_index_generation()
             self.logger.info(f"Added {len(documents)} documents to collection")
             
         except Exception as e:
             self.logger.error(f"Failed to add documents: {str(e)}")
             raise
     
-    def retrieve(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    def add_chunks(self, chunks: ChunkSpans, ids: Optional[List[str]] = None, batch_size: int = 100):
+        """Add chunk spans to the vector store, materializing text per batch.
+        
+        Args:
+            chunks: Chunk spans from TextSplitter.split_documents_to_spans
+            ids: Optional list of chunk IDs (derived from each chunk's file if None)
+            batch_size: Number of chunks embedded and stored at a time
+        """
+        for i in range(0, len(chunks), batch_size):
+            metadata = chunks.metadatas(i, i + batch_size)
+            self.add_documents(
+                chunks.texts(i, i + batch_size),
+                metadata,
+                ids[i:i + batch_size] if ids else chunk_ids(metadata)
+            )
+    
+    def add_document_summaries(self, documents: List[Dict[str, Any]],
+                               summarize: Optional[Callable[[str], str]] = None) -> int:
+        """Index one summary per source document for coarse-to-fine retrieval.
+        
+        Args:
+            documents: Loaded documents, before splitting
+            summarize: Function(text) returning a summary (extractive if None)
+            
+        Returns:
+            Number of source documents indexed
+        """
+        if self.document_index is None:
+            return 0
+        
+        indexed = self.document_index.add_documents(documents, summarize)
+        self._bump_index_generation()
+        return indexed
+    
+    def delete_files(self, file_paths: List[Path]) -> int:
+        """Remove the chunks and summaries of source files that were deleted or changed.
+        
+        Args:
+            file_paths: Paths of the files, as recorded in chunk metadata
+            
+        Returns:
+            Number of chunks removed
+        """
+        if not self.collection:
+            raise RuntimeError("Retriever not initialized. Call initialize() first.")
+        
+        paths = [str(path) for path in file_paths]
+        if not paths:
+            return 0
+        
+        try:
+            where = {'file_path': {'$in': paths}}
+            ids = self.collection.get(where=where, include=[])['ids']
+            if ids:
+                self.collection.delete(ids=ids)
+            
+            if self.document_index is not None:
+                self.document_index.remove_sources(paths)
+            if self.entity_index is not None and ids:
+                self.entity_index.remove_chunks(ids)
+                self.entity_index.save()
+            
+            self._bump_index_generation()
+            self.logger.info(f"Removed {len(ids)} chunks of {len(paths)} files")
+            return len(ids)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to remove files: {str(e)}")
+            raise
+    
+    def retrieve(self, query: str, n_results: int = 5,
+                 query_embedding: Optional[List[float]] = None,
+                 working_set: Optional[WorkingSet] = None,
+                 follow_up: bool = False,
+                 deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
         """Retrieve relevant documents for a query.
         
+        Concurrent identical queries share a single vector search. With a
+        working set, a follow-up is first tried against the previous turn's
+        chunks and the index is searched only when they do not cover it;
+        standalone queries always search the index, so their results (and
+        the cached answers built on them) do not depend on the session. With a
+        document index, the search is limited to the chunks of the
+        best-matching source documents. Chunks mentioning a trainer, class
+        or facility named in the query are moved to the front, and added
+        if the search missed them.
+        
+        The deadline is checked between stages. Document selection and the
+        entity boost only refine the results, so they are skipped once it
+        has passed; the embedding and the vector search are required, so
+        they raise instead.
+        
         Args:
             query: Search query
             n_results: Number of results to return
+            query_embedding: Precomputed query embedding (computed if None)
+            working_set: The session's working set, updated after a full search
+            follow_up: Whether the query refers to earlier turns (only then is the working set searched)
+            deadline: Time by which retrieval must be done (unbounded if None)
             
         Returns:
             List of relevant documents with metadata
+            
+        Raises:
+            DeadlineExceeded: If the deadline passes before the vector search
         """
         if not self.collection:
             raise RuntimeError("Retriever not initialized. Call initialize() first.")
         
+        deadline = deadline or Deadline()
+        
+        if working_set is not None and follow_up:
+            if query_embedding is None:
+                deadline.check("query embedding")
+                query_embedding = self.embedding_manager.embed_text(query)
+            documents = working_set.search(query_embedding, n_results, self.get_index_generation(), follow_up)
+            if documents is not None:
+                return documents
+        
+        # The document and entity indexes need the embedding before the search does
+        if query_embedding is None and (self.document_index is not None or self.entity_index is not None):
+            deadline.check("query embedding")
+            query_embedding = self.embedding_manager.embed_text(query)
+        
+        sources = None
+        if self.document_index is not None and not deadline.expired:
+            sources = self.document_index.select_sources(query_embedding, self.config.document_index_top_m)
+        
+        # Callers passing a different embedding or source filter get their own search
+        flight_key = (
+            query, n_results,
+            tuple(query_embedding) if query_embedding is not None else None,
+            tuple(sources) if sources else None
+        )
+        deadline.check("vector search")
+        documents, embeddings = self.single_flight.do(
+            flight_key,
+            self._query_collection, query, n_results, query_embedding, sources
+        )
+        
+        if self.entity_index is not None and documents and not deadline.expired:
+            documents, embeddings = self._boost_entities(query, n_results, query_embedding,
+                                                         list(documents), list(embeddings))
+        
+        if working_set is not None and documents and len(embeddings) == len(documents):
+            working_set.update(documents, embeddings, self.get_index_generation())
+        return [dict(doc) for doc in documents]
+    
+    def _query_collection(self, query: str, n_results: int,
+                          query_embedding: Optional[List[float]],
+                          sources: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], List[List[float]]]:
+        """Run a vector search against the collection.
+        
+        Args:
+            query: Search query
+            n_results: Number of results to return
+            query_embedding: Precomputed query embedding (computed if None)
+            sources: File paths of the source documents to restrict the search to (all if None)
+            
+        Returns:
+            Tuple of (relevant documents with metadata, their stored embeddings)
+        """
         try:
             # Check if collection is empty
             count = self.collection.count()
             if count == 0:
                 self.logger.warning("Collection is empty. No documents to retrieve.")
-                return []
+                return [], []
             
             # Generate query embedding
-            query_embedding = self.embedding_manager.embed_text(query)
+            if query_embedding is None:
+                query_embedding = self.embedding_manager.embed_text(query)
             
             results = self.collection.query(
                 query_embeddings=[query_embedding],
-                n_results=min(n_results, count)
+                n_results=min(n_results, count),
+                where={'file_path': {'$in': sources}} if sources else None,
+                include=['documents', 'metadatas', 'distances', 'embeddings']
             )
             
             # Format results
@@ -121,18 +319,101 @@ class DocumentRetriever:
             if results['documents'] and results['documents'][0]:
                 for i in range(len(results['documents'][0])):
                     doc = {
+                        'id': results['ids'][0][i],
                         'content': results['documents'][0][i],
                         'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
                         'distance': results['distances'][0][i] if results['distances'] else None
                     }
                     documents.append(doc)
             
+            embeddings = results['embeddings'][0] if results.get('embeddings') is not None else []
+            
             self.logger.info(f"Retrieved {len(documents)} documents for query: {query[:50]}...")
-            return documents
+            return documents, embeddings
             
         except Exception as e:
             self.logger.error(f"Failed to retrieve documents: {str(e)}")
-            return []
+            return [], []
+    
+    def _boost_entities(self, query: str, n_results: int, query_embedding: Optional[List[float]],
+                        documents: List[Dict[str, Any]],
+                        embeddings: List[List[float]]) -> Tuple[List[Dict[str, Any]], List[List[float]]]:
+        """Put the closest chunks mentioning the query's named entities first.
+        
+        Every chunk on the entities' posting lists is ranked by its
+        distance to the query, and only the closest ``entity_max_chunks``
+        are boosted; the rest of the results keep their vector search order.
+        
+        Args:
+            query: Search query
+            n_results: Number of results to return
+            query_embedding: Query embedding, for the distance of added chunks
+            documents: Vector search results
+            embeddings: Their stored embeddings, in the same order
+            
+        Returns:
+            Tuple of (re-ordered documents, their embeddings)
+        """
+        entity_ids = self.entity_index.lookup(query)
+        if not entity_ids:
+            return documents, embeddings
+        
+        found = {doc['id'] for doc in documents}
+        searched = len(documents)
+        has_embeddings = len(embeddings) == len(documents)
+        missing = [chunk_id for chunk_id in entity_ids if chunk_id not in found]
+        if missing:
+            try:
+                results = self.collection.get(ids=missing, include=['documents', 'metadatas', 'embeddings'])
+                fetched = results.get('embeddings')
+                for i, chunk_id in enumerate(results['ids']):
+                    embedding = fetched[i] if fetched is not None else None
+                    distance = None
+                    if embedding is not None and query_embedding is not None:
+                        distance = float(((np.asarray(embedding) - np.asarray(query_embedding)) ** 2).sum())
+                    documents.append({
+                        'id': chunk_id,
+                        'content': results['documents'][i],
+                        'metadata': results['metadatas'][i] if results['metadatas'] else {},
+                        'distance': distance
+                    })
+                    embeddings.append(embedding)
+            except Exception as e:
+                self.logger.warning(f"Could not fetch entity chunks: {str(e)}")
+        
+        # Closest entity chunks first (unknown distances last), then the other vector hits
+        entity_ids = set(entity_ids)
+        candidates = [i for i in range(len(documents)) if documents[i]['id'] in entity_ids]
+        candidates.sort(key=lambda i: (documents[i]['distance'] is None, documents[i]['distance'] or 0.0))
+        boosted = candidates[:self.config.entity_max_chunks]
+        rest = [i for i in range(len(documents)) if i < searched and i not in boosted]
+        order = (boosted + rest)[:n_results]
+        
+        documents = [documents[i] for i in order]
+        if has_embeddings and all(embeddings[i] is not None for i in order):
+            embeddings = [embeddings[i] for i in order]
+        else:
+            embeddings = []
+        return documents, embeddings
+    
+    def get_index_generation(self) -> int:
+        """Get the generation of the indexed content.
+        
+        Returns:
+            Counter that changes whenever documents are added or the collection is deleted
+        """
+        try:
+            return int(self.generation_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return 0
+    
+    def _bump_index_generation(self):
+        """Advance the index generation."""
+        try:
+            self.generation_file.parent.mkdir(parents=True, exist_ok=True)
+            self.generation_file.write_text(str(self.get_index_generation() + 1), encoding='utf-8')
+        except OSError as e:
+            self.logger.warning(f"Could not update index generation: {str(e)}")
     
     def get_retrieval_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store.
@@ -148,6 +429,8 @@ class DocumentRetriever:
             return {
                 'document_count': count,
                 'collection_name': self.config.collection_name,
+                'index_generation': self.get_index_generation(),
+                'indexed_sources': self.document_index.count() if self.document_index else 0,
                 'status': 'ready'
             }
         except Exception as e:
@@ -159,6 +442,11 @@ class DocumentRetriever:
         if self.client:
             try:
                 self.client.delete_collection(self.config.collection_name)
+                if self.document_index is not None:
+                    self.document_index.delete()
+                if self.entity_index is not None:
+                    self.entity_index.clear()
+                self._bump_index_generation()
                 self.logger.info(f"Deleted collection '{self.config.collection_name}'")
             except Exception as e:
                 self.logger.warning(f"Could not delete collection: {str(e)}")
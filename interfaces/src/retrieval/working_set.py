@@ -0,0 +1,97 @@
+"""Per-session retrieval working set for FIT-FLIX RAG system."""
+
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+
+class WorkingSet:
+    """The chunks retrieved for a session's previous turn, kept for follow-ups.
+
+    Follow-up questions usually need the chunks the previous question
+    found. Scoring the new query against those few embeddings costs a
+    small matrix product instead of an index search; the full search runs
+    only when the working set does not cover the query.
+    """
+
+    def __init__(self, config):
+        """Initialize an empty working set.
+
+        Args:
+            config: Configuration object containing working set thresholds
+        """
+        self.config = config
+        self.threshold = config.working_set_threshold
+        self.follow_up_threshold = config.working_set_follow_up_threshold
+        self.logger = logging.getLogger(__name__)
+
+        self._documents: List[Dict[str, Any]] = []
+        self._embeddings: Optional[np.ndarray] = None
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, documents: List[Dict[str, Any]], embeddings: List[List[float]],
+               generation: Optional[int]) -> None:
+        """Replace the working set with a turn's retrieval results.
+
+        Args:
+            documents: Retrieved documents
+            embeddings: Their stored embeddings, in the same order
+            generation: Index generation they were retrieved from
+        """
+        with self._lock:
+            self._documents = [dict(document) for document in documents]
+            self._embeddings = np.asarray(embeddings, dtype=np.float32) if documents else None
+            self._generation = generation
+
+    def search(self, query_embedding: List[float], n_results: int,
+               generation: Optional[int], follow_up: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Answer a retrieval from the working set if it covers the query.
+
+        The set covers a query when its best chunk is similar enough to
+        it. Questions that refer back to the previous turn carry little
+        topic of their own, so they use the lower follow-up threshold.
+
+        Args:
+            query_embedding: Embedding of the new query
+            n_results: Number of results wanted
+            generation: Current index generation
+            follow_up: Whether the query refers to earlier turns
+
+        Returns:
+            Documents re-ranked for the new query, or None to fall back to a full search
+        """
+        with self._lock:
+            if self._embeddings is None or generation != self._generation or len(self._documents) < n_results:
+                self.misses += 1
+                return None
+            documents = self._documents
+            embeddings = self._embeddings
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query)
+        similarities = (embeddings @ query) / np.where(norms == 0, 1, norms)
+
+        threshold = self.follow_up_threshold if follow_up else self.threshold
+        if similarities.max() < threshold:
+            self.misses += 1
+            return None
+
+        # Squared L2, the collection's distance metric, so results compare with a full search
+        distances = ((embeddings - query) ** 2).sum(axis=1)
+        self.hits += 1
+        self.logger.info(f"Working set covered query (best similarity {similarities.max():.2f})")
+        return [
+            {**documents[index], 'distance': float(distances[index])}
+            for index in np.argsort(distances, kind='stable')[:n_results]
+        ]
+
+    def clear(self) -> None:
+        """Forget the working set."""
+        with self._lock:
+            self._documents = []
+            self._embeddings = None
+            self._generation = None
@@ -0,0 +1,66 @@
+"""Aho-Corasick multi-pattern matching for FIT-FLIX RAG System."""
+
+from collections import deque
+from typing import Dict, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """Finds every occurrence of many patterns in one pass over a text.
+
+    The patterns are compiled into a trie with failure links, so matching
+    costs time linear in the text plus the matches found, however many
+    patterns there are.
+    """
+
+    def __init__(self, patterns: List[str]):
+        """Compile the automaton.
+
+        Args:
+            patterns: Strings to search for
+        """
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth-first, so every failure link points at an already finished state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Find pattern occurrences, including overlapping ones.
+
+        Args:
+            text: Text to search
+
+        Yields:
+            Tuples of (start offset, pattern index) in order of match end
+        """
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._output[state]:
+                yield position - len(self.patterns[index]) + 1, index
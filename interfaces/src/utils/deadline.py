@@ -0,0 +1,65 @@
+"""Request deadlines for FIT-FLIX RAG System."""
+
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a pipeline stage runs out of its share of the request budget."""
+
+
+class Deadline:
+    """A point in time by which a request must be answered.
+
+    Created once per request and handed down through the pipeline, so
+    every stage sees the same shrinking budget.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """Start the clock.
+
+        Args:
+            seconds: Budget from now (no deadline if None)
+        """
+        self._expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        """Get the seconds left.
+
+        Returns:
+            Non-negative seconds left, or None without a deadline
+        """
+        if self._expires_at is None:
+            return None
+        return max(self._expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """Whether the budget is used up."""
+        return self.remaining() == 0.0
+
+    def reserve(self, seconds: float) -> "Deadline":
+        """Derive a deadline that ends earlier, keeping time back for later stages.
+
+        Args:
+            seconds: Time to hold back
+
+        Returns:
+            Earlier deadline (unbounded if this one is)
+        """
+        deadline = Deadline()
+        if self._expires_at is not None:
+            deadline._expires_at = self._expires_at - seconds
+        return deadline
+
+    def check(self, stage: str) -> None:
+        """Fail if the budget is used up.
+
+        Args:
+            stage: Pipeline stage, for the error message
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline exceeded before {stage}")
@@ -0,0 +1,189 @@
+"""Near-duplicate chunk elimination for FIT-FLIX RAG System."""
+
+import logging
+import re
+import zlib
+from collections import defaultdict
+from typing import List, Dict, Any, Optional
+import numpy as np
+from ..config import Config
+from .text_splitter import ChunkSpans
+
+
+TOKEN_PATTERN = re.compile(r'\w+')
+# Mersenne prime used for the universal hash family
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class ChunkDeduplicator:
+    """Finds and merges near-duplicate chunks with MinHash and LSH banding."""
+
+    def __init__(self, config: Optional[Config] = None, seed: int = 1):
+        """Initialize the deduplicator.
+
+        Args:
+            config: Configuration object
+            seed: Seed for the MinHash permutations
+        """
+        self.config = config or Config()
+        self.num_perm = self.config.dedup_num_perm
+        self.bands = self.config.dedup_bands
+        self.threshold = self.config.dedup_threshold
+        self.shingle_size = self.config.dedup_shingle_size
+        self.logger = logging.getLogger(__name__)
+
+        if self.num_perm % self.bands:
+            raise ValueError("dedup_num_perm must be a multiple of dedup_bands")
+        self.rows = self.num_perm // self.bands
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 31, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=self.num_perm, dtype=np.uint64)
+
+    def fingerprint(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text.
+
+        Args:
+            text: Text to fingerprint
+
+        Returns:
+            Signature of num_perm 32-bit values
+        """
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        k = self.shingle_size
+        shingles = {" ".join(tokens[i:i + k]) for i in range(max(len(tokens) - k + 1, 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+
+        # a < 2**31 and hashes < 2**32, so the products cannot overflow
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME
+        return (permuted & MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def find_clusters(self, texts: List[str]) -> List[List[int]]:
+        """Group near-duplicate texts.
+
+        Candidate pairs share at least one LSH band; a pair is merged only
+        when its estimated Jaccard similarity reaches the threshold.
+
+        Args:
+            texts: Texts to compare
+
+        Returns:
+            Clusters of text indices, each in ascending order, ordered by first index
+        """
+        if not texts:
+            return []
+
+        signatures = np.stack([self.fingerprint(text) for text in texts])
+        parent = list(range(len(texts)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.bands):
+            buckets = defaultdict(list)
+            rows = signatures[:, band * self.rows:(band + 1) * self.rows]
+            for i, row in enumerate(rows):
+                buckets[row.tobytes()].append(i)
+
+            for members in buckets.values():
+                first = members[0]
+                for other in members[1:]:
+                    root_first, root_other = find(first), find(other)
+                    if root_first == root_other:
+                        continue
+                    similarity = np.mean(signatures[first] == signatures[other])
+                    if similarity >= self.threshold:
+                        # Keep the lowest index as root so it becomes canonical
+                        parent[max(root_first, root_other)] = min(root_first, root_other)
+
+        clusters = defaultdict(list)
+        for i in range(len(texts)):
+            clusters[find(i)].append(i)
+        return [clusters[root] for root in sorted(clusters)]
+
+    def deduplicate(self, chunks: ChunkSpans) -> ChunkSpans:
+        """Keep one canonical span per cluster of near-duplicate chunks.
+
+        The first chunk of each cluster is kept and records the others in
+        ``duplicates``, so its metadata lists every merged source.
+
+        With the document index enabled, chunks are only merged within a
+        file: the chunk search is filtered on the kept chunk's file_path,
+        so a chunk merged across files would be lost to searches narrowed
+        to the other files.
+
+        Args:
+            chunks: Chunk spans from TextSplitter.split_documents_to_spans
+
+        Returns:
+            Chunk spans without near-duplicates
+        """
+        clusters = self.find_clusters(chunks.texts())
+        if self.config.document_index_enabled:
+            clusters = self._split_by_file(chunks, clusters)
+
+        for cluster in clusters:
+            if len(cluster) > 1:
+                chunks[cluster[0]].duplicates = [chunks[i] for i in cluster[1:]]
+
+        self.logger.info(f"Removed {len(chunks) - len(clusters)} near-duplicate chunks, kept {len(clusters)}")
+        return chunks.select([cluster[0] for cluster in clusters])
+
+    def _split_by_file(self, chunks: ChunkSpans, clusters: List[List[int]]) -> List[List[int]]:
+        """Split clusters so each only holds chunks of one file.
+
+        Args:
+            chunks: Chunk spans the clusters index into
+            clusters: Clusters of chunk indices, ordered by first index
+
+        Returns:
+            Clusters of chunk indices, ordered by first index
+        """
+        split = []
+        for cluster in clusters:
+            by_file: Dict[str, List[int]] = {}
+            for i in cluster:
+                metadata = chunks.documents[chunks[i].doc_id]['metadata']
+                by_file.setdefault(metadata.get('file_path') or metadata.get('source', ''), []).append(i)
+            split.extend(by_file.values())
+        return sorted(split)
+
+    def deduplicate_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep one canonical document per cluster of near-duplicate documents.
+
+        Args:
+            documents: Chunked document dictionaries
+
+        Returns:
+            Documents without near-duplicates, with merged sources in metadata
+        """
+        clusters = self.find_clusters([doc['content'] for doc in documents])
+        deduplicated = []
+
+        for cluster in clusters:
+            doc = documents[cluster[0]]
+            if len(cluster) > 1:
+                sources = []
+                for i in cluster:
+                    source = documents[i]['metadata'].get('source', '')
+                    if source not in sources:
+                        sources.append(source)
+                doc = {
+                    'content': doc['content'],
+                    'metadata': {
+                        **doc['metadata'],
+                        'sources': ", ".join(sources),
+                        'duplicate_count': len(cluster) - 1
+                    }
+                }
+            deduplicated.append(doc)
+
+        self.logger.info(f"Removed {len(documents) - len(deduplicated)} near-duplicate documents, kept {len(deduplicated)}")
+        return deduplicated
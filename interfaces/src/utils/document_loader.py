@@ -1,10 +1,98 @@
 """Document loading utilities for FIT-FLIX RAG System."""
 
 import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Iterator, Iterable, Tuple, Callable
 import re
+import docx
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from pypdf import PdfReader
 from ..config import Config
+from .file_scanner import FileScanner
+from .markdown_sections import parse_markdown_sections
+
+
+# Three or more line breaks (with any whitespace between) collapse to one blank line
+BLANK_LINES_PATTERN = re.compile(r'\n\s*\n\s*\n')
+
+# Inline markdown markup, each alternative capturing the text to keep
+INLINE_MARKUP = (
+    r'```[^`]*```'                  # code blocks (removed)
+    r'|\[([^\]]+)\]\([^\)]+\)'      # links, keep text
+    r'|\*\*\*([^\*]+)\*\*\*'         # bold italic
+    r'|\*\*([^\*]+)\*\*'             # bold
+    r'|\*([^\*]+)\*'                 # emphasis
+    r'|`([^`]+)`'                   # inline code, keep text
+)
+INLINE_MARKUP_PATTERN = re.compile(INLINE_MARKUP)
+# Header markers are only markup at the start of a line
+MARKDOWN_MARKUP_PATTERN = re.compile(r'^#+\s*|' + INLINE_MARKUP, re.MULTILINE)
+
+# File extensions handled by iter_documents
+DOCUMENT_FILE_TYPES = {".md": "markdown", ".txt": "text"}
+
+
+
+def _extract_pdf_pages(file_path: str, start: int, end: int) -> List[str]:
+    """Extract the text of pages ``start:end`` of a PDF (runs in a worker process).
+    
+    Args:
+        file_path: Path to the PDF file
+        start: Index of the first page
+        end: Index one past the last page
+        
+    Returns:
+        List of page texts
+    """
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def _extract_docx_sections(file_path: str) -> List[Tuple[str, str]]:
+    """Split a DOCX file into sections at its headings (runs in a worker process).
+    
+    Tables are kept in document order with one row per line, so class
+    timetables stay next to the heading they belong to.
+    
+    Args:
+        file_path: Path to the DOCX file
+        
+    Returns:
+        List of (section title, section text) tuples
+    """
+    document = docx.Document(file_path)
+    sections = []
+    title = ""
+    lines = []
+    
+    for element in document.element.body.iterchildren():
+        if element.tag.endswith('}p'):
+            paragraph = Paragraph(element, document)
+            text = paragraph.text.strip()
+            if not text:
+                continue
+            
+            if paragraph.style is not None and paragraph.style.name.startswith("Heading"):
+                if lines:
+                    sections.append((title, "\n".join(lines)))
+                title = text
+                lines = [text]
+            else:
+                lines.append(text)
+        
+        elif element.tag.endswith('}tbl'):
+            for row in Table(element, document).rows:
+                cells = [cell.text.strip() for cell in row.cells]
+                if any(cells):
+                    lines.append(" | ".join(cells))
+    
+    if lines:
+        sections.append((title, "\n".join(lines)))
+    
+    return sections
 
 
 class DocumentLoader:
@@ -17,10 +105,14 @@ class DocumentLoader:
             config: Configuration object
         """
         self.config = config or Config()
+        self.file_scanner = FileScanner(self.config)
         self.logger = logging.getLogger(__name__)
     
     def load_markdown_files(self, directory: Union[str, Path]) -> List[Dict[str, Any]]:
-        """Load markdown files from a directory.
+        """Load markdown files from a directory tree, honouring the scan rules.
+        
+        With markdown_split_sections enabled, each header section becomes
+        its own document.
         
         Args:
             directory: Directory containing markdown files
@@ -32,19 +124,8 @@ class DocumentLoader:
         documents = []
         
         try:
-            for md_file in directory.glob("*.md"):
-                content = self._load_markdown_file(md_file)
-                if content:
-                    doc = {
-                        "content": content,
-                        "metadata": {
-                            "source": md_file.name,
-                            "file_path": str(md_file),
-                            "file_type": "markdown",
-                            "category": self._infer_category(md_file.name)
-                        }
-                    }
-                    documents.append(doc)
+            for md_file in self.file_scanner.scan(directory, include=["*.md"]):
+                documents.extend(self._load_documents(md_file))
             
             self.logger.info(f"Loaded {len(documents)} markdown documents from {directory}")
             return documents
@@ -74,9 +155,58 @@ class DocumentLoader:
             self.logger.error(f"Failed to load {file_path}: {str(e)}")
             return None
     
+    def _load_markdown_sections(self, file_path: Path) -> List[Dict[str, Any]]:
+        """Load a markdown file as one document per header section.
+        
+        Each section's content starts with its header path, so a chunk
+        cut from it still says where it belongs. Sections without body
+        text are skipped; their titles live on in the paths below them.
+        
+        Args:
+            file_path: Path to the markdown file
+            
+        Returns:
+            List of document dictionaries with section metadata
+        """
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except Exception as e:
+            self.logger.error(f"Failed to load {file_path}: {str(e)}")
+            return []
+        
+        documents = []
+        for section in parse_markdown_sections(text):
+            body = self._clean_markdown(text[section.start:section.end])
+            if not body:
+                continue
+            
+            titles = [self._clean_markdown(title) for title in section.header_path]
+            header_path = " > ".join(titles)
+            documents.append({
+                "content": f"{header_path}\n\n{body}" if header_path else body,
+                "metadata": {
+                    "source": file_path.name,
+                    "file_path": str(file_path),
+                    "file_type": "markdown",
+                    "category": self._infer_category(file_path.name),
+                    "section": len(documents) + 1,
+                    "section_title": titles[-1] if titles else "",
+                    "header_path": header_path
+                }
+            })
+        
+        for doc in documents:
+            doc["metadata"]["total_sections"] = len(documents)
+        
+        return documents
+    
     def _clean_markdown(self, content: str) -> str:
         """Clean and preprocess markdown content.
         
+        Whitespace is normalized first, then headers, links, emphasis and
+        code are stripped in a single pass over the text.
+        
         Args:
             content: Raw markdown content
             
@@ -84,24 +214,31 @@ class DocumentLoader:
             Cleaned content
         """
         # Remove excessive whitespace
-        content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
+        content = BLANK_LINES_PATTERN.sub('\n\n', content)
         content = content.strip()
         
-        # Remove markdown headers (keep content)
-        content = re.sub(r'^#+\s*', '', content, flags=re.MULTILINE)
-        
-        # Remove markdown links but keep text
-        content = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', content)
+        # Remove markdown markup (keep content)
+        return MARKDOWN_MARKUP_PATTERN.sub(self._replace_markup, content)
+    
+    def _replace_markup(self, match: re.Match) -> str:
+        """Replace one markdown markup match with the text it wraps.
         
-        # Remove markdown emphasis markers
-        content = re.sub(r'\*\*([^\*]+)\*\*', r'\1', content)
-        content = re.sub(r'\*([^\*]+)\*', r'\1', content)
+        Args:
+            match: Match of MARKDOWN_MARKUP_PATTERN or INLINE_MARKUP_PATTERN
+            
+        Returns:
+            Replacement text
+        """
+        if match.lastindex is None:
+            # Headers and code blocks are dropped entirely
+            return ''
         
-        # Remove markdown code blocks
-        content = re.sub(r'```[^`]*```', '', content)
-        content = re.sub(r'`([^`]+)`', r'\1', content)
+        text = match.group(match.lastindex)
         
-        return content
+        # Markup can nest, e.g. emphasis inside link text
+        if '*' in text or '`' in text or '[' in text:
+            return INLINE_MARKUP_PATTERN.sub(self._replace_markup, text)
+        return text
     
     def _infer_category(self, filename: str) -> str:
         """Infer document category from filename.
@@ -136,7 +273,7 @@ class DocumentLoader:
             return 'general'
     
     def load_text_files(self, directory: Union[str, Path]) -> List[Dict[str, Any]]:
-        """Load text files from a directory.
+        """Load text files from a directory tree, honouring the scan rules.
         
         Args:
             directory: Directory containing text files
@@ -148,7 +285,7 @@ class DocumentLoader:
         documents = []
         
         try:
-            for txt_file in directory.glob("*.txt"):
+            for txt_file in self.file_scanner.scan(directory, include=["*.txt"]):
                 content = self._load_text_file(txt_file)
                 if content:
                     doc = {
@@ -183,23 +320,38 @@ class DocumentLoader:
                 content = f.read()
             
             # Basic text cleaning
-            content = content.strip()
-            content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
-            
-            return content
+            return self._clean_text(content)
             
         except Exception as e:
             self.logger.error(f"Failed to load {file_path}: {str(e)}")
             return None
     
-    def load_all_documents(self, directory: Optional[Union[str, Path]] = None) -> List[Dict[str, Any]]:
-        """Load all supported document types from a directory.
+    def iter_documents(self, directory: Optional[Union[str, Path]] = None,
+                       max_workers: Optional[int] = None,
+                       batch_size: int = 32,
+                       changed_only: bool = False,
+                       on_stale: Optional[Callable[[List[Path]], None]] = None) -> Iterator[Dict[str, Any]]:
+        """Load supported documents concurrently, yielding them as they finish.
+        
+        The directory tree is scanned recursively with the configured
+        include/exclude rules. Files are read and cleaned on a thread pool
+        in small batches, so documents arrive in completion order rather
+        than directory order. Only a few batches are in flight at once,
+        which keeps memory flat on large trees.
         
         Args:
             directory: Directory to load from (uses knowledge_base_dir if None)
+            max_workers: Number of reader threads (uses config default if None)
+            batch_size: Number of files handled per task
+            changed_only: Only load files whose mtime or size changed since
+                the last changed_only run, and record the new state afterwards
+            on_stale: Called with the files deleted, changed or added since the
+                last changed_only run, before any document is yielded, so their
+                old chunks can be purged before the new ones are added, such as
+                DocumentRetriever.delete_files
             
-        Returns:
-            List of all document dictionaries
+        Yields:
+            Document dictionaries
         """
         if directory is None:
             directory = self.config.knowledge_base_dir
@@ -208,25 +360,319 @@ class DocumentLoader:
         
         if not directory.exists():
             self.logger.error(f"Directory does not exist: {directory}")
-            return []
+            return
         
+        max_workers = max_workers or self.config.loader_max_workers
+        loaded = 0
+        
+        include = ["*" + suffix for suffix in DOCUMENT_FILE_TYPES]
+        if changed_only:
+            paths, removed = self.file_scanner.scan_changes(directory, include=include)
+            # The scan forgets removed files, so report them before the new state is saved
+            if (removed or paths) and on_stale is not None:
+                on_stale(removed + paths)
+        else:
+            paths = self.file_scanner.scan(directory, include=include)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            batch = []
+            
+            # Submit batches while scanning so reading starts immediately
+            for path in paths:
+                batch.append(path)
+                if len(batch) < batch_size:
+                    continue
+                
+                pending.add(executor.submit(self._load_document_batch, batch))
+                batch = []
+                
+                if len(pending) >= max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for doc in future.result():
+                            loaded += 1
+                            yield doc
+            
+            if batch:
+                pending.add(executor.submit(self._load_document_batch, batch))
+            
+            for future in as_completed(pending):
+                for doc in future.result():
+                    loaded += 1
+                    yield doc
+        
+        if changed_only:
+            self.file_scanner.save_cache()
+        
+        self.logger.info(f"Loaded {loaded} documents from {directory}")
+    
+    def _load_document_batch(self, paths: List[Path]) -> List[Dict[str, Any]]:
+        """Load a batch of files, skipping any that fail or are empty.
+        
+        Args:
+            paths: Paths to markdown or text files
+            
+        Returns:
+            List of document dictionaries
+        """
         documents = []
+        for path in paths:
+            documents.extend(self._load_documents(path))
+        return documents
+    
+    def _load_documents(self, file_path: Path) -> List[Dict[str, Any]]:
+        """Load a single supported file as document dictionaries.
+        
+        Args:
+            file_path: Path to a markdown or text file
+            
+        Returns:
+            List of document dictionaries, empty if failed or empty
+        """
+        file_type = DOCUMENT_FILE_TYPES[file_path.suffix]
+        
+        if file_type == "markdown":
+            if self.config.markdown_split_sections:
+                return self._load_markdown_sections(file_path)
+            content = self._load_markdown_file(file_path)
+        else:
+            content = self._load_text_file(file_path)
+        
+        if not content:
+            return []
+        
+        return [{
+            "content": content,
+            "metadata": {
+                "source": file_path.name,
+                "file_path": str(file_path),
+                "file_type": file_type,
+                "category": self._infer_category(file_path.name)
+            }
+        }]
+    
+    def load_pdf_files(self, directory: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+        """Load PDF files from a directory tree, one document per page.
+        
+        Page ranges are parsed in a process pool and yielded in page order
+        with only a few ranges in flight, so long PDFs stream through
+        without being held in memory whole.
+        
+        Args:
+            directory: Directory containing PDF files
+            
+        Yields:
+            Document dictionaries with page metadata
+        """
+        directory = Path(directory)
+        pages_per_task = self.config.pdf_pages_per_task
+        loaded = 0
+        
+        def tasks():
+            for pdf_file in self.file_scanner.scan(directory, include=["*.pdf"]):
+                try:
+                    total_pages = len(PdfReader(str(pdf_file)).pages)
+                except Exception as e:
+                    self.logger.error(f"Failed to load {pdf_file}: {str(e)}")
+                    continue
+                
+                for start in range(0, total_pages, pages_per_task):
+                    end = min(start + pages_per_task, total_pages)
+                    yield (pdf_file, start, total_pages), _extract_pdf_pages, str(pdf_file), start, end
+        
+        with ProcessPoolExecutor(max_workers=self.config.parser_max_workers) as executor:
+            for (pdf_file, start, total_pages), future in self._run_in_order(executor, tasks()):
+                try:
+                    pages = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to parse pages {start + 1}-{min(start + pages_per_task, total_pages)} of {pdf_file}: {str(e)}")
+                    continue
+                
+                for offset, text in enumerate(pages):
+                    content = self._clean_text(text)
+                    if content:
+                        loaded += 1
+                        yield {
+                            "content": content,
+                            "metadata": {
+                                "source": pdf_file.name,
+                                "file_path": str(pdf_file),
+                                "file_type": "pdf",
+                                "category": self._infer_category(pdf_file.name),
+                                "page": start + offset + 1,
+                                "total_pages": total_pages
+                            }
+                        }
+        
+        self.logger.info(f"Loaded {loaded} PDF pages from {directory}")
+    
+    def load_docx_files(self, directory: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+        """Load DOCX files from a directory tree, one document per heading section.
+        
+        Files are parsed in a process pool and yielded in file order.
+        
+        Args:
+            directory: Directory containing DOCX files
+            
+        Yields:
+            Document dictionaries with section metadata
+        """
+        directory = Path(directory)
+        loaded = 0
+        
+        tasks = (
+            (docx_file, _extract_docx_sections, str(docx_file))
+            for docx_file in self.file_scanner.scan(directory, include=["*.docx"])
+        )
+        
+        with ProcessPoolExecutor(max_workers=self.config.parser_max_workers) as executor:
+            for docx_file, future in self._run_in_order(executor, tasks):
+                try:
+                    sections = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to load {docx_file}: {str(e)}")
+                    continue
+                
+                for index, (title, text) in enumerate(sections, 1):
+                    content = self._clean_text(text)
+                    if content:
+                        loaded += 1
+                        yield {
+                            "content": content,
+                            "metadata": {
+                                "source": docx_file.name,
+                                "file_path": str(docx_file),
+                                "file_type": "docx",
+                                "category": self._infer_category(docx_file.name),
+                                "section": index,
+                                "total_sections": len(sections),
+                                "section_title": title
+                            }
+                        }
+        
+        self.logger.info(f"Loaded {loaded} DOCX sections from {directory}")
+    
+    def _run_in_order(self, executor, tasks: Iterable[Tuple[Any, Callable, Any]]) -> Iterator[Tuple[Any, Future]]:
+        """Submit tasks to an executor, yielding their futures in submission order.
+        
+        At most twice the worker count are in flight, so results are
+        consumed about as fast as they are produced.
+        
+        Args:
+            executor: Executor to run the tasks on
+            tasks: Iterable of (context, function, *args) tuples
+            
+        Yields:
+            Tuples of (context, future)
+        """
+        max_in_flight = self.config.parser_max_workers * 2
+        in_flight = deque()
+        
+        for context, function, *args in tasks:
+            in_flight.append((context, executor.submit(function, *args)))
+            if len(in_flight) >= max_in_flight:
+                yield in_flight.popleft()
+        
+        while in_flight:
+            yield in_flight.popleft()
+    
+    def _clean_text(self, content: str) -> str:
+        """Apply basic text cleaning.
+        
+        Args:
+            content: Raw text
+            
+        Returns:
+            Cleaned text
+        """
+        content = content.strip()
+        return BLANK_LINES_PATTERN.sub('\n\n', content)
+    
+    def iter_all_documents(self, directory: Optional[Union[str, Path]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield all supported document types from a directory.
+        
+        PDF pages and DOCX sections are yielded as their parsers produce
+        them, so a consumer that handles documents one at a time never
+        holds a whole PDF's pages.
+        
+        Args:
+            directory: Directory to load from (uses knowledge_base_dir if None)
+            
+        Yields:
+            Document dictionaries
+        """
+        if directory is None:
+            directory = self.config.knowledge_base_dir
+        
+        directory = Path(directory)
+        
+        if not directory.exists():
+            self.logger.error(f"Directory does not exist: {directory}")
+            return
         
         # Load markdown files
         try:
-            md_docs = self.load_markdown_files(directory)
-            documents.extend(md_docs)
+            yield from self.load_markdown_files(directory)
         except Exception as e:
             self.logger.warning(f"Failed to load markdown files: {str(e)}")
         
         # Load text files
         try:
-            txt_docs = self.load_text_files(directory)
-            documents.extend(txt_docs)
+            yield from self.load_text_files(directory)
         except Exception as e:
             self.logger.warning(f"Failed to load text files: {str(e)}")
         
-        self.logger.info(f"Loaded total {len(documents)} documents from {directory}")
+        # Stream PDF files (one document per page)
+        try:
+            yield from self.load_pdf_files(directory)
+        except Exception as e:
+            self.logger.warning(f"Failed to load PDF files: {str(e)}")
+        
+        # Stream DOCX files (one document per section)
+        try:
+            yield from self.load_docx_files(directory)
+        except Exception as e:
+            self.logger.warning(f"Failed to load DOCX files: {str(e)}")
+    
+    def iter_document_batches(self, directory: Optional[Union[str, Path]] = None,
+                              batch_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Group the documents of iter_all_documents into batches for indexing.
+        
+        A batch is closed only between files, so every file's documents
+        land in one batch and its summary can be built from the batch.
+        
+        Args:
+            directory: Directory to load from (uses knowledge_base_dir if None)
+            batch_size: Documents per batch before the next file starts a
+                new one (uses config default if None)
+            
+        Yields:
+            Lists of document dictionaries
+        """
+        batch_size = batch_size or self.config.ingest_batch_documents
+        batch = []
+        
+        for doc in self.iter_all_documents(directory):
+            if len(batch) >= batch_size and doc['metadata'].get('file_path') != batch[-1]['metadata'].get('file_path'):
+                yield batch
+                batch = []
+            batch.append(doc)
+        
+        if batch:
+            yield batch
+    
+    def load_all_documents(self, directory: Optional[Union[str, Path]] = None) -> List[Dict[str, Any]]:
+        """Load all supported document types from a directory.
+        
+        Args:
+            directory: Directory to load from (uses knowledge_base_dir if None)
+            
+        Returns:
+            List of all document dictionaries
+        """
+        documents = list(self.iter_all_documents(directory))
+        self.logger.info(f"Loaded total {len(documents)} documents from {directory or self.config.knowledge_base_dir}")
         return documents
     
     def validate_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
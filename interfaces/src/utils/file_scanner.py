@@ -0,0 +1,227 @@
+"""Recursive file scanning utilities for FIT-FLIX RAG System."""
+
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import List, Dict, Optional, Union, Iterator, Tuple
+from ..config import Config
+
+
+Rule = Tuple[re.Pattern, bool, bool]
+
+
+def compile_pattern(pattern: str) -> Rule:
+    """Compile a gitignore-style pattern.
+
+    Supports ``*``, ``?``, ``[...]``, ``**``, a leading ``!`` to negate, a
+    trailing ``/`` to match directories only, and a ``/`` elsewhere in the
+    pattern to anchor it to the scan root. Unanchored patterns match the
+    name at any depth.
+
+    Args:
+        pattern: Gitignore-style pattern
+
+    Returns:
+        Tuple of (compiled regex over the relative path, directory only, negated)
+    """
+    negated = pattern.startswith('!')
+    if negated:
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            regex.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            regex.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            regex.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 1:]:
+            end = pattern.index(']', i + 1)
+            regex.append('[' + pattern[i + 1:end].replace('!', '^', 1) + ']')
+            i = end + 1
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+
+    prefix = '' if anchored else '(?:.*/)?'
+    return re.compile(prefix + ''.join(regex)), dir_only, negated
+
+
+def match_rules(rules: List[Rule], relative_path: str, is_dir: bool) -> bool:
+    """Check a path against rules; the last matching rule wins.
+
+    Args:
+        rules: Compiled rules
+        relative_path: Path relative to the scan root, ``/``-separated
+        is_dir: Whether the path is a directory
+
+    Returns:
+        True if the last matching rule is not negated
+    """
+    matched = False
+    for regex, dir_only, negated in rules:
+        if dir_only and not is_dir:
+            continue
+        if regex.fullmatch(relative_path):
+            matched = not negated
+    return matched
+
+
+class FileScanner:
+    """Recursively scans directories with include/exclude rules and a stat cache."""
+
+    def __init__(self, config: Optional[Config] = None,
+                 include: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None,
+                 cache_path: Optional[Union[str, Path]] = None):
+        """Initialize the file scanner.
+
+        Args:
+            config: Configuration object
+            include: Patterns a file must match (uses config default if None)
+            exclude: Patterns of files and directories to skip (uses config default if None)
+            cache_path: JSON file for the stat cache (uses config default if None)
+        """
+        self.config = config or Config()
+        self.include = [compile_pattern(p) for p in (include if include is not None else self.config.scan_include)]
+        self.exclude = [compile_pattern(p) for p in (exclude if exclude is not None else self.config.scan_exclude)]
+        self.cache_path = Path(cache_path or self.config.scan_cache_path)
+        self._cache: Optional[Dict[str, List[int]]] = None
+        self.logger = logging.getLogger(__name__)
+
+    def scan(self, directory: Union[str, Path], include: Optional[List[str]] = None) -> Iterator[Path]:
+        """Yield matching files under a directory, recursively.
+
+        Args:
+            directory: Directory to scan
+            include: Patterns overriding the scanner's include rules
+
+        Yields:
+            Paths of matching files
+        """
+        for entry in self._walk(directory, include):
+            yield Path(entry.path)
+
+    def scan_changes(self, directory: Union[str, Path],
+                     include: Optional[List[str]] = None) -> Tuple[List[Path], List[Path]]:
+        """Find files that are new or changed since the last scan.
+
+        Files are compared by (path, mtime, size) from the directory
+        listing, so unchanged files are never opened. The in-memory cache
+        is updated; call ``save_cache`` once the changes are processed.
+
+        Args:
+            directory: Directory to scan
+            include: Patterns overriding the scanner's include rules
+
+        Returns:
+            Tuple of (new or changed files, files removed since the last scan)
+        """
+        cache = self._load_cache()
+        root = os.path.abspath(directory)
+        seen = set()
+        changed = []
+
+        for entry in self._walk(directory, include):
+            path = os.path.abspath(entry.path)
+            stat = entry.stat()
+            signature = [stat.st_mtime_ns, stat.st_size]
+            seen.add(path)
+
+            if cache.get(path) != signature:
+                cache[path] = signature
+                changed.append(Path(path))
+
+        removed = [
+            Path(path) for path in cache
+            if path not in seen and path.startswith(root + os.sep)
+        ]
+        for path in removed:
+            del cache[str(path)]
+
+        self.logger.info(f"Scanned {len(seen)} files in {directory}: {len(changed)} changed, {len(removed)} removed")
+        return changed, removed
+
+    def save_cache(self) -> None:
+        """Persist the stat cache."""
+        if self._cache is None:
+            return
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({"files": self._cache}, f)
+        except Exception as e:
+            self.logger.error(f"Failed to save scan cache: {str(e)}")
+
+    def clear_cache(self) -> None:
+        """Forget every cached file so the next scan reports all files as changed."""
+        self._cache = {}
+        self.save_cache()
+
+    def _load_cache(self) -> Dict[str, List[int]]:
+        """Load the stat cache on first use.
+
+        Returns:
+            Mapping of absolute path to [mtime_ns, size]
+        """
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_path.exists():
+                try:
+                    with open(self.cache_path, 'r', encoding='utf-8') as f:
+                        self._cache = json.load(f).get("files", {})
+                except Exception as e:
+                    self.logger.warning(f"Ignoring unreadable scan cache {self.cache_path}: {str(e)}")
+        return self._cache
+
+    def _walk(self, directory: Union[str, Path], include: Optional[List[str]] = None) -> Iterator[os.DirEntry]:
+        """Walk a directory tree with os.scandir, pruning excluded directories.
+
+        Args:
+            directory: Directory to scan
+            include: Patterns overriding the scanner's include rules
+
+        Yields:
+            Directory entries of matching files, in sorted order per directory
+        """
+        include_rules = self.include if include is None else [compile_pattern(p) for p in include]
+        stack = [(str(directory), "")]
+
+        while stack:
+            path, relative_dir = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                self.logger.warning(f"Cannot scan {path}: {str(e)}")
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                relative_path = relative_dir + entry.name
+
+                if entry.is_dir():
+                    if not match_rules(self.exclude, relative_path, True):
+                        subdirectories.append((entry.path, relative_path + '/'))
+                elif entry.is_file():
+                    if match_rules(include_rules, relative_path, False) and not match_rules(self.exclude, relative_path, False):
+                        yield entry
+
+            # Visit subdirectories in order after the files of this directory
+            stack.extend(reversed(subdirectories))
@@ -0,0 +1,71 @@
+"""Markdown section parsing utilities for FIT-FLIX RAG System."""
+
+import re
+from typing import List
+
+
+# ATX headers, or code fence lines whose contents must not be read as headers
+HEADER_PATTERN = re.compile(r'^(?:(#{1,6})[ \t]+(.*?)[ \t#]*|[ \t]*(```|~~~).*)$', re.MULTILINE)
+
+
+class MarkdownSection:
+    """A section of a markdown document and the headers above it."""
+
+    __slots__ = ('header_path', 'start', 'end')
+
+    def __init__(self, header_path: List[str], start: int, end: int):
+        """Initialize the section.
+
+        Args:
+            header_path: Titles of the enclosing headers, outermost first
+            start: Start offset of the section body
+            end: End offset of the section body
+        """
+        self.header_path = header_path
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"MarkdownSection(header_path={self.header_path}, start={self.start}, end={self.end})"
+
+
+def parse_markdown_sections(text: str) -> List[MarkdownSection]:
+    """Split markdown into sections at its headers in a single pass.
+
+    Each section covers the body between a header and the next header of
+    any level, and carries the path of headers it sits under. Text before
+    the first header becomes a section with an empty path. Headers inside
+    fenced code blocks are ignored.
+
+    Args:
+        text: Raw markdown text
+
+    Returns:
+        Sections in document order, including ones with empty bodies
+    """
+    sections = []
+    path = []  # (level, title) of the enclosing headers
+    body_start = 0
+    fence = None
+
+    for match in HEADER_PATTERN.finditer(text):
+        marker = match.group(3)
+        if marker:
+            if fence is None:
+                fence = marker
+            elif marker == fence:
+                fence = None
+            continue
+        if fence is not None:
+            continue
+
+        sections.append(MarkdownSection([title for _, title in path], body_start, match.start()))
+
+        level = len(match.group(1))
+        while path and path[-1][0] >= level:
+            path.pop()
+        path.append((level, match.group(2)))
+        body_start = match.end()
+
+    sections.append(MarkdownSection([title for _, title in path], body_start, len(text)))
+    return sections
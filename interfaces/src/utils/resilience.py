@@ -0,0 +1,251 @@
+"""Retry and circuit breaker utilities for FIT-FLIX RAG System."""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+
+# HTTP statuses worth retrying: rate limited, or the upstream failed or timed out
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream that is failing."""
+
+
+def is_retryable(exception: BaseException) -> bool:
+    """Decide whether a failed upstream call is worth retrying.
+
+    Timeouts, connection errors and rate-limit or server-side HTTP
+    statuses are retryable; anything else (bad requests, auth errors,
+    our own bugs) fails immediately.
+
+    Args:
+        exception: Exception raised by the call
+
+    Returns:
+        Whether to retry
+    """
+    if isinstance(exception, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+
+    # google.api_core exceptions carry .code; requests errors carry .response
+    code = getattr(exception, 'code', None)
+    if code is None:
+        code = getattr(getattr(exception, 'response', None), 'status_code', None)
+    try:
+        return int(code) in RETRYABLE_STATUS_CODES
+    except (TypeError, ValueError):
+        return False
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter.
+
+    Args:
+        attempt: Zero-based retry number
+        base_delay: Delay ceiling of the first retry in seconds
+        max_delay: Largest delay ceiling in seconds
+
+    Returns:
+        Seconds to wait, uniformly drawn below the exponential ceiling
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds. It then lets a single
+    trial call through: success closes it, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds to stay open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Admit a call or reject it.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half open with a trial already running
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError("Upstream is failing; circuit breaker is open")
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            if self._opened_at is not None:
+                self.logger.info("Circuit breaker closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the breaker at the threshold."""
+        with self._lock:
+            self._failures += 1
+            reopening = self._trial_in_flight
+            self._trial_in_flight = False
+            if reopening or self._failures >= self.failure_threshold:
+                if self._opened_at is None or reopening:
+                    self.logger.warning(f"Circuit breaker opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+    def abandon_trial(self) -> None:
+        """Give up a half-open trial that ended without an outcome, e.g. on cancellation."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class RetryPolicy:
+    """Retries retryable failures with jittered exponential backoff.
+
+    Every attempt passes through the circuit breaker, and only retryable
+    failures count against it.
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        """Initialize the retry policy.
+
+        Args:
+            max_retries: Retries after the first attempt
+            base_delay: Backoff ceiling of the first retry in seconds
+            max_delay: Largest backoff ceiling in seconds
+            breaker: Circuit breaker guarding the upstream
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker
+        self.retries = 0
+        self.logger = logging.getLogger(__name__)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call ``fn`` in this thread, sleeping between retries.
+
+        Args:
+            fn: Function to call
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of the first successful attempt
+        """
+        attempt = 0
+        while True:
+            self._before_attempt()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._after_failure(e, attempt)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self._after_abandon()
+                raise
+            self._after_success()
+            return result
+
+    async def acall(self, fn: Callable[..., Awaitable[Any]], *args,
+                    timeout: Optional[float] = None, **kwargs) -> Any:
+        """Await ``fn`` with a per-attempt timeout, sleeping on the loop between retries.
+
+        Args:
+            fn: Coroutine function to call; a fresh coroutine is made per attempt
+            *args: Positional arguments for fn
+            timeout: Seconds each attempt may take (unbounded if None)
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of the first successful attempt
+        """
+        attempt = 0
+        while True:
+            self._before_attempt()
+            try:
+                result = await asyncio.wait_for(fn(*args, **kwargs), timeout)
+            except Exception as e:
+                delay = self._after_failure(e, attempt)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self._after_abandon()
+                raise
+            self._after_success()
+            return result
+
+    def _before_attempt(self) -> None:
+        """Let the breaker reject the attempt."""
+        if self.breaker is not None:
+            self.breaker.before_call()
+
+    def _after_success(self) -> None:
+        """Report a success to the breaker."""
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def _after_abandon(self) -> None:
+        """Release the breaker's trial slot when an attempt is cancelled or interrupted."""
+        if self.breaker is not None:
+            self.breaker.abandon_trial()
+
+    def _after_failure(self, exception: Exception, attempt: int) -> float:
+        """Report a failure and pick the backoff, re-raising when out of retries.
+
+        Args:
+            exception: Exception raised by the attempt
+            attempt: Zero-based attempt number
+
+        Returns:
+            Seconds to wait before the next attempt
+        """
+        retryable = is_retryable(exception)
+        if self.breaker is not None:
+            if retryable:
+                self.breaker.record_failure()
+            else:
+                # The upstream answered; the request itself was bad
+                self.breaker.record_success()
+
+        if not retryable or attempt >= self.max_retries:
+            raise exception
+
+        delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+        self.retries += 1
+        self.logger.warning(f"Retrying in {delay:.2f}s after attempt {attempt + 1} failed: {str(exception)}")
+        return delay
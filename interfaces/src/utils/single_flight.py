@@ -0,0 +1,165 @@
+"""Request coalescing utilities for FIT-FLIX RAG System."""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class InFlightCall:
+    """The one computation that concurrent callers with the same key share."""
+
+    def __init__(self):
+        """Initialize a pending call."""
+        self._done = threading.Event()
+        self.result: Any = None
+        self.exception: Optional[BaseException] = None
+        self.followers = 0
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """Wait for the leader to finish.
+
+        Args:
+            timeout: Seconds to wait (forever if None)
+
+        Returns:
+            The leader's result
+
+        Raises:
+            TimeoutError: If the call did not finish in time
+            Exception: Whatever the leader raised
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError("Timed out waiting for in-flight request")
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the work; callers that arrive while it
+    is in flight wait for it and receive its result or its exception.
+    Threaded callers use ``do`` (or ``begin``/``finish`` when the work is
+    consumed incrementally); asyncio callers use ``do_async``.
+    """
+
+    def __init__(self):
+        """Initialize the coalescing tables."""
+        self._calls: Dict[Hashable, InFlightCall] = {}
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+        self._task_waiters: Dict[asyncio.Future, int] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self.logger = logging.getLogger(__name__)
+
+    def begin(self, key: Hashable) -> Tuple[InFlightCall, bool]:
+        """Join the in-flight call for a key, or start one.
+
+        A leader must call ``finish`` exactly once, even on failure.
+
+        Args:
+            key: Request key
+
+        Returns:
+            Tuple of (call, whether the caller is the leader)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.coalesced += 1
+                return call, False
+
+            call = InFlightCall()
+            self._calls[key] = call
+            return call, True
+
+    def finish(self, key: Hashable, call: InFlightCall, result: Any = None,
+               exception: Optional[BaseException] = None) -> None:
+        """Publish a leader's outcome and release the key.
+
+        Args:
+            key: Request key
+            call: Call returned by ``begin``
+            result: Result to hand to followers
+            exception: Exception to raise in followers instead
+        """
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+        call.result = result
+        call.exception = exception
+        call._done.set()
+
+        if call.followers:
+            self.logger.info(f"Shared one in-flight result with {call.followers} waiting requests")
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` once for all concurrent threaded callers with the same key.
+
+        Args:
+            key: Request key
+            fn: Function to run
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            The result of the shared call
+        """
+        call, leader = self.begin(key)
+        if not leader:
+            return call.wait()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, call, exception=e)
+            raise
+
+        self.finish(key, call, result=result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await ``fn`` once for all concurrent coroutines with the same key.
+
+        The work runs as its own task, so cancelling one waiting caller
+        does not cancel it for the others. Once every caller has stopped
+        waiting, the task is cancelled, since nobody would see its result.
+
+        Args:
+            key: Request key
+            fn: Coroutine function to run
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            The result of the shared call
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = loop.create_task(fn(*args, **kwargs))
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda done: self._release_task(task_key, done))
+        else:
+            self.coalesced += 1
+
+        self._task_waiters[task] = self._task_waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._task_waiters[task] -= 1
+            if not self._task_waiters[task]:
+                del self._task_waiters[task]
+                if not task.done():
+                    task.cancel()
+
+    def _release_task(self, task_key: Tuple[int, Hashable], task: asyncio.Future) -> None:
+        """Forget a finished task unless a newer one replaced it."""
+        if self._tasks.get(task_key) is task:
+            del self._tasks[task_key]
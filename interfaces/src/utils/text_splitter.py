@@ -1,11 +1,192 @@
 """Text splitting utilities for FIT-FLIX RAG System."""
 
 import logging
-from typing import List, Dict, Any, Optional
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import re
 from ..config import Config
 
 
+# Whitespace following sentence-ending punctuation
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+')
+# Boundaries that are anything other than a single space
+COLLAPSIBLE_BOUNDARY_PATTERN = re.compile(r'([.!?])(?: \s+|[^\S ]\s*)')
+# A boundary once collapsed to a single space in the sentence buffer
+BUFFER_BOUNDARY_PATTERN = re.compile(r'[.!?] ')
+WORD_PATTERN = re.compile(r'\S+')
+
+
+def normalize_chunk_text(text: str) -> str:
+    """Rebuild chunk text from the source slice it was cut from.
+    
+    Args:
+        text: Slice of the source document
+        
+    Returns:
+        Chunk text with sentence boundaries collapsed to single spaces
+    """
+    return COLLAPSIBLE_BOUNDARY_PATTERN.sub(r'\1 ', text)
+
+
+class ChunkSpan:
+    """A chunk stored as offsets into its source document."""
+    
+    __slots__ = ('doc_id', 'chunk_id', 'start', 'end', 'text', 'duplicates')
+    
+    def __init__(self, doc_id: int, chunk_id: int, start: int, end: int, text: Optional[str] = None):
+        """Initialize the chunk span.
+        
+        Args:
+            doc_id: Index of the source document in its ChunkSpans
+            chunk_id: Index of the chunk within the document
+            start: Start offset in the document content
+            end: End offset in the document content
+            text: Chunk text, only kept when it is not a plain source slice
+        """
+        self.doc_id = doc_id
+        self.chunk_id = chunk_id
+        self.start = start
+        self.end = end
+        self.text = text
+        # Near-duplicate spans folded into this one by ChunkDeduplicator
+        self.duplicates: Optional[List['ChunkSpan']] = None
+    
+    def __repr__(self) -> str:
+        return f"ChunkSpan(doc_id={self.doc_id}, chunk_id={self.chunk_id}, start={self.start}, end={self.end})"
+
+
+class ChunkSpans:
+    """Chunks of a document collection, materialized only on demand."""
+    
+    def __init__(self, documents: List[Dict[str, Any]]):
+        """Initialize an empty span collection.
+        
+        Args:
+            documents: Source documents the spans point into
+        """
+        self.documents = documents
+        self.spans: List[ChunkSpan] = []
+        self._chunk_counts: Dict[int, int] = {}
+    
+    def extend(self, spans: List[ChunkSpan]) -> None:
+        """Add the spans of one document.
+        
+        Args:
+            spans: Spans of a single document, in order
+        """
+        for span in spans:
+            self._chunk_counts[span.doc_id] = self._chunk_counts.get(span.doc_id, 0) + 1
+        self.spans.extend(spans)
+    
+    def __len__(self) -> int:
+        return len(self.spans)
+    
+    def __iter__(self) -> Iterator[ChunkSpan]:
+        return iter(self.spans)
+    
+    def __getitem__(self, index: int) -> ChunkSpan:
+        return self.spans[index]
+    
+    def get_text(self, span: ChunkSpan) -> str:
+        """Materialize the text of a chunk.
+        
+        Args:
+            span: Chunk span
+            
+        Returns:
+            Chunk text
+        """
+        if span.text is not None:
+            return span.text
+        
+        content = self.documents[span.doc_id]['content']
+        return normalize_chunk_text(content[span.start:span.end])
+    
+    def get_metadata(self, span: ChunkSpan) -> Dict[str, Any]:
+        """Build the metadata of a chunk.
+        
+        Args:
+            span: Chunk span
+            
+        Returns:
+            Document metadata extended with chunk and offset information
+        """
+        doc = self.documents[span.doc_id]
+        metadata = {
+            **doc['metadata'],
+            'chunk_id': span.chunk_id,
+            'total_chunks': self._chunk_counts[span.doc_id],
+            'original_length': len(doc['content']),
+            'start_offset': span.start,
+            'end_offset': span.end
+        }
+        
+        if span.duplicates:
+            sources = [doc['metadata'].get('source', '')]
+            for duplicate in span.duplicates:
+                source = self.documents[duplicate.doc_id]['metadata'].get('source', '')
+                if source not in sources:
+                    sources.append(source)
+            # Vector store metadata only holds scalars, so join the list
+            metadata['sources'] = ", ".join(sources)
+            metadata['duplicate_count'] = len(span.duplicates)
+        
+        return metadata
+    
+    def texts(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        """Materialize the texts of a range of chunks.
+        
+        Args:
+            start: Index of the first chunk
+            end: Index one past the last chunk (all remaining if None)
+            
+        Returns:
+            List of chunk texts
+        """
+        return [self.get_text(span) for span in self.spans[start:end]]
+    
+    def metadatas(self, start: int = 0, end: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Build the metadata of a range of chunks.
+        
+        Args:
+            start: Index of the first chunk
+            end: Index one past the last chunk (all remaining if None)
+            
+        Returns:
+            List of metadata dictionaries
+        """
+        return [self.get_metadata(span) for span in self.spans[start:end]]
+    
+    def select(self, indices: List[int]) -> 'ChunkSpans':
+        """Build a collection holding a subset of these spans.
+        
+        Chunk counts still refer to the full split, so chunk ids and
+        totals stay consistent with the source documents.
+        
+        Args:
+            indices: Indices of the spans to keep, in order
+            
+        Returns:
+            New ChunkSpans sharing the same documents
+        """
+        subset = ChunkSpans(self.documents)
+        subset.spans = [self.spans[i] for i in indices]
+        subset._chunk_counts = self._chunk_counts
+        return subset
+    
+    def to_documents(self) -> List[Dict[str, Any]]:
+        """Materialize every chunk as a document dictionary.
+        
+        Returns:
+            List of chunked document dictionaries
+        """
+        return [
+            {'content': self.get_text(span), 'metadata': self.get_metadata(span)}
+            for span in self.spans
+        ]
+
+
 class TextSplitter:
     """Handles text splitting and chunking for vector storage."""
     
@@ -29,36 +210,44 @@ class TextSplitter:
         Returns:
             List of chunked document dictionaries
         """
-        chunked_documents = []
+        return self.split_documents_to_spans(documents).to_documents()
+    
+    def split_documents_to_spans(self, documents: List[Dict[str, Any]]) -> ChunkSpans:
+        """Split documents into chunk spans without copying their text.
         
-        for doc in documents:
+        Args:
+            documents: List of document dictionaries
+            
+        Returns:
+            ChunkSpans pointing into the given documents
+        """
+        chunks = ChunkSpans(documents)
+        
+        for doc_id, doc in enumerate(documents):
             try:
-                chunks = self.split_text(doc['content'])
+                spans = [
+                    ChunkSpan(doc_id, chunk_id, start, end, chunk_text)
+                    for chunk_id, (chunk_text, start, end) in enumerate(self._iter_source_windows(doc['content']))
+                ]
+                chunks.extend(spans)
                 
-                for i, chunk in enumerate(chunks):
-                    chunked_doc = {
-                        'content': chunk,
-                        'metadata': {
-                            **doc['metadata'],
-                            'chunk_id': i,
-                            'total_chunks': len(chunks),
-                            'original_length': len(doc['content'])
-                        }
-                    }
-                    chunked_documents.append(chunked_doc)
-                    
             except Exception as e:
                 self.logger.error(f"Failed to split document {doc.get('metadata', {}).get('source', 'unknown')}: {str(e)}")
                 continue
         
-        self.logger.info(f"Split {len(documents)} documents into {len(chunked_documents)} chunks")
-        return chunked_documents
+        self.logger.info(f"Split {len(documents)} documents into {len(chunks)} chunks")
+        return chunks
     
     def split_text(self, text: str, 
                    chunk_size: Optional[int] = None,
                    chunk_overlap: Optional[int] = None) -> List[str]:
         """Split text into overlapping chunks.
         
+        Sentences are laid out once in a single buffer and each chunk is
+        tracked as a ``(start, end)`` window over it, so the running chunk
+        length is known without rebuilding strings and every chunk is
+        sliced out exactly once.
+        
         Args:
             text: Text to split
             chunk_size: Size of each chunk (uses config default if None)
@@ -73,34 +262,81 @@ class TextSplitter:
         if len(text) <= chunk_size:
             return [text]
         
-        # Try to split by sentences first
-        sentences = self._split_by_sentences(text)
+        # Lay sentences out in one buffer, each followed by a single space
+        buffer, sentence_ends = self._build_sentence_buffer(text)
         
         chunks = []
-        current_chunk = ""
+        for chunk_text, start, end in self._iter_chunk_windows(buffer, sentence_ends, chunk_size, chunk_overlap):
+            chunks.append(buffer[start:end] if chunk_text is None else chunk_text)
         
-        for sentence in sentences:
-            # If adding this sentence would exceed chunk size
-            if len(current_chunk) + len(sentence) > chunk_size:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                    
-                    # Start new chunk with overlap
-                    overlap_text = self._get_overlap_text(current_chunk, chunk_overlap)
-                    current_chunk = overlap_text + sentence
-                else:
-                    # Single sentence is too long, split by words
-                    sentence_chunks = self._split_long_sentence(sentence, chunk_size, chunk_overlap)
-                    chunks.extend(sentence_chunks[:-1])
-                    current_chunk = sentence_chunks[-1] if sentence_chunks else ""
+        return chunks
+    
+    def _iter_chunk_windows(self, buffer: str, sentence_ends: List[int],
+                            chunk_size: int, chunk_overlap: int) -> Iterator[Tuple[Optional[str], int, int]]:
+        """Walk a sentence buffer and yield one window per chunk.
+        
+        Each chunk is tracked as ``prefix + buffer[start:end]``; the prefix is
+        only non-empty after a long sentence was split by words. Sentences
+        that still fit are absorbed with a bisect over their end offsets, so
+        the loop runs once per chunk rather than once per sentence.
+        
+        Args:
+            buffer: Sentence buffer from ``_build_sentence_buffer``
+            sentence_ends: End offset of each sentence in the buffer
+            chunk_size: Size of each chunk
+            chunk_overlap: Overlap between chunks
+            
+        Yields:
+            Tuples of (text, start, end). ``text`` is None when the chunk is
+            exactly ``buffer[start:end]``; otherwise it holds the chunk and
+            ``start``/``end`` bound the buffer region it was built from.
+        """
+        prefix = ""
+        prefix_start = prefix_end = 0
+        start = end = 0
+        index = 0
+        
+        while index < len(sentence_ends):
+            # Absorb every following sentence that still fits in the chunk
+            fit = bisect_right(sentence_ends, start - len(prefix) + chunk_size, index)
+            if fit > index:
+                end = sentence_ends[fit - 1]
+                index = fit
+                if index == len(sentence_ends):
+                    break
+            
+            # Adding the next sentence would exceed chunk size
+            sentence_end = sentence_ends[index]
+            current_length = len(prefix) + end - start
+            
+            if current_length:
+                yield self._make_window(prefix, prefix_start, prefix_end, buffer, start, end)
+                
+                # Start new chunk with overlap
+                if current_length > chunk_overlap:
+                    overlap_length = len(range(current_length)[-chunk_overlap:])
+                    if overlap_length <= end - start:
+                        start = self._get_overlap_start(buffer, end - overlap_length, end)
+                        prefix = ""
+                    else:
+                        prefix = self._get_overlap_text(prefix + buffer[start:end], chunk_overlap)
+                        prefix_end = start = end
             else:
-                current_chunk += sentence
+                # Single sentence is too long, split by words
+                word_windows = list(self._iter_word_windows(buffer, end, sentence_end, chunk_size, chunk_overlap))
+                yield from word_windows[:-1]
+                
+                last_text, last_start, last_end = word_windows[-1]
+                prefix = buffer[last_start:last_end] if last_text is None else last_text
+                prefix_start, prefix_end = last_start, last_end
+                start = sentence_end
+            end = sentence_end
+            index += 1
         
         # Add final chunk if it exists
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        return chunks
+        chunk_text, start, end = self._make_window(prefix, prefix_start, prefix_end, buffer, start, end)
+        if chunk_text or (chunk_text is None and end > start):
+            yield chunk_text, start, end
     
     def _split_by_sentences(self, text: str) -> List[str]:
         """Split text into sentences.
@@ -112,9 +348,36 @@ class TextSplitter:
             List of sentences
         """
         # Simple sentence splitting - can be enhanced with NLTK or spaCy
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = SENTENCE_BOUNDARY_PATTERN.split(text)
         return [s + ' ' for s in sentences if s.strip()]
     
+    def _build_sentence_buffer(self, text: str) -> Tuple[str, List[int]]:
+        """Lay out sentences in a single buffer.
+        
+        The buffer equals ``"".join(self._split_by_sentences(text))``, i.e.
+        every sentence followed by exactly one space, and is returned with
+        the end offset of each sentence.
+        
+        Args:
+            text: Text to split
+            
+        Returns:
+            Tuple of (buffer, sentence end offsets)
+        """
+        if not text.strip():
+            return "", []
+        
+        # Collapse every sentence boundary to a single space
+        buffer = COLLAPSIBLE_BOUNDARY_PATTERN.sub(r'\1 ', text)
+        if not buffer.endswith(('. ', '! ', '? ')):
+            buffer += ' '
+        
+        sentence_ends = [match.end() for match in BUFFER_BOUNDARY_PATTERN.finditer(buffer)]
+        if not sentence_ends or sentence_ends[-1] != len(buffer):
+            sentence_ends.append(len(buffer))
+        
+        return buffer, sentence_ends
+    
     def _split_long_sentence(self, sentence: str, chunk_size: int, chunk_overlap: int) -> List[str]:
         """Split a long sentence by words.
         
@@ -127,32 +390,78 @@ class TextSplitter:
             List of sentence chunks
         """
         words = sentence.split()
-        chunks = []
-        current_chunk = []
+        return [' '.join(words[start:end]) for start, end in self._word_ranges(words, chunk_size, chunk_overlap)]
+    
+    def _iter_word_windows(self, buffer: str, start: int, end: int,
+                           chunk_size: int, chunk_overlap: int) -> Iterator[Tuple[Optional[str], int, int]]:
+        """Split the sentence ``buffer[start:end]`` by words into windows.
         
-        for word in words:
-            # Estimate current chunk length
-            current_length = sum(len(w) + 1 for w in current_chunk)
+        Args:
+            buffer: Sentence buffer
+            start: Start of the sentence
+            end: End of the sentence
+            chunk_size: Maximum chunk size
+            chunk_overlap: Overlap between chunks
             
+        Yields:
+            Tuples of (text, start, end) as in ``_iter_chunk_windows``
+        """
+        sentence = buffer[start:end]
+        words = sentence.split()
+        stripped = sentence.strip()
+        
+        if ' '.join(words) == stripped:
+            # Single-spaced words: offsets follow from the word lengths
+            word_start = start + sentence.find(stripped[:1])
+            lengths_before = [0, *accumulate(map(len, words))]
+            
+            for first, last in self._word_ranges(words, chunk_size, chunk_overlap):
+                chunk_start = word_start + lengths_before[first] + first
+                chunk_end = word_start + lengths_before[last] + last - 1
+                yield None, chunk_start, chunk_end
+            return
+        
+        matches = list(WORD_PATTERN.finditer(buffer, start, end))
+        
+        for first, last in self._word_ranges(words, chunk_size, chunk_overlap):
+            chunk_start = matches[first].start()
+            chunk_end = matches[last - 1].end()
+            yield ' '.join(words[first:last]), chunk_start, chunk_end
+    
+    def _word_ranges(self, words: List[str], chunk_size: int, chunk_overlap: int) -> Iterator[Tuple[int, int]]:
+        """Group words into overlapping chunks.
+        
+        Args:
+            words: List of words
+            chunk_size: Maximum chunk size
+            chunk_overlap: Overlap between chunks
+            
+        Yields:
+            ``(start, end)`` word index ranges, one per chunk
+        """
+        # Current chunk is words[chunk_start:i], current_length its estimated size
+        chunk_start = 0
+        current_length = 0
+        
+        for i, word in enumerate(words):
             if current_length + len(word) > chunk_size:
-                if current_chunk:
-                    chunks.append(' '.join(current_chunk))
+                if i > chunk_start:
+                    yield chunk_start, i
                     
                     # Start new chunk with overlap
-                    overlap_words = self._get_overlap_words(current_chunk, chunk_overlap)
-                    current_chunk = overlap_words + [word]
+                    chunk_start = self._get_overlap_index(words, chunk_start, i, chunk_overlap)
+                    current_length = sum(len(w) + 1 for w in words[chunk_start:i + 1])
                 else:
                     # Single word is too long, just add it
-                    chunks.append(word)
-                    current_chunk = []
+                    yield i, i + 1
+                    chunk_start = i + 1
+                    current_length = 0
             else:
-                current_chunk.append(word)
+                current_length += len(word) + 1
         
         # Add final chunk
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
-        
-        return chunks
+        if chunk_start < len(words):
+            yield chunk_start, len(words)
     
     def _get_overlap_text(self, text: str, overlap_size: int) -> str:
         """Get overlap text from the end of a chunk.
@@ -186,20 +495,124 @@ class TextSplitter:
         Returns:
             List of overlap words
         """
-        if not words:
-            return []
+        return words[self._get_overlap_index(words, 0, len(words), overlap_size):]
+    
+    def _get_overlap_index(self, words: List[str], start: int, end: int, overlap_size: int) -> int:
+        """Find where the overlap begins within ``words[start:end]``.
         
-        overlap_words = []
+        Args:
+            words: List of words
+            start: Index of the first word of the chunk
+            end: Index one past the last word of the chunk
+            overlap_size: Size of overlap in characters
+            
+        Returns:
+            Index of the first overlap word (``end`` if none fit)
+        """
         current_length = 0
+        index = end
         
         # Start from the end and work backwards
-        for word in reversed(words):
-            if current_length + len(word) + 1 > overlap_size:
+        while index > start:
+            word_length = len(words[index - 1]) + 1
+            if current_length + word_length > overlap_size:
                 break
-            overlap_words.insert(0, word)
-            current_length += len(word) + 1
+            current_length += word_length
+            index -= 1
+        
+        return index
+    
+    def _get_overlap_start(self, buffer: str, tail_start: int, end: int) -> int:
+        """Find where the overlap begins within ``buffer[tail_start:end]``.
+        
+        Mirrors ``_get_overlap_text`` without copying the tail.
+        
+        Args:
+            buffer: Buffer holding the chunk
+            tail_start: Start of the raw overlap window
+            end: End of the chunk
+            
+        Returns:
+            Start offset of the overlap text
+        """
+        # Try to find a good breaking point (word boundary)
+        space_idx = buffer.find(' ', tail_start, end)
+        
+        if space_idx > tail_start:
+            return space_idx + 1
+        
+        return tail_start
+    
+    def _make_window(self, prefix: str, prefix_start: int, prefix_end: int, buffer: str,
+                     start: int, end: int) -> Tuple[Optional[str], int, int]:
+        """Build the stripped window for ``prefix + buffer[start:end]``.
+        
+        Args:
+            prefix: Literal text preceding the window
+            prefix_start: Start of the buffer region the prefix was taken from
+            prefix_end: End of the buffer region the prefix was taken from
+            buffer: Buffer holding the chunk
+            start: Start of the window
+            end: End of the window
+            
+        Returns:
+            Tuple of (text, start, end) as in ``_iter_chunk_windows``
+        """
+        while end > start and buffer[end - 1].isspace():
+            end -= 1
         
-        return overlap_words
+        if prefix:
+            return (prefix + buffer[start:end]).strip(), prefix_start, end if end > start else prefix_end
+        
+        while start < end and buffer[start].isspace():
+            start += 1
+        
+        return None, start, end
+    
+    def _build_offset_map(self, text: str) -> Tuple[List[int], List[int]]:
+        """Map sentence buffer offsets back to offsets in the source text.
+        
+        Args:
+            text: Source text the buffer was built from
+            
+        Returns:
+            Tuple of (buffer offsets, shifts); a buffer offset ``b`` maps to
+            ``b + shifts[i]`` where ``i`` is the last entry with offset <= b
+        """
+        offsets = [0]
+        shifts = [0]
+        
+        for match in COLLAPSIBLE_BOUNDARY_PATTERN.finditer(text):
+            # Each boundary collapses to punctuation plus one space
+            shift = shifts[-1] + match.end() - match.start() - 2
+            offsets.append(match.end() - shift)
+            shifts.append(shift)
+        
+        return offsets, shifts
+    
+    def _iter_source_windows(self, text: str) -> Iterator[Tuple[Optional[str], int, int]]:
+        """Yield chunk windows of a document in source text offsets.
+        
+        Args:
+            text: Document content
+            
+        Yields:
+            Tuples of (text, start, end). ``text`` is None when the chunk can
+            be rebuilt from ``text[start:end]`` by ``normalize_chunk_text``.
+        """
+        if len(text) <= self.chunk_size:
+            # Short documents are kept verbatim; this shares the source string
+            yield text, 0, len(text)
+            return
+        
+        buffer, sentence_ends = self._build_sentence_buffer(text)
+        offsets, shifts = self._build_offset_map(text)
+        
+        for chunk_text, start, end in self._iter_chunk_windows(buffer, sentence_ends,
+                                                               self.chunk_size, self.chunk_overlap):
+            source_start = start + shifts[bisect_right(offsets, start) - 1]
+            source_end = end + shifts[bisect_right(offsets, end) - 1]
+            yield chunk_text, source_start, source_end
     
     def split_by_sections(self, text: str) -> List[str]:
         """Split text by sections (headers, double newlines).
@@ -1,18 +1,30 @@
 """Streamlit web interface for FIT-FLIX RAG System."""
 
 import sys
+import time
 import streamlit as st
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Add src directory to Python path
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
 from src.config import Config
 from src.retrieval.retriever import DocumentRetriever
+from src.retrieval.working_set import WorkingSet
+from src.retrieval.faq_index import FAQIndex
+from src.retrieval.fact_store import FactStore
+from src.retrieval.fact_matcher import FactMatcher
 from src.generation.llm_manager import LLMManager
+from src.generation.semantic_cache import SemanticCache
+from src.generation.context_compressor import ContextCompressor
+from src.generation.extractive_answer import build_extractive_answer
+from src.generation.conversation_memory import ConversationMemory
+from src.generation.query_log import QueryLog
+from src.generation.answer_precomputer import AnswerPrecomputer
 from src.utils.document_loader import DocumentLoader
 from src.embeddings.embedding_manager import EmbeddingManager
+from src.utils.deadline import Deadline, DeadlineExceeded
 
 
 class FitFlixStreamlitApp:
@@ -41,6 +53,8 @@ class FitFlixStreamlitApp:
             st.session_state.retriever = None
             st.session_state.llm_manager = None
             st.session_state.document_loader = None
+            st.session_state.memory = None
+            st.session_state.working_set = None
 
     @st.cache_resource
     def initialize_system(_self):
@@ -72,27 +86,46 @@ class FitFlixStreamlitApp:
                     if not knowledge_base_path.exists():
                         return None, None, None, False, f"❌ Knowledge base directory not found: {knowledge_base_path}"
                     
-                    documents = document_loader.load_all_documents()
-                    
-                    if not documents:
-                        return None, None, None, False, "❌ No documents found in knowledge base directory"
-                    
-                    # Split documents
                     from src.utils.text_splitter import TextSplitter
                     text_splitter = TextSplitter(_self.config)
-                    chunked_docs = text_splitter.split_documents(documents)
+                    deduplicator = None
+                    if _self.config.dedup_enabled:
+                        from src.utils.deduplicator import ChunkDeduplicator
+                        deduplicator = ChunkDeduplicator(_self.config)
+                    summarize = None
+                    if _self.config.document_summary_use_llm:
+                        summary_words = _self.config.document_summary_max_chars // 6
+                        summarize = lambda text: llm_manager.generate_summary(text, summary_words)
                     
-                    if not chunked_docs:
-                        return None, None, None, False, "❌ No document chunks created"
+                    # Stream the knowledge base in batches so it is never held in memory whole
+                    document_count = 0
+                    chunk_count = 0
+                    for documents in document_loader.iter_document_batches():
+                        document_count += len(documents)
+                        
+                        # Split documents and merge near-duplicate chunks
+                        chunked_docs = text_splitter.split_documents_to_spans(documents)
+                        if deduplicator is not None:
+                            chunked_docs = deduplicator.deduplicate(chunked_docs)
+                        
+                        # Add to vector store
+                        retriever.add_chunks(chunked_docs)
+                        chunk_count += len(chunked_docs)
+                        
+                        # Index one summary per source document for coarse-to-fine retrieval
+                        retriever.add_document_summaries(documents, summarize)
+                    
+                    if not document_count:
+                        return None, None, None, False, "❌ No documents found in knowledge base directory"
                     
-                    # Add to vector store
-                    doc_contents = [doc['content'] for doc in chunked_docs]
-                    doc_metadata = [doc['metadata'] for doc in chunked_docs]
-                    doc_ids = [f"chunk_{i}" for i in range(len(chunked_docs))]
+                    if not chunk_count:
+                        return None, None, None, False, "❌ No document chunks created"
                     
-                    retriever.add_documents(doc_contents, doc_metadata, doc_ids)
+                    # Extract tabular facts so lookups skip retrieval and the LLM
+                    if _self.config.fact_store_enabled:
+                        FactStore(_self.config).build()
                     
-                    st.success(f"✅ Added {len(chunked_docs)} document chunks to vector store")
+                    st.success(f"✅ Added {chunk_count} document chunks to vector store")
                 else:
                     st.success(f"✅ Loaded existing vector store with {document_count} documents")
                 
@@ -103,6 +136,117 @@ class FitFlixStreamlitApp:
             st.error(error_msg)
             return None, None, None, False, error_msg
     
+    @st.cache_resource
+    def get_semantic_cache(_self) -> Optional[SemanticCache]:
+        """Get the semantic answer cache shared by all sessions (cached).
+        
+        Returns:
+            SemanticCache, or None if disabled
+        """
+        if not _self.config.semantic_cache_enabled:
+            return None
+        return SemanticCache(_self.config)
+    
+    @st.cache_resource
+    def get_faq_index(_self, _retriever) -> Optional[FAQIndex]:
+        """Get the FAQ fast path index shared by all sessions (cached).
+        
+        Args:
+            _retriever: Initialized document retriever
+            
+        Returns:
+            FAQIndex, or None if disabled
+        """
+        if not _self.config.faq_fast_path_enabled:
+            return None
+        faq_index = FAQIndex(_self.config, _retriever.embedding_manager)
+        faq_index.build()
+        return faq_index
+    
+    @st.cache_resource
+    def get_fact_matcher(_self) -> Optional[FactMatcher]:
+        """Get the fact lookup matcher shared by all sessions (cached).
+        
+        Returns:
+            FactMatcher, or None if disabled
+        """
+        if not _self.config.fact_store_enabled:
+            return None
+        fact_store = FactStore(_self.config)
+        if fact_store.count() == 0:
+            fact_store.build()
+        return FactMatcher(fact_store)
+    
+    @st.cache_resource
+    def get_query_log(_self) -> Optional[QueryLog]:
+        """Get the query log shared by all sessions (cached).
+        
+        Returns:
+            QueryLog, or None if precomputation is disabled
+        """
+        if not _self.config.precompute_enabled:
+            return None
+        return QueryLog(_self.config)
+    
+    @st.cache_resource
+    def get_answer_precomputer(_self, _retriever, _llm_manager) -> Optional[AnswerPrecomputer]:
+        """Get the answer precomputer shared by all sessions (cached).
+        
+        Args:
+            _retriever: Initialized document retriever
+            _llm_manager: LLM manager whose response cache is warmed
+            
+        Returns:
+            AnswerPrecomputer, or None if disabled
+        """
+        if not (_self.config.precompute_enabled and _self.config.response_cache_enabled):
+            return None
+        compressor = None
+        if _self.config.context_compression_enabled:
+            compressor = ContextCompressor(_self.config, _retriever.embedding_manager)
+        return AnswerPrecomputer(_self.config, _retriever, _llm_manager, compressor, _self.get_query_log())
+    
+    def get_sample_questions(self) -> List[str]:
+        """Get sample questions for the sidebar.
+        
+        Returns:
+            List of sample questions
+        """
+        return [
+            "What types of fitness classes do you offer?",
+            "How much does a monthly membership cost?",
+            "What are the gym's operating hours?",
+            "Can you recommend a post-workout nutrition plan?",
+            "What qualifications do your trainers have?",
+            "Do you have equipment for strength training?",
+            "How can I join the FIT-FLIX community?",
+            "What should I eat before a workout?"
+        ]
+    
+    def get_memory(self) -> Optional[ConversationMemory]:
+        """Get this session's conversation memory, creating it on first use.
+        
+        Returns:
+            ConversationMemory, or None if disabled
+        """
+        if not self.config.memory_enabled:
+            return None
+        if st.session_state.get('memory') is None:
+            st.session_state.memory = ConversationMemory(self.config, st.session_state.llm_manager.generate_summary)
+        return st.session_state.memory
+    
+    def get_working_set(self) -> Optional[WorkingSet]:
+        """Get this session's retrieval working set, creating it on first use.
+        
+        Returns:
+            WorkingSet, or None if disabled
+        """
+        if not self.config.working_set_enabled:
+            return None
+        if st.session_state.get('working_set') is None:
+            st.session_state.working_set = WorkingSet(self.config)
+        return st.session_state.working_set
+    
     def render_sidebar(self):
         """Render the sidebar with system information and controls."""
         st.sidebar.title("🏋️ FIT-FLIX")
@@ -117,6 +261,29 @@ class FitFlixStreamlitApp:
                 stats = st.session_state.retriever.get_retrieval_stats()
                 st.sidebar.metric("📚 Documents", stats.get('document_count', 0))
                 st.sidebar.info(f"🤖 Model: {self.config.llm_model}")
+                
+                semantic_cache = self.get_semantic_cache()
+                if semantic_cache is not None:
+                    cache_stats = semantic_cache.get_stats()
+                    st.sidebar.metric("⚡ Cache hit rate", f"{cache_stats['hit_rate']:.0%}",
+                                      help=f"{cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                                           f"{cache_stats['entries']} cached answers")
+                
+                fact_matcher = self.get_fact_matcher()
+                if fact_matcher is not None:
+                    st.sidebar.metric("📋 Fact lookups", fact_matcher.get_stats()['hits'],
+                                      help=f"{fact_matcher.get_stats()['misses']} questions fell through to RAG")
+                
+                faq_index = self.get_faq_index(st.session_state.retriever)
+                if faq_index is not None:
+                    st.sidebar.metric("📖 FAQ fast path hits", faq_index.get_stats()['hits'],
+                                      help=f"{faq_index.get_stats()['entries']} FAQ entries indexed")
+                
+                rate_stats = st.session_state.llm_manager.get_model_info()['rate_limit']
+                if rate_stats is not None:
+                    st.sidebar.metric("⏳ Avg LLM queue wait", f"{rate_stats['avg_queue_wait']:.2f}s",
+                                      help=f"{rate_stats['queued']} queued now, max wait {rate_stats['max_queue_wait']:.2f}s, "
+                                           f"quota {rate_stats['requests_per_minute']} RPM / {rate_stats['tokens_per_minute']} TPM")
             except:
                 st.sidebar.warning("⚠️ Stats unavailable")
         else:
@@ -124,24 +291,15 @@ class FitFlixStreamlitApp:
         
         # Sample questions
         st.sidebar.markdown("### 💡 Try These Questions")
-        sample_questions = [
-            "What types of fitness classes do you offer?",
-            "How much does a monthly membership cost?",
-            "What are the gym's operating hours?",
-            "Can you recommend a post-workout nutrition plan?",
-            "What qualifications do your trainers have?",
-            "Do you have equipment for strength training?",
-            "How can I join the FIT-FLIX community?",
-            "What should I eat before a workout?"
-        ]
-        
-        for question in sample_questions:
+        for question in self.get_sample_questions():
             if st.sidebar.button(question, key=f"sample_{hash(question)}"):
                 self.process_question(question)
         
         # Clear chat button
         if st.sidebar.button("🗑️ Clear Chat"):
             st.session_state.chat_history = []
+            st.session_state.memory = None
+            st.session_state.working_set = None
             st.rerun()  # Changed from st.experimental_rerun()
     
     def render_main_content(self):
@@ -158,6 +316,11 @@ class FitFlixStreamlitApp:
                 st.session_state.llm_manager = llm_manager
                 st.session_state.document_loader = document_loader
                 st.session_state.initialized = True
+                
+                # Answer the sample and most frequent questions ahead of time
+                answer_precomputer = self.get_answer_precomputer(retriever, llm_manager)
+                if answer_precomputer is not None:
+                    answer_precomputer.ensure_warm(self.get_sample_questions())
                 st.success(message)
                 st.rerun()
             else:
@@ -175,6 +338,17 @@ class FitFlixStreamlitApp:
                 with st.container():
                     st.markdown(f"**🔍 You:** {chat['question']}")
                     st.markdown(f"**🤖 FIT-FLIX:** {chat['answer']}")
+                    if chat.get('degraded'):
+                        st.caption(f"⚠️ Degraded: extracted from the knowledge base after the model missed "
+                                   f"the deadline | Total {chat['total_time']:.2f}s")
+                    elif chat.get('facts'):
+                        st.caption(f"📋 Looked up in the fact store in {chat['total_time'] * 1000:.1f}ms")
+                    elif chat.get('faq'):
+                        st.caption(f"📖 Answered from the FAQ in {chat['total_time']:.2f}s")
+                    elif chat.get('cached'):
+                        st.caption(f"⚡ Answered from cache in {chat['total_time']:.2f}s")
+                    elif 'total_time' in chat:
+                        st.caption(f"⏱️ First token in {chat['first_token_time']:.2f}s | Total {chat['total_time']:.2f}s")
                     st.markdown("---")
         
         # Input area
@@ -202,24 +376,133 @@ class FitFlixStreamlitApp:
             return
         
         try:
+            start_time = time.time()
+            deadline = Deadline(self.config.request_deadline)
+            retriever = st.session_state.retriever
+            index_generation = retriever.get_index_generation()
+            semantic_cache = self.get_semantic_cache()
+            faq_index = self.get_faq_index(retriever)
+            fact_matcher = self.get_fact_matcher()
+            memory = self.get_memory()
+            cached = None
+            from_faq = False
+            from_facts = False
+            
+            # Follow-ups depend on earlier turns, so a cached standalone answer may not fit them
+            follow_up = memory is not None and memory.is_follow_up(question)
+            
+            # Re-warm precomputed answers after a re-index; log standalone questions for the next warm-up
+            answer_precomputer = self.get_answer_precomputer(retriever, st.session_state.llm_manager)
+            if answer_precomputer is not None:
+                answer_precomputer.ensure_warm(self.get_sample_questions())
+            query_log = self.get_query_log()
+            if query_log is not None and not follow_up:
+                query_log.record(question)
+            
             with st.spinner("🤔 Thinking..."):
-                # Retrieve relevant documents
-                relevant_docs = st.session_state.retriever.retrieve(question)
+                # Answer price, plan, class and trainer lookups from the fact store, before embedding
+                if fact_matcher is not None and not follow_up:
+                    cached = fact_matcher.answer(question)
+                    from_facts = cached is not None
+                
+                if not cached:
+                    query_embedding = retriever.embedding_manager.embed_text(question)
+                
+                # Answer FAQ questions with their curated answer, without retrieval or generation
+                if faq_index is not None and not follow_up and not cached:
+                    cached = faq_index.lookup(query_embedding)
+                    from_faq = cached is not None
                 
-                # Generate response
-                response = st.session_state.llm_manager.generate_response(question, relevant_docs)
+                # Answer paraphrases of recent questions without retrieval or generation
+                if semantic_cache is not None and not follow_up and not cached:
+                    cached = semantic_cache.lookup(query_embedding, index_generation)
                 
-                # Add to chat history
+                if not cached:
+                    # Retrieve relevant documents
+                    # Follow-ups are usually answered by the previous turn's chunks
+                    relevant_docs = retriever.retrieve(question, query_embedding=query_embedding,
+                                                       working_set=self.get_working_set(), follow_up=follow_up,
+                                                       deadline=deadline)
+                    context_docs = relevant_docs
+                    
+                    # Keep only the query-relevant sentences for the prompt
+                    if self.config.context_compression_enabled and relevant_docs and not deadline.expired:
+                        compressor = ContextCompressor(self.config, retriever.embedding_manager)
+                        context_docs = compressor.compress(question, relevant_docs, query_embedding)
+            
+            if cached:
+                total_time = time.time() - start_time
                 st.session_state.chat_history.append({
                     'question': question,
-                    'answer': response
+                    'answer': cached['answer'],
+                    'first_token_time': total_time,
+                    'total_time': total_time,
+                    'cached': True,
+                    'faq': from_faq,
+                    'facts': from_facts
                 })
-                
-                 # Clear the input box
-                #st.session_state.user_input = ""  # Add this line
+                if memory is not None:
+                    memory.add_turn(question, cached['answer'])
+                self._trim_chat_history()
+                return
+            
+            # Stream the response into a placeholder
+            placeholder = st.empty()
+            first_token_time = None
+            response = ""
+            degraded = False
+            
+            try:
+                # Leave time to assemble the fallback if the LLM is too slow
+                # Only follow-ups carry the conversation, so standalone questions share cache keys
+                for delta in st.session_state.llm_manager.stream_response(
+                        question, context_docs, index_generation=index_generation,
+                        deadline=deadline.reserve(self.config.deadline_fallback_reserve),
+                        conversation=memory.render() if follow_up else None):
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                    response += delta
+                    placeholder.markdown(f"**🤖 FIT-FLIX:** {response}▌")
+            except DeadlineExceeded:
+                response = build_extractive_answer(question, relevant_docs, self.config.fallback_max_sentences)
+                degraded = True
+            
+            total_time = time.time() - start_time
+            placeholder.markdown(f"**🤖 FIT-FLIX:** {response}")
+            
+            # Add to chat history
+            st.session_state.chat_history.append({
+                'question': question,
+                'answer': response,
+                'first_token_time': first_token_time if first_token_time is not None else total_time,
+                'total_time': total_time,
+                'degraded': degraded
+            })
+            
+            if semantic_cache is not None and relevant_docs and response and not degraded and not follow_up:
+                sources = list(set([doc['metadata'].get('sources') or doc['metadata'].get('source', 'Unknown')
+                                  for doc in relevant_docs[:3]]))
+                semantic_cache.store(question, query_embedding, response, sources, index_generation)
+            
+            # Older turns are summarized in the background; the transcript shown stays bounded too
+            if memory is not None:
+                memory.add_turn(question, response)
+            self._trim_chat_history()
+            
+             # Clear the input box
+            #st.session_state.user_input = ""  # Add this line
+        except DeadlineExceeded:
+            # Retrieval used up the request budget, so there is nothing to answer from
+            st.warning("⏱️ Searching the knowledge base took too long. Please try again in a moment.")
         except Exception as e:
             st.error(f"❌ Error processing question: {str(e)}")
     
+    def _trim_chat_history(self):
+        """Keep only the most recent chat entries in session state."""
+        limit = self.config.chat_history_limit
+        if len(st.session_state.chat_history) > limit:
+            st.session_state.chat_history = st.session_state.chat_history[-limit:]
+    
     def render_about_section(self):
         """Render the about section."""
         with st.expander("ℹ️ About FIT-FLIX RAG System"):
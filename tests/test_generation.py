@@ -1,15 +1,34 @@
 """Tests for generation functionality."""
 
 import unittest
+import asyncio
+import gc
+import weakref
 from unittest.mock import Mock, patch
 import sys
+import tempfile
+import shutil
+import time
+import threading
 from pathlib import Path
 
 # Add src to path for testing
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
 from src.config import Config
-from src.generation.llm_manager import LLMManager
+from src.generation.llm_manager import LLMManager, SUMMARY_TOKENS_PER_WORD
+from src.generation.llm_backends import LLMBackend, create_backend
+from src.generation.response_cache import ResponseCache
+from src.generation.semantic_cache import SemanticCache
+from src.generation.context_packer import ContextPacker, estimate_tokens
+from src.generation.context_compressor import ContextCompressor, split_sentences
+from src.generation.extractive_answer import build_extractive_answer
+from src.generation.conversation_memory import ConversationMemory
+from src.generation.rate_scheduler import RateScheduler, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+from src.generation.summarizer import MapReduceSummarizer
+from src.generation.query_log import QueryLog
+from src.generation.answer_precomputer import AnswerPrecomputer
+from src.utils.deadline import Deadline, DeadlineExceeded
 
 
 class TestLLMManager(unittest.TestCase):
@@ -18,6 +37,7 @@ class TestLLMManager(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures."""
         self.config = Config()
+        self.config.response_cache_path = None
         self.llm_manager = LLMManager(self.config)
     
     def test_initialization(self):
@@ -26,7 +46,7 @@ class TestLLMManager(unittest.TestCase):
         self.assertEqual(self.llm_manager.model_name, self.config.llm_model)
         self.assertEqual(self.llm_manager.temperature, self.config.temperature)
         self.assertEqual(self.llm_manager.max_tokens, self.config.max_tokens)
-        self.assertIsNone(self.llm_manager.model)  # Model not loaded yet
+        self.assertIsNone(self.llm_manager.backend)  # Backend not loaded yet
     
     def test_context_building(self):
         """Test building context from retrieved documents."""
@@ -124,9 +144,10 @@ class TestLLMIntegration(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures."""
         self.config = Config()
+        self.config.response_cache_path = None  # Keep cached responses in memory per test
         self.llm_manager = LLMManager(self.config)
     
-    @patch('src.generation.llm_manager.genai')
+    @patch('src.generation.llm_backends.genai')
     def test_gemini_initialization(self, mock_genai):
         """Test Gemini model initialization with mocked API."""
         # Mock the GenerativeModel
@@ -142,17 +163,64 @@ class TestLLMIntegration(unittest.TestCase):
             llm_manager.initialize()
             mock_genai.configure.assert_called_once_with(api_key="test_key")
             mock_genai.GenerativeModel.assert_called_once_with("gemini-pro")
-            self.assertIsNotNone(llm_manager.model)
+            self.assertEqual(llm_manager.backend.name, "gemini")
         except Exception as e:
             self.skipTest(f"Gemini initialization test skipped: {str(e)}")
     
     def test_openai_initialization(self):
-        """Test OpenAI model initialization (should raise NotImplementedError)."""
+        """Test OpenAI-compatible backend initialization."""
         self.config.llm_model = "gpt-3.5-turbo"
+        self.config.openai_api_key = "test_key"
         llm_manager = LLMManager(self.config)
         
-        with self.assertRaises(NotImplementedError):
-            llm_manager.initialize()
+        llm_manager.initialize()
+        
+        self.assertEqual(llm_manager.backend.name, "openai")
+        self.assertEqual(llm_manager.backend.session.headers["Authorization"], "Bearer test_key")
+    
+    def test_openai_streaming_parses_events(self):
+        """Test that server-sent chat completion deltas are yielded in order."""
+        self.config.llm_model = "gpt-4o-mini"
+        self.config.openai_base_url = "http://localhost:8000/v1"
+        llm_manager = LLMManager(self.config)
+        llm_manager.initialize()
+        
+        events = [
+            'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+            '',
+            'data: {"choices": [{"delta": {"content": "Zumba is "}}]}',
+            'data: {"choices": [{"delta": {"content": "on Wednesdays."}}]}',
+            'data: [DONE]'
+        ]
+        http_response = Mock()
+        http_response.iter_lines.return_value = iter(events)
+        http_response.__enter__ = Mock(return_value=http_response)
+        http_response.__exit__ = Mock(return_value=False)
+        llm_manager.backend.session = Mock()
+        llm_manager.backend.session.post.return_value = http_response
+        
+        deltas = list(llm_manager.stream_response("When is Zumba?", []))
+        
+        self.assertEqual(deltas, ["Zumba is ", "on Wednesdays."])
+        payload = llm_manager.backend.session.post.call_args[1]['json']
+        self.assertEqual(payload['model'], "gpt-4o-mini")
+        self.assertTrue(payload['stream'])
+    
+    def test_stub_backend(self):
+        """Test the local stub backend through every generation path."""
+        self.config.llm_backend = "stub"
+        self.config.stub_tokens_per_second = 200
+        llm_manager = LLMManager(self.config)
+        context_docs = [{'id': 'chunk_1', 'content': 'Yoga runs daily.', 'metadata': {}}]
+        
+        response = llm_manager.generate_response("When is yoga?", context_docs)
+        deltas = list(llm_manager.stream_response("When is pilates?", context_docs))
+        async_response = asyncio.run(llm_manager.agenerate_response("When is boxing?", context_docs))
+        
+        self.assertEqual(response, "Stub answer to: When is yoga?")
+        self.assertEqual(deltas, ["Stub ", "answer ", "to: ", "When ", "is ", "pilates?"])
+        self.assertEqual(async_response, "Stub answer to: When is boxing?")
+        self.assertEqual(llm_manager.get_model_info()['backend'], "stub")
     
     def test_unsupported_model(self):
         """Test initialization with unsupported model."""
@@ -162,7 +230,7 @@ class TestLLMIntegration(unittest.TestCase):
         with self.assertRaises(ValueError):
             llm_manager.initialize()
     
-    @patch('src.generation.llm_manager.genai')
+    @patch('src.generation.llm_backends.genai')
     def test_response_generation_flow(self, mock_genai):
         """Test the complete response generation flow with mocked API."""
         # Mock the response
@@ -204,6 +272,207 @@ class TestLLMIntegration(unittest.TestCase):
         except Exception as e:
             self.skipTest(f"Response generation test skipped: {str(e)}")
     
+    @patch('src.generation.llm_backends.genai')
+    def test_response_streaming_flow(self, mock_genai):
+        """Test streaming response deltas with mocked API."""
+        chunks = []
+        for text in ["Cardio ", "improves ", "endurance."]:
+            chunk = Mock()
+            chunk.parts = [Mock()]
+            chunk.text = text
+            chunks.append(chunk)
+        final_chunk = Mock()
+        final_chunk.parts = []
+        chunks.append(final_chunk)
+        
+        mock_model = Mock()
+        mock_model.generate_content.return_value = iter(chunks)
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        self.config.llm_model = "gemini-pro"
+        self.config.google_api_key = "test_key"
+        llm_manager = LLMManager(self.config)
+        
+        try:
+            context_docs = [
+                {
+                    'content': 'Cardiovascular exercise strengthens the heart and improves endurance.',
+                    'metadata': {'source': 'cardio.md'},
+                    'similarity': 0.9
+                }
+            ]
+            
+            deltas = list(llm_manager.stream_response("What does cardio do?", context_docs))
+            
+            self.assertEqual(deltas, ["Cardio ", "improves ", "endurance."])
+            self.assertTrue(mock_model.generate_content.call_args[1]['stream'])
+            
+        except Exception as e:
+            self.skipTest(f"Response streaming test skipped: {str(e)}")
+    
+    @patch('src.generation.llm_backends.genai')
+    def test_cached_response_skips_api(self, mock_genai):
+        """Test that a repeated question is answered from the response cache."""
+        mock_response = Mock()
+        mock_response.text = "Yoga runs every morning at 7 AM."
+        
+        mock_model = Mock()
+        mock_model.generate_content.return_value = mock_response
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        self.config.llm_model = "gemini-pro"
+        self.config.google_api_key = "test_key"
+        llm_manager = LLMManager(self.config)
+        
+        try:
+            context_docs = [{'id': 'chunk_3', 'content': 'Yoga: mornings at 7 AM.', 'metadata': {'source': 'classes.md'}}]
+            
+            first = llm_manager.generate_response("When is yoga?", context_docs, index_generation=1)
+            second = llm_manager.generate_response("  when is YOGA ", context_docs, index_generation=1)
+            third = llm_manager.generate_response("When is yoga?", context_docs, index_generation=2)
+            
+            self.assertEqual(first, second)
+            self.assertEqual(third, mock_response.text)
+            self.assertEqual(mock_model.generate_content.call_count, 2)
+            
+        except Exception as e:
+            self.skipTest(f"Cached response test skipped: {str(e)}")
+    
+    @patch('src.generation.llm_backends.genai')
+    def test_concurrent_requests_coalesced(self, mock_genai):
+        """Test that identical in-flight requests share one Gemini call."""
+        def slow_generate(*args, **kwargs):
+            time.sleep(0.1)
+            response = Mock()
+            response.text = "Classes are updated monthly."
+            return response
+        
+        mock_model = Mock()
+        mock_model.generate_content.side_effect = slow_generate
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        self.config.llm_model = "gemini-pro"
+        self.config.google_api_key = "test_key"
+        self.config.response_cache_enabled = False
+        llm_manager = LLMManager(self.config)
+        
+        try:
+            context_docs = [{'id': 'chunk_9', 'content': 'Class schedules updated monthly.', 'metadata': {}}]
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(
+                    llm_manager.generate_response("When is the schedule updated?", context_docs)))
+                for _ in range(6)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            self.assertEqual(results, ["Classes are updated monthly."] * 6)
+            self.assertEqual(mock_model.generate_content.call_count, 1)
+            
+        except Exception as e:
+            self.skipTest(f"Request coalescing test skipped: {str(e)}")
+    
+    @patch('src.generation.llm_backends.genai')
+    def test_async_generation_retries_with_concurrency_cap(self, mock_genai):
+        """Test that async Gemini calls retry rate limits and respect the concurrency cap."""
+        class RateLimited(Exception):
+            code = 429
+        
+        state = {'active': 0, 'peak': 0, 'calls': 0}
+        
+        async def generate_content_async(prompt, **kwargs):
+            state['calls'] += 1
+            if state['calls'] == 1:
+                raise RateLimited("quota exceeded")
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+            await asyncio.sleep(0.02)
+            state['active'] -= 1
+            response = Mock()
+            response.text = "HIIT burns calories."
+            return response
+        
+        mock_model = Mock()
+        mock_model.generate_content_async.side_effect = generate_content_async
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        self.config.llm_model = "gemini-pro"
+        self.config.google_api_key = "test_key"
+        self.config.response_cache_enabled = False
+        self.config.llm_max_concurrency = 2
+        self.config.llm_retry_base_delay = 0.001
+        llm_manager = LLMManager(self.config)
+        
+        async def ask_all():
+            return await asyncio.gather(*[
+                llm_manager.agenerate_response(f"Question {i}?", []) for i in range(6)
+            ])
+        
+        results = asyncio.run(ask_all())
+        
+        self.assertEqual(results, ["HIIT burns calories."] * 6)
+        self.assertEqual(state['calls'], 7)
+        self.assertLessEqual(state['peak'], 2)
+        self.assertEqual(llm_manager.backend.retry_policy.retries, 1)
+    
+    @patch('src.generation.llm_backends.genai')
+    def test_async_semaphores_do_not_keep_loops_alive(self, mock_genai):
+        """Test that each asyncio.run gets its own semaphore without leaking the loop."""
+        self.config.google_api_key = "test_key"
+        self.config.llm_max_concurrency = 1
+        backend = create_backend(self.config, "gemini-pro")
+        loops = []
+        
+        async def contend():
+            loops.append(weakref.ref(asyncio.get_running_loop()))
+            semaphore = backend._semaphore()
+            async with semaphore:
+                # A second waiter binds the semaphore to the loop
+                waiter = asyncio.ensure_future(semaphore.acquire())
+                await asyncio.sleep(0)
+            await waiter
+            semaphore.release()
+        
+        for _ in range(3):
+            asyncio.run(contend())
+        gc.collect()
+        
+        self.assertLessEqual(len(backend._semaphores), 1)
+        self.assertIsNone(loops[0]())
+        self.assertIsNone(loops[1]())
+    
+    def test_backend_must_implement_interface(self):
+        """Test that a backend missing a blocking entry point cannot be created."""
+        class GenerateOnly(LLMBackend):
+            def generate(self, prompt, temperature=None, max_tokens=None):
+                return "Yoga at 7 AM"
+        
+        self.assertRaises(TypeError, LLMBackend, self.config, "stub")
+        self.assertRaises(TypeError, GenerateOnly, self.config, "stub")
+    
+    def test_slow_model_misses_deadline(self):
+        """Test that a model without output by the deadline is abandoned."""
+        self.config.llm_backend = "stub"
+        self.config.stub_latency = 1.0
+        llm_manager = LLMManager(self.config)
+        context_docs = [{'id': 'chunk_2', 'content': 'Spin class is on Fridays.', 'metadata': {}}]
+        
+        start = time.time()
+        with self.assertRaises(DeadlineExceeded):
+            list(llm_manager.stream_response("When is spin?", context_docs, deadline=Deadline(0.1)))
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(llm_manager.agenerate_response("When is spin?", context_docs, deadline=Deadline(0.1)))
+        
+        self.assertLess(time.time() - start, 0.5)
+        
+        # Without a deadline the same request completes
+        self.config.stub_latency = 0.0
+        self.assertEqual(list(llm_manager.stream_response("When is spin?", context_docs, deadline=Deadline(1.0))),
+                         ["Stub ", "answer ", "to: ", "When ", "is ", "spin?"])
+    
     def test_missing_api_key(self):
         """Test initialization without API key."""
         self.config.llm_model = "gemini-pro"
@@ -229,12 +498,578 @@ Summary:"""
         self.assertIn(str(self.config.max_tokens // 2), prompt)
 
 
+class TestResponseCache(unittest.TestCase):
+    """Test cases for ResponseCache."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.cache_path = Path(self.temp_dir) / "responses.sqlite3"
+        self.docs = [
+            {'id': 'chunk_1', 'content': 'Monthly membership costs 2,500.'},
+            {'id': 'chunk_2', 'content': 'Annual membership costs 20,000.'}
+        ]
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_key_components(self):
+        """Test which request details change the cache key."""
+        key = ResponseCache.make_key("How much is membership?", self.docs, None, "gemini-1.5-flash", 0.7)
+        
+        self.assertEqual(key, ResponseCache.make_key("how much is   membership", self.docs, None, "gemini-1.5-flash", 0.7))
+        self.assertNotEqual(key, ResponseCache.make_key("How much is membership?", self.docs[::-1], None, "gemini-1.5-flash", 0.7))
+        self.assertNotEqual(key, ResponseCache.make_key("How much is membership?", self.docs, "Be brief.", "gemini-1.5-flash", 0.7))
+        self.assertNotEqual(key, ResponseCache.make_key("How much is membership?", self.docs, None, "gemini-1.5-pro", 0.7))
+        self.assertNotEqual(key, ResponseCache.make_key("How much is membership?", self.docs, None, "gemini-1.5-flash", 0.2))
+    
+    def test_persistent_tier(self):
+        """Test that entries survive in SQLite beyond the memory tier."""
+        cache = ResponseCache(self.config, path=self.cache_path, max_entries=1)
+        cache.set("a", "first", generation=1)
+        cache.set("b", "second", generation=1)
+        
+        self.assertEqual(cache.get("a", generation=1), "first")
+        self.assertEqual(ResponseCache(self.config, path=self.cache_path).get("b", generation=1), "second")
+    
+    def test_ttl_and_generation_invalidation(self):
+        """Test that expired and stale-generation entries miss."""
+        cache = ResponseCache(self.config, path=self.cache_path, ttl=0.05)
+        cache.set("a", "answer", generation=1)
+        
+        self.assertIsNone(cache.get("a", generation=2))
+        
+        cache.set("a", "answer", generation=1)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("a", generation=1))
+        self.assertEqual(cache.get_stats()["misses"], 2)
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Test cases for SemanticCache."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = Config()
+        self.cache = SemanticCache(self.config, threshold=0.9, max_entries=2, ttl=60)
+    
+    def test_paraphrase_hit(self):
+        """Test that a nearby question returns the stored answer and sources."""
+        self.cache.store("When do you open?", [1.0, 0.0, 0.1], "6 AM to 10 PM.", ["about.md"], generation=1)
+        
+        hit = self.cache.lookup([0.9, 0.0, 0.1], generation=1)
+        
+        self.assertEqual(hit['answer'], "6 AM to 10 PM.")
+        self.assertEqual(hit['sources'], ["about.md"])
+        self.assertGreater(hit['similarity'], 0.9)
+        self.assertIsNone(self.cache.lookup([0.0, 1.0, 0.0], generation=1))
+        self.assertIsNone(self.cache.lookup([0.9, 0.0, 0.1], generation=2))
+        self.assertAlmostEqual(self.cache.get_stats()['hit_rate'], 1 / 3)
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used answer is evicted at capacity."""
+        self.cache.store("a", [1.0, 0.0, 0.0], "A")
+        self.cache.store("b", [0.0, 1.0, 0.0], "B")
+        self.cache.lookup([1.0, 0.0, 0.0])
+        self.cache.store("c", [0.0, 0.0, 1.0], "C")
+        
+        self.assertEqual(self.cache.lookup([1.0, 0.0, 0.0])['answer'], "A")
+        self.assertIsNone(self.cache.lookup([0.0, 1.0, 0.0]))
+        self.assertEqual(self.cache.get_stats()['evictions'], 1)
+    
+    def test_ttl_expiry(self):
+        """Test that expired answers are not returned."""
+        cache = SemanticCache(self.config, threshold=0.9, max_entries=2, ttl=0.05)
+        cache.store("a", [1.0, 0.0], "A")
+        time.sleep(0.1)
+        
+        self.assertIsNone(cache.lookup([1.0, 0.0]))
+        self.assertEqual(cache.get_stats()['expirations'], 1)
+
+
+class TestContextPacker(unittest.TestCase):
+    """Test cases for ContextPacker."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = Config()
+        self.config.response_cache_path = None
+    
+    def _chunk(self, chunk_id, content, similarity, source='membership.md'):
+        return {
+            'id': f"{source}_{chunk_id}",
+            'content': content,
+            'metadata': {'source': source, 'file_path': source, 'chunk_id': chunk_id},
+            'similarity': similarity
+        }
+    
+    def test_merges_adjacent_chunks_without_overlap(self):
+        """Test that consecutive chunks of one source become one passage."""
+        documents = [
+            self._chunk(1, "The student plan costs 1,500 per month with a valid ID card.", 0.9),
+            self._chunk(0, "Memberships are monthly or annual. The student plan costs 1,500 per month", 0.6),
+            self._chunk(0, "Yoga runs every morning.", 0.8, source='classes.md'),
+        ]
+        
+        packed, stats = ContextPacker(self.config, token_budget=1000).pack(documents)
+        
+        self.assertEqual(len(packed), 2)
+        self.assertEqual(
+            packed[0]['content'],
+            "Memberships are monthly or annual. The student plan costs 1,500 per month with a valid ID card."
+        )
+        self.assertEqual(packed[0]['similarity'], 0.9)
+        self.assertEqual(stats['tokens_dropped'], 0)
+    
+    def test_budget_drops_lowest_ranked(self):
+        """Test that passages beyond the budget are dropped and counted."""
+        documents = [
+            self._chunk(0, "Opening hours are 6 AM to 10 PM.", 0.9, source='about.md'),
+            self._chunk(0, "Parking is free for members. " * 20, 0.5, source='facilities.md'),
+        ]
+        budget = estimate_tokens(documents[0]['content']) + 5
+        
+        packed, stats = ContextPacker(self.config, token_budget=budget).pack(documents)
+        
+        self.assertEqual([doc['metadata']['source'] for doc in packed], ['about.md'])
+        self.assertEqual(stats['documents_dropped'], 1)
+        self.assertEqual(stats['tokens_dropped'], estimate_tokens(documents[1]['content']))
+    
+    def test_context_reports_token_usage(self):
+        """Test that the built context states tokens used and dropped."""
+        llm_manager = LLMManager(self.config)
+        
+        context = llm_manager._build_context([self._chunk(0, "Yoga runs every morning.", 0.8)])
+        
+        self.assertIn("tokens used", context)
+        self.assertIn("tokens dropped", context)
+        self.assertEqual(llm_manager.last_context_stats['documents_used'], 1)
+
+
+class TestContextCompressor(unittest.TestCase):
+    """Test cases for ContextCompressor."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = Config()
+        # Bag-of-keywords embeddings make relevance easy to control
+        vocabulary = ['yoga', 'price', 'parking', 'trainer']
+        embed = lambda text: [float(word in text.lower()) + 0.01 for word in vocabulary]
+        self.embedding_manager = Mock()
+        self.embedding_manager.embed_text.side_effect = embed
+        self.embedding_manager.embed_texts.side_effect = lambda texts: [embed(t) for t in texts]
+    
+    def test_split_sentences(self):
+        """Test that sentences and lines become separate spans."""
+        text = "Classes > Yoga\n\nYoga is calm. It runs daily!\n- Mats provided"
+        
+        sentences = [text[start:end] for start, end in split_sentences(text)]
+        
+        self.assertEqual(sentences, ["Classes > Yoga", "Yoga is calm.", "It runs daily!", "- Mats provided"])
+    
+    def test_keeps_relevant_sentences_with_neighbours(self):
+        """Test that top sentences survive with their neighbours and the rest is cut."""
+        documents = [{
+            'content': "Parking is free. Lockers are large. Yoga runs at 7 AM. Bring a mat. Showers are hot. Trainers are certified.",
+            'metadata': {'source': 'about.md'}
+        }]
+        compressor = ContextCompressor(self.config, self.embedding_manager, ratio=0.3, neighbours=1)
+        
+        compressed = compressor.compress("When is yoga?", documents)
+        
+        self.assertEqual(compressed[0]['content'], "... Lockers are large. Yoga runs at 7 AM. Bring a mat. ...")
+        self.assertEqual(compressed[0]['metadata'], documents[0]['metadata'])
+        self.embedding_manager.embed_texts.assert_called_once()
+    
+    def test_keeps_header_and_drops_irrelevant_documents(self):
+        """Test that section headers are kept and emptied documents are dropped."""
+        documents = [
+            {'content': "Classes > Yoga\n\nYoga is calm. Yoga runs daily.",
+             'metadata': {'source': 'classes.md', 'header_path': 'Classes > Yoga'}},
+            {'content': "Parking is free. Parking is covered. Parking is lit.",
+             'metadata': {'source': 'facilities.md'}}
+        ]
+        compressor = ContextCompressor(self.config, self.embedding_manager, ratio=0.4, neighbours=0)
+        
+        compressed = compressor.compress("yoga", documents)
+        
+        self.assertEqual(len(compressed), 1)
+        self.assertTrue(compressed[0]['content'].startswith("Classes > Yoga"))
+
+
+class TestRateScheduler(unittest.TestCase):
+    """Test cases for RateScheduler."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = Config()
+        self.config.response_cache_path = None
+    
+    def test_burst_then_throttle(self):
+        """Test that a full bucket admits a burst and then paces requests."""
+        scheduler = RateScheduler(self.config, requests_per_minute=600, tokens_per_minute=10_000)
+        
+        waits = [scheduler.acquire(10) for _ in range(600)]
+        self.assertLess(max(waits), 0.05)
+        
+        # The bucket is empty; the next request waits for 1/10 s of refill
+        self.assertGreater(scheduler.acquire(10), 0.05)
+        self.assertEqual(scheduler.get_stats()['granted'], 601)
+    
+    def test_token_quota_and_refund(self):
+        """Test that token usage is limited and unused budget is returned."""
+        scheduler = RateScheduler(self.config, requests_per_minute=1000, tokens_per_minute=600)
+        scheduler.acquire(600)
+        
+        self.assertRaises(DeadlineExceeded, scheduler.acquire, 100, PRIORITY_INTERACTIVE, Deadline(0.05))
+        self.assertEqual(scheduler.timeouts, 1)
+        
+        scheduler.refund(500)
+        self.assertLess(scheduler.acquire(100), 0.05)
+    
+    def test_interactive_before_batch(self):
+        """Test that queued interactive calls are admitted before earlier batch calls."""
+        scheduler = RateScheduler(self.config, requests_per_minute=1200, tokens_per_minute=1_000_000)
+        for _ in range(1200):
+            scheduler.acquire(1)
+        
+        order = []
+        def call(name, priority):
+            scheduler.acquire(1, priority)
+            order.append(name)
+        
+        threads = [threading.Thread(target=call, args=(f"batch{i}", PRIORITY_BATCH)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.01)
+        chat = threading.Thread(target=call, args=("chat", PRIORITY_INTERACTIVE))
+        chat.start()
+        for thread in threads + [chat]:
+            thread.join()
+        
+        self.assertLess(order.index("chat"), 2)
+        self.assertGreater(scheduler.get_stats()['max_queue_wait'], 0)
+
+    
+    def test_cancelled_async_wait_leaves_queue(self):
+        """Test that cancelling an async wait withdraws it instead of consuming quota later."""
+        scheduler = RateScheduler(self.config, requests_per_minute=60, tokens_per_minute=600)
+        scheduler.acquire(600)
+        
+        async def wait_briefly():
+            await asyncio.wait_for(scheduler.acquire_async(100), 0.05)
+        
+        self.assertRaises(asyncio.TimeoutError, asyncio.run, wait_briefly())
+        time.sleep(0.05)
+        self.assertEqual(scheduler.get_stats()['queued'], 0)
+        self.assertEqual(scheduler.get_stats()['granted'], 1)
+    
+    def test_failed_call_refunds_output_budget(self):
+        """Test that a failed LLM call gives back its reserved output budget."""
+        self.config.llm_model = "stub"
+        self.config.response_cache_enabled = False
+        llm_manager = LLMManager(self.config)
+        llm_manager.initialize()
+        llm_manager.backend.generate = Mock(side_effect=RuntimeError("upstream failed"))
+        scheduler = llm_manager.rate_scheduler
+        
+        self.assertRaises(RuntimeError, llm_manager.generate_response, "When do you open?", [])
+        self.assertGreater(scheduler._tokens_available, scheduler.tokens_per_minute - llm_manager.max_tokens)
+    
+    def test_async_quota_wait_is_bounded_by_deadline(self):
+        """Test that an async request gives up its queue slot and its generation at the deadline."""
+        self.config.llm_model = "stub"
+        self.config.response_cache_enabled = False
+        llm_manager = LLMManager(self.config)
+        llm_manager.initialize()
+        llm_manager.backend.agenerate = Mock(side_effect=RuntimeError("should not be called"))
+        scheduler = llm_manager.rate_scheduler = RateScheduler(self.config, requests_per_minute=1)
+        scheduler.acquire(100)
+        deadline = Deadline(0.1)
+        
+        with patch.object(scheduler, 'acquire', wraps=scheduler.acquire) as acquire:
+            self.assertRaises(DeadlineExceeded, asyncio.run,
+                              llm_manager.agenerate_response("When do you open?", [], deadline=deadline))
+            time.sleep(0.05)
+        
+        self.assertIs(acquire.call_args.args[2], deadline)
+        self.assertEqual(scheduler.get_stats()['queued'], 0)
+        llm_manager.backend.agenerate.assert_not_called()
+    
+    def test_summary_output_budget_follows_length(self):
+        """Test that a summary call is capped at and reserves a budget derived from its length."""
+        self.config.llm_model = "stub"
+        llm_manager = LLMManager(self.config)
+        llm_manager.initialize()
+        llm_manager.backend.generate = Mock(return_value="Yoga runs daily.")
+        llm_manager.rate_scheduler = Mock()
+        
+        llm_manager.generate_summary("Yoga runs every morning at the main studio.", max_length=40)
+        
+        budget = 40 * SUMMARY_TOKENS_PER_WORD
+        self.assertEqual(llm_manager.backend.generate.call_args.args[1:], (llm_manager.temperature, budget))
+        reserved = llm_manager.rate_scheduler.acquire.call_args.args[0]
+        prompt = llm_manager.backend.generate.call_args.args[0]
+        self.assertEqual(reserved, estimate_tokens(prompt) + budget)
+        llm_manager.rate_scheduler.refund.assert_called_once_with(budget - estimate_tokens("Yoga runs daily."))
+
+
+class TestConversationMemory(unittest.TestCase):
+    """Test cases for ConversationMemory."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = Config()
+        self.config.response_cache_path = None
+        self.summaries = []
+    
+    def _summarize(self, text, max_words):
+        self.summaries.append(text)
+        time.sleep(0.05)
+        return f"Summary #{len(self.summaries)}"
+    
+    def test_old_turns_summarized_in_background(self):
+        """Test that turns beyond the window are summarized without blocking add_turn."""
+        memory = ConversationMemory(self.config, self._summarize, token_budget=200, recent_turns=2)
+        
+        start = time.time()
+        for i in range(4):
+            memory.add_turn(f"Question {i}?", f"Answer {i}.")
+        self.assertLess(time.time() - start, 0.05)
+        
+        memory.wait()
+        rendered = memory.render()
+        
+        self.assertTrue(rendered.startswith("Summary of earlier conversation: Summary #"))
+        self.assertIn("User: Question 2?\nAssistant: Answer 2.", rendered)
+        self.assertIn("User: Question 3?", rendered)
+        self.assertNotIn("Question 0", rendered)
+        self.assertIn("Question 0?", self.summaries[0])
+    
+    def test_render_stays_within_budget(self):
+        """Test that long conversations never exceed the token budget."""
+        memory = ConversationMemory(self.config, lambda text, words: "x " * 500, token_budget=120, recent_turns=3)
+        for i in range(10):
+            memory.add_turn(f"Tell me about class {i}?", "It runs daily and suits all levels. " * 20)
+        memory.wait()
+        
+        self.assertLessEqual(estimate_tokens(memory.render()), 120)
+    
+    def test_summary_failure_keeps_questions(self):
+        """Test that a failing summarizer still leaves a record of what was asked."""
+        def failing(text, words):
+            raise RuntimeError("quota exceeded")
+        
+        memory = ConversationMemory(self.config, failing, recent_turns=1)
+        memory.add_turn("How much is the annual plan?", "15,000.")
+        memory.add_turn("Is parking free?", "Yes.")
+        memory.wait()
+        
+        self.assertIn("Earlier the user asked: How much is the annual plan?", memory.render())
+    
+    def test_follow_up_detection(self):
+        """Test that referring questions count as follow-ups only after a first turn."""
+        memory = ConversationMemory(self.config)
+        self.assertFalse(memory.is_follow_up("How much does that one cost?"))
+        
+        memory.add_turn("Do you offer Pilates?", "Yes, on Tuesdays.")
+        self.assertTrue(memory.is_follow_up("How much does that one cost?"))
+        self.assertTrue(memory.is_follow_up("And on weekends?"))
+        self.assertTrue(memory.is_follow_up("They are open on Sundays, right?"))
+        self.assertFalse(memory.is_follow_up("What are the opening hours?"))
+    
+    def test_standalone_questions_are_not_follow_ups(self):
+        """Test that questions naming their own subject keep the fast paths after a first turn."""
+        memory = ConversationMemory(self.config)
+        memory.add_turn("Do you offer Pilates?", "Yes, on Tuesdays.")
+        
+        for question in ["Is there a swimming pool?",
+                         "Do you have one-on-one personal training?",
+                         "What classes are offered this week?",
+                         "Which trainers specialize in yoga and what are their timings?",
+                         "How much does a monthly membership cost?",
+                         "Can you recommend a good post-workout nutrition plan?"]:
+            self.assertFalse(memory.is_follow_up(question), question)
+    
+    def test_conversation_in_prompt_and_key(self):
+        """Test that history reaches the prompt and separates cache entries."""
+        llm_manager = LLMManager(self.config)
+        docs = [{'id': 'chunk_1', 'content': 'Pilates costs 500 per class.', 'metadata': {}}]
+        conversation = "User: Do you offer Pilates?\nAssistant: Yes."
+        
+        prompt = llm_manager._create_rag_prompt("How much is it?", "context", conversation=conversation)
+        
+        self.assertIn("Conversation So Far:\n" + conversation, prompt)
+        self.assertNotEqual(llm_manager._get_request_key("How much is it?", docs, None),
+                            llm_manager._get_request_key("How much is it?", docs, None, conversation))
+
+
+class TestMapReduceSummarizer(unittest.TestCase):
+    """Test cases for MapReduceSummarizer."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = Config()
+        self.config.response_cache_path = None
+        self.calls = []
+        self.lock = threading.Lock()
+        self.text = " ".join(f"Section {i} covers meal {i} of the nutrition plan." for i in range(200))
+    
+    def _summarize(self, text, max_words, priority):
+        with self.lock:
+            self.calls.append((text, max_words))
+        time.sleep(0.05)
+        return f"Summary of {len(text)} characters."
+    
+    def test_tree_levels_run_concurrently(self):
+        """Test that chunks are summarized in parallel and reduced to one summary."""
+        summarizer = MapReduceSummarizer(self._summarize, self.config, chunk_size=1000, fan_in=4, max_concurrency=16)
+        
+        start = time.time()
+        summary = summarizer.summarize(self.text, 100)
+        elapsed = time.time() - start
+        
+        chunks = len(summarizer.text_splitter.split_text(self.text, 1000, summarizer.chunk_overlap))
+        self.assertGreater(chunks, 8)
+        self.assertTrue(summary.startswith("Summary of"))
+        # Three levels of 50 ms each, not one call per chunk in sequence
+        self.assertLess(elapsed, chunks * 0.05 / 2)
+        self.assertEqual(self.calls[-1][1], 100)
+        self.assertEqual(self.calls[0][1], 40)
+    
+    def test_chunk_summaries_cached(self):
+        """Test that unchanged chunks are not summarized again."""
+        summarizer = MapReduceSummarizer(self._summarize, self.config, chunk_size=1000)
+        summarizer.summarize(self.text, 100)
+        first_calls = len(self.calls)
+        
+        summarizer.summarize(self.text, 100)
+        
+        self.assertEqual(len(self.calls), first_calls)
+        self.assertGreater(summarizer.get_stats()['cache_hits'], 0)
+    
+    def test_short_text_uses_single_call(self):
+        """Test that generate_summary only maps long text."""
+        self.config.llm_model = "stub"
+        self.config.summary_chunk_size = 1000
+        self.config.rate_limit_enabled = False
+        llm_manager = LLMManager(self.config)
+        
+        llm_manager.generate_summary("Short text.")
+        self.assertEqual(llm_manager.summarizer.calls, 0)
+        
+        llm_manager.generate_summary(self.text)
+        self.assertGreater(llm_manager.summarizer.calls, 1)
+
+
+class TestAnswerPrecomputer(unittest.TestCase):
+    """Test cases for QueryLog and AnswerPrecomputer."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.llm_model = "stub"
+        self.config.rate_limit_enabled = False
+        self.config.response_cache_path = None
+        self.config.query_log_path = Path(self.temp_dir) / "query_log.sqlite3"
+        
+        self.retriever = Mock()
+        self.retriever.get_index_generation.return_value = 1
+        self.retriever.embedding_manager.embed_text.return_value = [0.1, 0.2]
+        self.retriever.retrieve.return_value = [
+            {'id': 'chunk_1', 'content': 'The gym opens at 6 AM.', 'metadata': {'source': 'facilities.md'}}
+        ]
+        self.llm_manager = LLMManager(self.config)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_query_log_ranks_by_frequency(self):
+        """Test that the most frequent questions come first, across restarts."""
+        query_log = QueryLog(self.config)
+        for question in ["Opening hours?", "opening hours", "Is parking free?", "Opening  hours?"]:
+            query_log.record(question)
+        
+        self.assertEqual(QueryLog(self.config).top(2), ["Opening  hours?", "Is parking free?"])
+    
+    def test_precomputed_answer_served_from_cache(self):
+        """Test that a precomputed question is answered from the response cache."""
+        query_log = QueryLog(self.config)
+        query_log.record("Is parking free?")
+        precomputer = AnswerPrecomputer(self.config, self.retriever, self.llm_manager, query_log=query_log)
+        
+        self.assertEqual(precomputer.get_questions(["When do you open?", "when do you open"]),
+                         ["When do you open?", "Is parking free?"])
+        self.assertEqual(precomputer.run(["When do you open?"]), 1)
+        
+        self.llm_manager.backend.generate = Mock(side_effect=AssertionError("LLM called"))
+        response = self.llm_manager.generate_response("When do you open?", self.retriever.retrieve.return_value,
+                                                      index_generation=1)
+        self.assertEqual(response, "Stub answer to: When do you open?")
+    
+    def test_precomputed_answer_served_on_later_turn(self):
+        """Test that a sample question asked after another turn still hits the precomputed answer."""
+        question = "How much does a monthly membership cost?"
+        AnswerPrecomputer(self.config, self.retriever, self.llm_manager).run([question])
+        
+        memory = ConversationMemory(self.config)
+        memory.add_turn("What classes do you offer?", "Yoga and Zumba.")
+        follow_up = memory.is_follow_up(question)
+        self.assertFalse(follow_up)
+        
+        # The request a chat UI makes for the second turn
+        self.llm_manager.backend.stream = Mock(side_effect=AssertionError("LLM called"))
+        documents = self.retriever.retrieve(question, query_embedding=[0.1, 0.2],
+                                            working_set=Mock(), follow_up=follow_up)
+        response = "".join(self.llm_manager.stream_response(
+            question, documents, index_generation=1,
+            conversation=memory.render() if follow_up else None))
+        self.assertEqual(response, f"Stub answer to: {question}")
+    
+    def test_rewarms_after_reindex(self):
+        """Test that warming runs once per index generation."""
+        precomputer = AnswerPrecomputer(self.config, self.retriever, self.llm_manager)
+        
+        self.assertTrue(precomputer.ensure_warm(["When do you open?"]))
+        precomputer.wait()
+        self.assertFalse(precomputer.ensure_warm(["When do you open?"]))
+        
+        self.retriever.get_index_generation.return_value = 2
+        self.assertTrue(precomputer.ensure_warm(["When do you open?"]))
+        precomputer.wait()
+        self.assertEqual(precomputer.generation, 2)
+
+
+class TestExtractiveAnswer(unittest.TestCase):
+    """Test cases for the extractive fallback answer."""
+    
+    def test_best_matching_sentences_with_sources(self):
+        """Test that sentences sharing the most query terms are listed with sources."""
+        documents = [
+            {'content': "Classes > Zumba\n\nZumba is a dance workout. Zumba runs Wednesday at 7 PM.",
+             'metadata': {'source': 'classes.md', 'header_path': 'Classes > Zumba'}},
+            {'content': "Parking is free. Lockers are available.", 'metadata': {'source': 'facilities.md'}}
+        ]
+        
+        answer = build_extractive_answer("What time is Zumba on Wednesday?", documents, max_sentences=2)
+        lines = answer.splitlines()
+        
+        self.assertEqual(lines[2], "- Zumba runs Wednesday at 7 PM. (classes.md)")
+        self.assertEqual(lines[3], "- Zumba is a dance workout. (classes.md)")
+        self.assertNotIn("Classes > Zumba", answer)
+
+
 class TestPromptEngineering(unittest.TestCase):
     """Test cases for prompt engineering and optimization."""
     
     def setUp(self):
         """Set up test fixtures."""
         self.config = Config()
+        self.config.response_cache_path = None
         self.llm_manager = LLMManager(self.config)
     
     def test_fitness_specific_prompt(self):
@@ -1,6 +1,7 @@
 """Tests for retrieval functionality."""
 
 import unittest
+from unittest.mock import Mock, patch
 import tempfile
 import shutil
 from pathlib import Path
@@ -10,8 +11,15 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
 from src.config import Config
-from src.retrieval.retriever import DocumentRetriever
+from src.retrieval.retriever import DocumentRetriever, chunk_ids
 from src.retrieval.vector_store import VectorStore
+from src.retrieval.working_set import WorkingSet
+from src.retrieval.document_index import DocumentIndex, extractive_document_summary
+from src.retrieval.faq_index import FAQIndex, parse_faq
+from src.retrieval.fact_store import FactStore, extract_facts
+from src.retrieval.fact_matcher import FactMatcher
+from src.retrieval.entity_index import EntityIndex
+from src.utils.deadline import Deadline, DeadlineExceeded
 
 
 class TestVectorStore(unittest.TestCase):
@@ -220,6 +228,388 @@ class TestDocumentRetriever(unittest.TestCase):
             self.skipTest(f"Empty query handling test skipped: {str(e)}")
 
 
+class TestWorkingSet(unittest.TestCase):
+    """Test cases for the per-session retrieval working set."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = Config()
+        self.working_set = WorkingSet(self.config)
+        self.documents = [
+            {'id': 'classes.md_0', 'content': 'Yoga classes', 'metadata': {}, 'distance': 0.1},
+            {'id': 'classes.md_1', 'content': 'Zumba classes', 'metadata': {}, 'distance': 0.2}
+        ]
+        self.working_set.update(self.documents, [[1.0, 0.0], [0.0, 1.0]], generation=1)
+    
+    def test_covered_query_is_reranked(self):
+        """Test that a query close to the working set is answered from it."""
+        results = self.working_set.search([0.1, 1.0], n_results=2, generation=1)
+        
+        self.assertEqual([doc['id'] for doc in results], ['classes.md_1', 'classes.md_0'])
+        self.assertEqual(self.working_set.hits, 1)
+    
+    def test_uncovered_query_falls_back(self):
+        """Test that unrelated queries and stale index generations fall back to a full search."""
+        self.assertIsNone(self.working_set.search([-1.0, -1.0], n_results=2, generation=1))
+        self.assertIsNone(self.working_set.search([0.0, 1.0], n_results=2, generation=2))
+        self.assertIsNone(self.working_set.search([0.0, 1.0], n_results=3, generation=1))
+        self.assertEqual(self.working_set.misses, 3)
+    
+    def test_follow_up_uses_lower_threshold(self):
+        """Test that follow-up questions are covered at a lower similarity."""
+        query = [1.0, -1.5]  # Cosine similarity about 0.55 to the first chunk
+        
+        self.assertIsNone(self.working_set.search(query, n_results=1, generation=1))
+        self.assertIsNotNone(self.working_set.search(query, n_results=1, generation=1, follow_up=True))
+
+    
+    def test_retriever_searches_working_set_for_follow_ups_only(self):
+        """Test that standalone queries search the index even when the working set covers them."""
+        config = Config()
+        config.chroma_db_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config.chroma_db_path, True)
+        config.document_index_enabled = False
+        config.entity_index_enabled = False
+        with patch('src.retrieval.retriever.EmbeddingManager'):
+            retriever = DocumentRetriever(config)
+        retriever.collection = Mock()
+        retriever.collection.count.return_value = 10
+        retriever.collection.query.return_value = {
+            'ids': [['facilities.md_0']], 'documents': [['The gym opens at 6 AM.']],
+            'metadatas': [[{}]], 'distances': [[0.3]], 'embeddings': [[[1.0, 0.0]]]
+        }
+        self.working_set.update(self.documents, [[1.0, 0.0], [0.0, 1.0]], generation=0)
+        
+        results = retriever.retrieve("When do you open?", n_results=1, query_embedding=[1.0, 0.0],
+                                     working_set=self.working_set)
+        self.assertEqual([doc['id'] for doc in results], ['facilities.md_0'])
+        
+        results = retriever.retrieve("And on weekends?", n_results=1, query_embedding=[1.0, 0.0],
+                                     working_set=self.working_set, follow_up=True)
+        self.assertEqual([doc['id'] for doc in results], ['facilities.md_0'])
+        self.assertEqual(retriever.collection.query.call_count, 1)
+
+
+class TestDocumentIndex(unittest.TestCase):
+    """Test cases for the document-level summary index."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = Config()
+        self.collection = Mock()
+        self.client = Mock()
+        self.client.get_or_create_collection.return_value = self.collection
+        self.embedding_manager = Mock()
+        self.embedding_manager.embed_texts.side_effect = lambda texts: [[0.0, 1.0] for _ in texts]
+        self.index = DocumentIndex(self.config, self.client, self.embedding_manager)
+        self.index.initialize()
+    
+    def test_extractive_summary_lists_sections(self):
+        """Test that the extractive summary keeps each heading with its lead sentence."""
+        summary = extractive_document_summary([
+            "Classes > Yoga\n\nYoga runs every morning. Bring a mat.",
+            "Classes > Zumba\n\nZumba runs on weekends. No booking needed."
+        ], max_chars=200)
+        
+        self.assertEqual(summary, "Classes > Yoga: Yoga runs every morning.\nClasses > Zumba: Zumba runs on weekends.")
+    
+    def test_one_entry_per_source(self):
+        """Test that sections of a source are indexed as one document."""
+        documents = [
+            {'content': 'Yoga runs daily.', 'metadata': {'source': 'classes.md', 'file_path': 'kb/classes.md'}},
+            {'content': 'Zumba runs weekly.', 'metadata': {'source': 'classes.md', 'file_path': 'kb/classes.md'}},
+            {'content': 'Kids yoga runs Sundays.', 'metadata': {'source': 'classes.md', 'file_path': 'kb/kids/classes.md'}},
+            {'content': 'Annual plan costs 15,000.', 'metadata': {'source': 'membership.md'}}
+        ]
+        
+        self.assertEqual(self.index.add_documents(documents), 3)
+        upsert = self.collection.upsert.call_args.kwargs
+        self.assertEqual(upsert['ids'], ['kb/classes.md', 'kb/kids/classes.md', 'membership.md'])
+        self.assertEqual(upsert['metadatas'][0], {'source': 'classes.md', 'file_path': 'kb/classes.md', 'sections': 2})
+    
+    def test_select_sources(self):
+        """Test that sources are only selected when they narrow the search."""
+        self.collection.query.return_value = {'metadatas': [[{'source': 'classes.md', 'file_path': 'kb/classes.md'}]]}
+        
+        self.collection.count.return_value = 1
+        self.assertIsNone(self.index.select_sources([0.0, 1.0], top_m=1))
+        
+        self.collection.count.return_value = 5
+        self.assertEqual(self.index.select_sources([0.0, 1.0], top_m=1), ['kb/classes.md'])
+
+    
+    def test_retriever_deadline(self):
+        """Test that a late retrieval skips source selection and fails before the vector search."""
+        self.config.chroma_db_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config.chroma_db_path, True)
+        self.config.entity_index_enabled = False
+        with patch('src.retrieval.retriever.EmbeddingManager'):
+            retriever = DocumentRetriever(self.config)
+        retriever.document_index = Mock()
+        retriever.collection = Mock()
+        retriever.collection.count.return_value = 1
+        retriever.collection.query.return_value = {
+            'ids': [['classes.md_0']], 'documents': [['Yoga runs daily.']],
+            'metadatas': [[{}]], 'distances': [[0.1]], 'embeddings': [[[0.0, 1.0]]]
+        }
+        
+        # Past the deadline, but checks pass: only the optional stage is skipped
+        results = retriever.retrieve("yoga", n_results=1, query_embedding=[0.0, 1.0],
+                                     deadline=Mock(expired=True))
+        self.assertEqual([doc['id'] for doc in results], ['classes.md_0'])
+        retriever.document_index.select_sources.assert_not_called()
+        
+        self.assertRaises(DeadlineExceeded, retriever.retrieve, "yoga", n_results=1,
+                          query_embedding=[0.0, 1.0], deadline=Deadline(0.0))
+        self.assertEqual(retriever.collection.query.call_count, 1)
+
+
+class TestFAQIndex(unittest.TestCase):
+    """Test cases for the FAQ fast path."""
+    
+    FAQ = """# FAQ
+
+### Membership
+
+**Q: Can I pause my membership?**  
+A: Yes, with prior notice.
+
+### Others
+
+**Q: Is a trial session available?**  
+A: Trial visits may be available
+upon request.
+"""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.faq_path = Path(self.temp_dir) / "faq.md"
+        self.config.faq_path.write_text(self.FAQ, encoding='utf-8')
+        
+        self.embedding_manager = Mock()
+        self.embedding_manager.embed_texts.return_value = [[1.0, 0.0], [0.0, 1.0]]
+        self.faq_index = FAQIndex(self.config, self.embedding_manager)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_parse_faq(self):
+        """Test that entries keep their section and multi-line answers."""
+        entries = parse_faq(self.FAQ)
+        
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0], {'question': 'Can I pause my membership?',
+                                      'answer': 'Yes, with prior notice.', 'section': 'Membership'})
+        self.assertEqual(entries[1]['answer'], 'Trial visits may be available upon request.')
+    
+    def test_lookup_requires_high_similarity(self):
+        """Test that only near-identical questions get the curated answer."""
+        self.assertEqual(self.faq_index.build(), 2)
+        
+        match = self.faq_index.lookup([0.05, 1.0])
+        self.assertEqual(match['answer'], 'Trial visits may be available upon request.')
+        self.assertEqual(match['source'], 'faq.md')
+        
+        self.assertIsNone(self.faq_index.lookup([1.0, 1.0]))
+        self.assertEqual(self.faq_index.get_stats()['hits'], 1)
+        self.assertEqual(self.faq_index.get_stats()['misses'], 1)
+
+
+class TestFactStore(unittest.TestCase):
+    """Test cases for the structured fact store and its query matcher."""
+    
+    MEMBERSHIP = """# Membership
+
+### 1. Basic Membership
+- **Personal Training:** Available at additional cost.
+
+### 2. Premium Membership
+- **Personal Training:** 4 complimentary sessions per month.
+
+## Pricing
+| Plan               | Monthly Price (INR) | Annual Price (INR) |
+|--------------------|---------------------|--------------------|
+| Basic Membership   | ₹2,000              | ₹20,000            |
+| Premium Membership | ₹7,000              | ₹70,000            |
+"""
+    TRAINERS = """# Trainers
+
+## Key Trainers
+- **Anita Sharma:** Certified Yoga instructor.
+- **Vikram Singh:** Experienced in boxing.
+"""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        (Path(self.temp_dir) / "membership.md").write_text(self.MEMBERSHIP, encoding='utf-8')
+        (Path(self.temp_dir) / "trainers.md").write_text(self.TRAINERS, encoding='utf-8')
+        self.config = Config()
+        self.config.fact_store_path = Path(self.temp_dir) / "facts.sqlite3"
+        self.config.fact_sources = ["membership.md", "trainers.md"]
+        
+        self.fact_store = FactStore(self.config)
+        self.fact_store.build(self.temp_dir)
+        self.matcher = FactMatcher(self.fact_store)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_extract_facts(self):
+        """Test that table cells and key/value lists become facts."""
+        facts = extract_facts(self.MEMBERSHIP, "membership.md")
+        
+        self.assertIn(("membership.md", "2. Premium Membership", "Premium Membership",
+                       "Personal Training", "4 complimentary sessions per month."), facts)
+        self.assertIn(("membership.md", "Pricing", "Basic Membership", "Annual Price (INR)", "₹20,000"), facts)
+        self.assertEqual(len(facts), 6)
+    
+    def test_price_lookup(self):
+        """Test that price questions are narrowed by plan and period."""
+        result = self.matcher.answer("How much is the annual premium membership?")
+        
+        self.assertEqual(result['rule'], 'price')
+        self.assertIn("₹70,000", result['answer'])
+        self.assertNotIn("₹7,000", result['answer'])
+        self.assertEqual(self.matcher.answer("How much does a monthly membership cost?")['answer'].count("₹"), 2)
+    
+    def test_trainer_and_attribute_lookup(self):
+        """Test lookups of a trainer by specialization and of a plan attribute."""
+        self.assertIn("Anita Sharma", self.matcher.answer("Who teaches yoga?")['answer'])
+        self.assertIn("4 complimentary sessions",
+                      self.matcher.answer("Does premium include personal training?")['answer'])
+    
+    def test_unmatched_queries_fall_through(self):
+        """Test that questions the store cannot answer return None."""
+        self.assertIsNone(self.matcher.answer("What time is Zumba on Wednesday?"))
+        self.assertIsNone(self.matcher.answer("How much protein should I eat?"))
+        self.assertIsNone(self.matcher.answer("What is the cancellation fee?"))
+        self.assertIsNone(self.matcher.answer("What is the price of protein shakes?"))
+        self.assertIsNone(self.matcher.answer("Do you have a student discount price?"))
+        self.assertIsNone(self.matcher.answer("What are the prices for kids?"))
+        self.assertIsNone(self.matcher.answer("Can I get a refund of my membership fee if I cancel?"))
+        self.assertIsNone(self.matcher.answer("Is there a joining fee for the membership plans?"))
+        self.assertEqual(self.matcher.get_stats()['misses'], 8)
+        
+        # Asks whether training costs extra, which the plan's attribute answers, not its prices
+        extra = self.matcher.answer("Do you charge extra for personal training in the premium plan?")
+        self.assertEqual(extra['rule'], 'attribute')
+        self.assertNotIn("₹", extra['answer'])
+
+
+class TestEntityIndex(unittest.TestCase):
+    """Test cases for the entity posting lists."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        (Path(self.temp_dir) / "trainers.md").write_text(
+            "## Key Trainers\n- **Anita Sharma:** Certified Yoga instructor.\n", encoding='utf-8')
+        (Path(self.temp_dir) / "facilities.md").write_text(
+            "## Gym Area\n- **Cardio Zone:** Treadmills and rowers.\n", encoding='utf-8')
+        self.config = Config()
+        self.config.knowledge_base_dir = Path(self.temp_dir)
+        self.config.entity_sources = ["trainers.md", "facilities.md"]
+        self.entity_index = EntityIndex(self.config, Path(self.temp_dir) / "entity_index.json")
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_postings_by_name(self):
+        """Test that queries naming an entity find the chunks that mention it."""
+        self.assertEqual(self.entity_index.build_dictionary(), 2)
+        self.entity_index.add_chunks(["chunk_0", "chunk_1", "chunk_2"], [
+            "Anita Sharma leads the morning yoga.",
+            "The cardio zone opens at 6 AM.",
+            "Anitas and cardiozones are not entities."
+        ])
+        
+        self.assertEqual(self.entity_index.lookup("Is Anita in today?"), ["chunk_0"])
+        self.assertEqual(self.entity_index.lookup("Where is the Cardio Zone? Ask Anita Sharma."),
+                         ["chunk_1", "chunk_0"])
+        self.assertEqual(self.entity_index.lookup("What is HIIT?"), [])
+    
+    def test_saved_index_reloads(self):
+        """Test that the index survives a restart."""
+        self.entity_index.add_chunks(["chunk_0"], ["Meet Anita Sharma."])
+        self.entity_index.save()
+        
+        reloaded = EntityIndex(self.config, self.entity_index.path)
+        self.assertTrue(reloaded.load())
+        self.assertEqual(reloaded.lookup("anita"), ["chunk_0"])
+
+    
+    def test_retriever_boosts_closest_entity_chunks(self):
+        """Test that the retriever boosts the entity chunks closest to the query."""
+        self.config.chroma_db_path = self.temp_dir
+        self.config.document_index_enabled = False
+        self.config.entity_max_chunks = 1
+        with patch('src.retrieval.retriever.EmbeddingManager'):
+            retriever = DocumentRetriever(self.config)
+        retriever.entity_index = self.entity_index
+        self.entity_index.add_chunks(["about.md_3", "classes.md_8", "trainers.md_46"], [
+            "Anita Sharma founded the studio.",
+            "Morning yoga with Anita Sharma.",
+            "Anita Sharma: certified yoga instructor."
+        ])
+        
+        vector_hits = [f"classes.md_{i}" for i in range(4)]
+        retriever.collection = Mock()
+        retriever.collection.count.return_value = 10
+        retriever.collection.query.return_value = {
+            'ids': [vector_hits],
+            'documents': [[f"chunk {i}" for i in range(4)]],
+            'metadatas': [[{} for _ in range(4)]],
+            'distances': [[0.5, 0.6, 0.7, 0.8]],
+            'embeddings': [[[0.0, 1.0] for _ in range(4)]]
+        }
+        retriever.collection.get.return_value = {
+            'ids': ["about.md_3", "classes.md_8", "trainers.md_46"],
+            'documents': ["founded", "morning yoga", "instructor"],
+            'metadatas': [{}, {}, {}],
+            'embeddings': [[-1.0, 0.0], [-1.0, 0.0], [1.0, 0.0]]
+        }
+        
+        results = retriever.retrieve("Which trainer is Anita?", n_results=4, query_embedding=[1.0, 0.0])
+        
+        self.assertEqual([doc['id'] for doc in results], ["trainers.md_46"] + vector_hits[:3])
+        self.assertEqual(results[0]['distance'], 0.0)
+
+    
+    def test_retriever_deletes_removed_files(self):
+        """Test that chunks of deleted files leave the collection and the posting lists."""
+        self.config.chroma_db_path = self.temp_dir
+        self.config.document_index_enabled = False
+        with patch('src.retrieval.retriever.EmbeddingManager'):
+            retriever = DocumentRetriever(self.config)
+        retriever.entity_index = self.entity_index
+        self.entity_index.add_chunks(["trainers.md_0", "classes.md_0"], ["Anita Sharma", "Yoga with Anita Sharma"])
+        retriever.collection = Mock()
+        retriever.collection.get.return_value = {'ids': ["trainers.md_0"]}
+        
+        self.assertEqual(retriever.delete_files([Path("kb/trainers.md")]), 1)
+        
+        retriever.collection.get.assert_called_once_with(where={'file_path': {'$in': ["kb/trainers.md"]}}, include=[])
+        retriever.collection.delete.assert_called_once_with(ids=["trainers.md_0"])
+        self.assertEqual(self.entity_index.lookup("Anita"), ["classes.md_0"])
+        self.assertEqual(retriever.get_index_generation(), 1)
+    
+    def test_chunk_ids_follow_files(self):
+        """Test that chunk IDs come from the file and part, so separate loads do not collide."""
+        ids = chunk_ids([
+            {'file_path': 'kb/classes.md', 'section': 2, 'chunk_id': 0},
+            {'file_path': 'kb/guide.pdf', 'page': 3, 'chunk_id': 1},
+            {'source': 'notes.txt', 'chunk_id': 0}
+        ])
+        
+        self.assertEqual(ids, ['kb/classes.md#2.0', 'kb/guide.pdf#3.1', 'notes.txt#0.0'])
+
+
 class TestRetrievalIntegration(unittest.TestCase):
     """Integration tests for retrieval functionality."""
     
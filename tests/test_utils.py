@@ -0,0 +1,628 @@
+"""Tests for utility functionality."""
+
+import asyncio
+import random
+import unittest
+import tempfile
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from src.config import Config
+from src.utils.document_loader import DocumentLoader
+from src.utils.file_scanner import FileScanner
+from src.utils.markdown_sections import parse_markdown_sections
+from src.utils.text_splitter import TextSplitter, ChunkSpan
+from src.utils.deduplicator import ChunkDeduplicator
+from src.utils.single_flight import SingleFlight
+from src.utils.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.utils.aho_corasick import AhoCorasick
+
+
+class TestDocumentLoader(unittest.TestCase):
+    """Test cases for DocumentLoader."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.document_loader = DocumentLoader(self.config)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_clean_markdown(self):
+        """Test stripping headers, links, emphasis and code from markdown."""
+        content = (
+            "# Classes\n\n\n\n## **Zumba** and *Yoga*\n"
+            "Book via [the app](https://fitflix.example) using `code`.\n"
+            "```\nignored block\n```\n"
+            "See [**Timings**](https://fitflix.example/timings)."
+        )
+        
+        cleaned = self.document_loader._clean_markdown(content)
+        
+        self.assertEqual(cleaned, "Classes\n\nZumba and Yoga\nBook via the app using code.\n\nSee Timings.")
+    
+    def test_clean_markdown_matches_markup_left_to_right(self):
+        """Test that markup is matched left to right, so code spans keep their asterisks."""
+        # The old per-construct passes paired the asterisk inside the code span with "*x"
+        self.assertEqual(self.document_loader._clean_markdown("Use `a*b` and *x*"), "Use a*b and x")
+        self.assertEqual(self.document_loader._clean_markdown("**Note:** `2 * 3`\n\n```\nblock\n```\n"),
+                         "Note: 2 * 3\n\n")
+    
+    def test_iter_documents(self):
+        """Test concurrent loading of markdown and text files."""
+        for i in range(40):
+            (Path(self.temp_dir) / f"classes_{i}.md").write_text(f"# Class {i}\n\n**Zumba** at {i} PM.", encoding="utf-8")
+        (Path(self.temp_dir) / "guide.txt").write_text("Stay hydrated during workouts.", encoding="utf-8")
+        (Path(self.temp_dir) / "image.png").write_bytes(b"not a document")
+        
+        documents = list(self.document_loader.iter_documents(self.temp_dir, max_workers=4, batch_size=8))
+        
+        self.assertEqual(len(documents), 41)
+        by_source = {doc['metadata']['source']: doc for doc in documents}
+        self.assertEqual(by_source['classes_7.md']['content'], "Class 7\n\nZumba at 7 PM.")
+        self.assertEqual(by_source['classes_7.md']['metadata']['category'], 'classes')
+        self.assertEqual(by_source['guide.txt']['metadata']['file_type'], 'text')
+    
+    def test_iter_document_batches(self):
+        """Test that batches only break between files."""
+        sections = "\n\n".join(f"## Part {i}\n\nStep {i}." for i in range(3))
+        for name in ("a.md", "b.md", "c.md"):
+            (Path(self.temp_dir) / name).write_text(f"# Guide\n\n{sections}", encoding="utf-8")
+        
+        batches = list(self.document_loader.iter_document_batches(self.temp_dir, batch_size=4))
+        
+        self.assertEqual([len(batch) for batch in batches], [6, 3])
+        for batch in batches:
+            self.assertEqual(len({doc['metadata']['file_path'] for doc in batch}), len(batch) // 3)
+    
+    def test_parse_markdown_sections(self):
+        """Test header paths, sibling headers and fenced code."""
+        text = (
+            "Intro line.\n"
+            "# Classes\n"
+            "## Yoga\nMornings at 7 AM.\n"
+            "```\n# not a header\n```\n"
+            "### Props\nMats provided.\n"
+            "## Zumba\nEvenings at 7 PM.\n"
+        )
+        
+        sections = parse_markdown_sections(text)
+        
+        self.assertEqual(
+            [section.header_path for section in sections],
+            [[], ["Classes"], ["Classes", "Yoga"], ["Classes", "Yoga", "Props"], ["Classes", "Zumba"]]
+        )
+        self.assertEqual(text[sections[2].start:sections[2].end].strip(), "Mornings at 7 AM.\n```\n# not a header\n```")
+    
+    def test_load_markdown_sections(self):
+        """Test loading markdown as one document per section with header paths."""
+        (Path(self.temp_dir) / "classes.md").write_text(
+            "# Classes\n\n## **Group** Classes\n- **Zumba:** dance cardio.\n\n## Booking\nUse the app.\n",
+            encoding="utf-8"
+        )
+        
+        documents = self.document_loader.load_markdown_files(self.temp_dir)
+        
+        self.assertEqual(len(documents), 2)
+        self.assertEqual(documents[0]['content'], "Classes > Group Classes\n\n- Zumba: dance cardio.")
+        self.assertEqual(documents[0]['metadata']['header_path'], "Classes > Group Classes")
+        self.assertEqual(documents[1]['metadata']['section_title'], "Booking")
+        self.assertEqual(documents[1]['metadata']['total_sections'], 2)
+    
+    def test_iter_documents_reports_stale_files(self):
+        """Test that an incremental load reports files deleted or changed since the last one."""
+        self.config.scan_cache_path = Path(self.temp_dir) / "cache" / "scan_cache.json"
+        loader = DocumentLoader(self.config)
+        (Path(self.temp_dir) / "yoga.md").write_text("# Yoga\n\nSunrise flow.", encoding="utf-8")
+        (Path(self.temp_dir) / "notes.txt").write_text("Old notes.", encoding="utf-8")
+        self.assertEqual(len(list(loader.iter_documents(self.temp_dir, changed_only=True))), 2)
+        
+        (Path(self.temp_dir) / "notes.txt").unlink()
+        stale = []
+        documents = list(DocumentLoader(self.config).iter_documents(
+            self.temp_dir, changed_only=True, on_stale=stale.extend))
+        
+        self.assertEqual(documents, [])
+        self.assertEqual(stale, [Path(self.temp_dir) / "notes.txt"])
+        
+        (Path(self.temp_dir) / "yoga.md").write_text("# Yoga\n\nSunset flow.", encoding="utf-8")
+        stale = []
+        documents = list(DocumentLoader(self.config).iter_documents(
+            self.temp_dir, changed_only=True, on_stale=stale.extend))
+        
+        self.assertEqual([doc['content'] for doc in documents], ["Yoga\n\nSunset flow."])
+        self.assertEqual(stale, [Path(self.temp_dir) / "yoga.md"])
+    
+    def test_load_docx_sections(self):
+        """Test loading a DOCX file as one document per heading section."""
+        try:
+            import docx
+        except ImportError as e:
+            self.skipTest(f"DOCX loading test skipped: {str(e)}")
+        
+        document = docx.Document()
+        document.add_heading("Weekly Timetable", 1)
+        table = document.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "Monday"
+        table.cell(0, 1).text = "Zumba 7 PM"
+        document.add_heading("Meal Plan", 1)
+        document.add_paragraph("High-protein breakfast after morning sessions.")
+        document.save(str(Path(self.temp_dir) / "nutrition_plan.docx"))
+        
+        documents = list(self.document_loader.load_docx_files(self.temp_dir))
+        
+        self.assertEqual(len(documents), 2)
+        self.assertEqual(documents[0]['content'], "Weekly Timetable\nMonday | Zumba 7 PM")
+        self.assertEqual(documents[1]['metadata']['section_title'], "Meal Plan")
+        self.assertEqual(documents[1]['metadata']['total_sections'], 2)
+        self.assertEqual(documents[1]['metadata']['file_type'], "docx")
+    
+    def test_load_pdf_pages(self):
+        """Test that PDF pages stream in page order across page ranges."""
+        try:
+            from pypdf import PdfWriter
+            from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+        except ImportError as e:
+            self.skipTest(f"PDF loading test skipped: {str(e)}")
+        
+        writer = PdfWriter()
+        font = DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica")
+        })
+        for text in ["Zumba on Monday", "Yoga on Tuesday", "Spin on Friday"]:
+            page = writer.add_blank_page(612, 792)
+            page[NameObject("/Resources")] = DictionaryObject({
+                NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+            })
+            stream = DecodedStreamObject()
+            stream.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode())
+            page.replace_contents(stream)
+        writer.write(str(Path(self.temp_dir) / "timetable.pdf"))
+        
+        self.config.pdf_pages_per_task = 2
+        documents = self.document_loader.iter_all_documents(self.temp_dir)
+        first = next(documents)
+        
+        self.assertEqual(first['content'], "Zumba on Monday")
+        self.assertEqual(first['metadata']['file_type'], "pdf")
+        self.assertEqual([doc['metadata']['page'] for doc in documents], [2, 3])
+        self.assertEqual(first['metadata']['total_pages'], 3)
+
+
+class TestFileScanner(unittest.TestCase):
+    """Test cases for FileScanner."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = Path(self.temp_dir) / "knowledge_base"
+        for relative_path in [
+            "about.md",
+            "notes.txt",
+            "programs/yoga.md",
+            "programs/drafts/zumba.md",
+            "programs/drafts/keep.md",
+            ".ipynb_checkpoints/about-checkpoint.md",
+            "programs/classes-checkpoint.md",
+        ]:
+            path = self.root / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"# {relative_path}", encoding="utf-8")
+        self.config = Config()
+        self.cache_path = Path(self.temp_dir) / "scan_cache.json"
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _relative(self, paths):
+        return sorted(path.relative_to(self.root).as_posix() for path in paths)
+    
+    def test_default_rules_skip_checkpoints(self):
+        """Test recursive scanning with the configured default rules."""
+        scanner = FileScanner(self.config, cache_path=self.cache_path)
+        
+        files = self._relative(scanner.scan(self.root))
+        
+        self.assertEqual(files, ["about.md", "notes.txt", "programs/drafts/keep.md",
+                                 "programs/drafts/zumba.md", "programs/yoga.md"])
+    
+    def test_gitignore_style_patterns(self):
+        """Test anchored, directory-only and negated patterns."""
+        scanner = FileScanner(
+            self.config,
+            include=["*.md"],
+            exclude=[".ipynb_checkpoints/", "/programs/drafts/*", "!keep.md", "*-checkpoint.md"],
+            cache_path=self.cache_path
+        )
+        
+        files = self._relative(scanner.scan(self.root))
+        
+        self.assertEqual(files, ["about.md", "programs/drafts/keep.md", "programs/yoga.md"])
+    
+    def test_scan_changes_skips_unchanged_files(self):
+        """Test the (path, mtime, size) cache across scanner instances."""
+        scanner = FileScanner(self.config, cache_path=self.cache_path)
+        changed, removed = scanner.scan_changes(self.root)
+        scanner.save_cache()
+        self.assertEqual(len(changed), 5)
+        self.assertEqual(removed, [])
+        
+        (self.root / "programs" / "yoga.md").write_text("# Yoga\n\nSunrise flow at 6 AM.", encoding="utf-8")
+        (self.root / "notes.txt").unlink()
+        
+        scanner = FileScanner(self.config, cache_path=self.cache_path)
+        changed, removed = scanner.scan_changes(self.root)
+        
+        self.assertEqual(self._relative(changed), ["programs/yoga.md"])
+        self.assertEqual(self._relative(removed), ["notes.txt"])
+
+
+class TestTextSplitter(unittest.TestCase):
+    """Test cases for TextSplitter."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = Config()
+        self.text_splitter = TextSplitter(self.config)
+    
+    def test_short_text_is_single_chunk(self):
+        """Test that text within the chunk size is returned untouched."""
+        self.assertEqual(self.text_splitter.split_text("Short.", 40, 10), ["Short."])
+    
+    def test_sentence_chunks_with_overlap(self):
+        """Test sentence-level chunking with word-boundary overlap."""
+        text = "Squats build legs. Deadlifts build the back!\n\nRest days matter? Hydrate often."
+        
+        chunks = self.text_splitter.split_text(text, 40, 15)
+        
+        self.assertEqual(chunks, [
+            "Squats build legs.",
+            "build legs. Deadlifts build the back!",
+            "the back! Rest days matter?",
+            "days matter? Hydrate often."
+        ])
+    
+    def test_long_sentence_split_by_words(self):
+        """Test that a sentence longer than the chunk size is split by words."""
+        text = "one two three four five six seven eight nine ten"
+        
+        chunks = self.text_splitter.split_text(text, 20, 8)
+        
+        self.assertEqual(chunks, ["one two three four", "four five six seven", "seven eight nine ten"])
+    
+    def test_overlap_words(self):
+        """Test selecting overlap words from the end of a chunk."""
+        words = ["strength", "and", "cardio", "daily"]
+        
+        self.assertEqual(self.text_splitter._get_overlap_words(words, 13), ["cardio", "daily"])
+        self.assertEqual(self.text_splitter._get_overlap_words([], 13), [])
+    
+    def test_large_text_chunk_sizes(self):
+        """Test that chunks of a large text respect the chunk size."""
+        text = "Progressive overload builds strength over time. " * 2000
+        
+        chunks = self.text_splitter.split_text(text)
+        
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), self.config.chunk_size)
+            self.assertEqual(chunk, chunk.strip())
+
+    
+    def test_spans_match_split_documents(self):
+        """Test that chunk spans materialize the same chunks as split_documents."""
+        documents = [
+            {
+                'content': "Zumba runs on Mondays.\n\nYoga runs on Wednesdays! " * 60,
+                'metadata': {'source': 'classes.md', 'category': 'classes'}
+            },
+            {
+                'content': "Short membership note.",
+                'metadata': {'source': 'membership.md', 'category': 'membership'}
+            }
+        ]
+        
+        chunks = self.text_splitter.split_documents_to_spans(documents)
+        chunked_docs = self.text_splitter.split_documents(documents)
+        
+        self.assertIsInstance(chunks[0], ChunkSpan)
+        self.assertEqual(chunks.texts(), [doc['content'] for doc in chunked_docs])
+        self.assertEqual(chunks.metadatas(), [doc['metadata'] for doc in chunked_docs])
+    
+    def test_span_offsets_trace_to_source(self):
+        """Test that span offsets point at the chunk in the source document."""
+        content = "Deadlifts need a neutral spine. Squats need depth.   Rest well. " * 50
+        documents = [{'content': content, 'metadata': {'source': 'guide.txt'}}]
+        
+        chunks = self.text_splitter.split_documents_to_spans(documents)
+        
+        for span in chunks:
+            metadata = chunks.get_metadata(span)
+            source_text = content[metadata['start_offset']:metadata['end_offset']]
+            self.assertEqual(" ".join(source_text.split()), " ".join(chunks.get_text(span).split()))
+            self.assertIsNone(span.text)
+
+
+class TestChunkDeduplicator(unittest.TestCase):
+    """Test cases for ChunkDeduplicator."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = Config()
+        self.deduplicator = ChunkDeduplicator(self.config)
+        self.contact = (
+            "Visit FIT-FLIX at 42 Harbour Road, open Monday to Saturday from 6 AM to 10 PM "
+            "and Sunday from 8 AM to 2 PM. Call the front desk on 555-0134 or email "
+            "hello@fitflix.example for bookings, trial passes and membership questions."
+        )
+    
+    def test_near_duplicates_clustered(self):
+        """Test that a lightly edited copy clusters with the original."""
+        edited = self.contact.replace("hello@fitflix.example", "help@fitflix.example")
+        unrelated = "Our nutrition coaches build high-protein meal plans around your training schedule."
+        
+        clusters = self.deduplicator.find_clusters([self.contact, unrelated, edited])
+        
+        self.assertEqual(clusters, [[0, 2], [1]])
+    
+    def test_deduplicate_merges_sources(self):
+        """Test that the canonical span lists every merged source."""
+        self.config.document_index_enabled = False
+        documents = [
+            {"content": self.contact, "metadata": {"source": "about.md"}},
+            {"content": "Yoga runs every morning at 7 AM in studio two.", "metadata": {"source": "classes.md"}},
+            {"content": self.contact, "metadata": {"source": "contact.md"}},
+            {"content": self.contact, "metadata": {"source": "faq.md"}},
+        ]
+        chunks = TextSplitter(self.config).split_documents_to_spans(documents)
+        
+        deduplicated = self.deduplicator.deduplicate(chunks)
+        
+        self.assertEqual(len(deduplicated), 2)
+        metadata = deduplicated.metadatas()
+        self.assertEqual(metadata[0]['sources'], "about.md, contact.md, faq.md")
+        self.assertEqual(metadata[0]['duplicate_count'], 2)
+        self.assertNotIn('sources', metadata[1])
+        self.assertEqual(deduplicated.texts(), [chunks.get_text(chunks[0]), chunks.get_text(chunks[1])])
+    
+    def test_deduplicate_within_files_with_document_index(self):
+        """Test that chunks stay in every file the document index may narrow a search to."""
+        documents = [
+            {"content": self.contact, "metadata": {"source": "about.md", "file_path": "kb/about.md"}},
+            {"content": self.contact, "metadata": {"source": "about.md", "file_path": "kb/about.md"}},
+            {"content": self.contact, "metadata": {"source": "contact.md", "file_path": "kb/contact.md"}},
+        ]
+        chunks = TextSplitter(self.config).split_documents_to_spans(documents)
+        
+        deduplicated = self.deduplicator.deduplicate(chunks)
+        
+        metadata = deduplicated.metadatas()
+        self.assertEqual([meta['file_path'] for meta in metadata], ["kb/about.md", "kb/contact.md"])
+        self.assertEqual(metadata[0]['duplicate_count'], 1)
+        self.assertNotIn('duplicate_count', metadata[1])
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for SingleFlight."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.single_flight = SingleFlight()
+        self.calls = 0
+    
+    def test_threads_share_result(self):
+        """Test that concurrent threads with one key run the work once."""
+        def work():
+            self.calls += 1
+            time.sleep(0.1)
+            return "Zumba at 7 PM"
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.single_flight.do("schedule", work)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results, ["Zumba at 7 PM"] * 8)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.single_flight.coalesced, 7)
+    
+    def test_async_callers_share_exception(self):
+        """Test that concurrent coroutines with one key all receive the exception."""
+        async def work():
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            raise ValueError("schedule unavailable")
+        
+        async def ask_all():
+            return await asyncio.gather(
+                *[self.single_flight.do_async("schedule", work) for _ in range(5)],
+                return_exceptions=True
+            )
+        
+        results = asyncio.run(ask_all())
+        
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        
+        # A later call starts fresh
+        self.assertRaises(ValueError, asyncio.run, self.single_flight.do_async("schedule", work))
+        self.assertEqual(self.calls, 2)
+    
+    def test_async_work_cancelled_without_waiters(self):
+        """Test that the shared task runs while anyone waits and is cancelled after the last leaves."""
+        finished = []
+        
+        async def work():
+            await asyncio.sleep(0.1)
+            finished.append(True)
+            return "Zumba at 7 PM"
+        
+        async def abandon(timeout):
+            try:
+                return await asyncio.wait_for(self.single_flight.do_async("schedule", work), timeout)
+            except asyncio.TimeoutError:
+                return None
+        
+        async def one_stays():
+            return await asyncio.gather(abandon(0.01), abandon(1.0))
+        
+        self.assertEqual(asyncio.run(one_stays()), [None, "Zumba at 7 PM"])
+        self.assertEqual(finished, [True])
+        
+        async def all_leave():
+            await asyncio.gather(abandon(0.01), abandon(0.02))
+            await asyncio.sleep(0.15)
+        
+        asyncio.run(all_leave())
+        self.assertEqual(finished, [True])
+
+
+class UpstreamError(Exception):
+    """Upstream failure carrying an HTTP status, like google.api_core errors."""
+    
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class TestResilience(unittest.TestCase):
+    """Test cases for RetryPolicy and CircuitBreaker."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        self.policy = RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.01, breaker=self.breaker)
+        self.attempts = 0
+    
+    def test_retries_rate_limits(self):
+        """Test that a 429 is retried and a later success is returned."""
+        def flaky():
+            self.attempts += 1
+            if self.attempts == 1:
+                raise UpstreamError(429)
+            return "ok"
+        
+        self.assertEqual(self.policy.call(flaky), "ok")
+        self.assertEqual(self.attempts, 2)
+        self.assertEqual(self.breaker.state, "closed")
+    
+    def test_bad_requests_fail_immediately(self):
+        """Test that non-retryable errors are raised on the first attempt."""
+        def invalid():
+            self.attempts += 1
+            raise UpstreamError(400)
+        
+        self.assertRaises(UpstreamError, self.policy.call, invalid)
+        self.assertEqual(self.attempts, 1)
+    
+    def test_breaker_opens_and_recovers(self):
+        """Test that repeated failures open the breaker until a trial call succeeds."""
+        def failing():
+            self.attempts += 1
+            raise UpstreamError(503)
+        
+        self.assertRaises(CircuitOpenError, self.policy.call, failing)
+        self.assertEqual(self.attempts, 2)
+        self.assertEqual(self.breaker.state, "open")
+        
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertEqual(self.policy.call(lambda: "recovered"), "recovered")
+        self.assertEqual(self.breaker.state, "closed")
+    
+    def test_async_attempts_time_out_and_retry(self):
+        """Test that a hung async attempt is cancelled and retried."""
+        async def slow_then_fast():
+            self.attempts += 1
+            if self.attempts == 1:
+                await asyncio.sleep(1)
+            return "ok"
+        
+        start = time.time()
+        result = asyncio.run(self.policy.acall(slow_then_fast, timeout=0.05))
+        
+        self.assertEqual(result, "ok")
+        self.assertEqual(self.attempts, 2)
+        self.assertLess(time.time() - start, 0.5)
+    
+    def test_cancelled_trial_releases_breaker(self):
+        """Test that cancelling a half-open trial lets the next call through."""
+        def failing():
+            raise UpstreamError(503)
+        
+        async def hang():
+            await asyncio.sleep(1)
+        
+        async def cancel_trial():
+            task = asyncio.ensure_future(self.policy.acall(hang))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        
+        self.assertRaises(CircuitOpenError, self.policy.call, failing)
+        time.sleep(0.06)
+        asyncio.run(cancel_trial())
+        
+        self.assertEqual(self.policy.call(lambda: "recovered"), "recovered")
+        self.assertEqual(self.breaker.state, "closed")
+
+
+class TestDeadline(unittest.TestCase):
+    """Test cases for Deadline."""
+    
+    def test_reserve(self):
+        """Test that a reserved deadline expires before its parent."""
+        deadline = Deadline(0.1)
+        earlier = deadline.reserve(0.08)
+        
+        time.sleep(0.03)
+        self.assertTrue(earlier.expired)
+        self.assertFalse(deadline.expired)
+        self.assertRaises(DeadlineExceeded, earlier.check, "generation")
+        self.assertIsNone(Deadline().reserve(1.0).remaining())
+
+
+class TestAhoCorasick(unittest.TestCase):
+    """Test cases for AhoCorasick."""
+    
+    def test_finds_overlapping_matches(self):
+        """Test that every occurrence is found, including patterns inside others."""
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+        
+        matches = sorted(automaton.iter_matches("ushers"))
+        
+        self.assertEqual(matches, [(1, 1), (2, 0), (2, 3)])
+    
+    def test_matches_brute_force(self):
+        """Test against a naive search over many pattern sets."""
+        rng = random.Random(7)
+        for _ in range(200):
+            patterns = list({"".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(5)})
+            text = "".join(rng.choice("ab") for _ in range(25))
+            
+            expected = sorted((start, index) for index, pattern in enumerate(patterns)
+                              for start in range(len(text)) if text.startswith(pattern, start))
+            self.assertEqual(sorted(AhoCorasick(patterns).iter_matches(text)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()